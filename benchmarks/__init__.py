@@ -0,0 +1 @@
+"""Офлайн-бенчмарки гарячих шляхів svitlo_live (не входять до інтеграції)."""
@@ -0,0 +1,310 @@
+"""Бенчмарк гарячих шляхів на 1, 10, 50 і 200 налаштованих чергах.
+
+    python -m benchmarks.bench_hot_paths
+    python -m benchmarks.bench_hot_paths --json bench.json          # зберегти результат
+    python -m benchmarks.bench_hot_paths --compare bench.json       # порівняти з попереднім
+    python -m benchmarks.bench_hot_paths --queues-per-entry 0       # усі черги області в одній entry
+
+Для кожного шляху — медіана часу одного циклу (на всі черги), час на чергу
+та пікова пам'ять циклу за tracemalloc (окремий прогін, на час не впливає).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import json
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Callable, Coroutine, Optional
+
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
+
+from custom_components.svitlo_live.aggregate import RegionDay
+from custom_components.svitlo_live.api_hub import STREAM_CHUNK_BYTES, _process_body
+from custom_components.svitlo_live.calendar import SvitloCalendar
+from custom_components.svitlo_live.coordinator import SvitloCoordinator
+from custom_components.svitlo_live.const import CONF_QUEUES, CONF_REGION
+from custom_components.svitlo_live.sensor import (
+    SvitloMinutesToGridConnection,
+    SvitloMinutesToOutage,
+    SvitloNextGridConnectionSensor,
+    SvitloNextOutageSensor,
+    SvitloStatusSensor,
+)
+from custom_components.svitlo_live.snapshot import build_snapshot
+from custom_components.svitlo_live.stream import RegionStreamParser
+
+from .harness import FakeHass, FakeSession, group_pairs, install_clock, load_fixture, make_hub, queue_pairs
+from .make_fixture import DEFAULT_FIXTURE
+
+QUEUE_COUNTS = (1, 10, 50, 200)
+
+
+# -------------------------------------------------------------------------
+# вимірювання
+# -------------------------------------------------------------------------
+
+def measure(fn: Callable[[], Any], repeat: int) -> dict[str, float]:
+    fn()  # прогрів: кеші, ліниві імпорти
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"ms": statistics.median(times) * 1000, "peak_kib": (peak - base) / 1024}
+
+
+def mutate(api: dict[str, Any]) -> dict[str, Any]:
+    """Копія JSON, де в кожної черги змінено перший слот сьогодні — "новий розклад" для всіх."""
+    other = copy.deepcopy(api)
+    today = other["date_today"]
+    for region in other["regions"]:
+        for days in region["schedule"].values():
+            slots = days.get(today)
+            if slots:
+                slots["00:00"] = 1 if slots.get("00:00") == 2 else 2
+    return other
+
+
+# -------------------------------------------------------------------------
+# стенд
+# -------------------------------------------------------------------------
+
+class Bench:
+    def __init__(self, hass: FakeHass, api: dict[str, Any], count: int, per_entry: int) -> None:
+        self.hass = hass
+        self.snap_a = build_snapshot(api)
+        self.snap_b = build_snapshot(mutate(api))
+        self.writes = 0
+
+        hub = make_hub(hass, FakeSession(b"{}"))
+        self.clock = install_clock(hass)
+        self.coordinators: list[SvitloCoordinator] = []
+        self.calendars: list[SvitloCalendar] = []
+        for region, queues in group_pairs(queue_pairs(api, count), per_entry):
+            coordinator = SvitloCoordinator(hass, {CONF_REGION: region, CONF_QUEUES: queues}, hub)  # type: ignore[arg-type]
+            coordinator.async_handle_api_update(self.snap_a)
+            self.coordinators.append(coordinator)
+            for queue in queues:
+                self._add_entities(coordinator, queue)
+        self._flip = False
+
+    def _add_entities(self, coordinator: SvitloCoordinator, queue: str) -> None:
+        entities = [
+            SvitloStatusSensor(coordinator, queue),
+            SvitloNextGridConnectionSensor(coordinator, queue),
+            SvitloNextOutageSensor(coordinator, queue),
+            SvitloMinutesToGridConnection(coordinator, queue),
+            SvitloMinutesToOutage(coordinator, queue),
+        ]
+        calendar = SvitloCalendar(coordinator, None, queue)  # type: ignore[arg-type]
+        for entity in [*entities, calendar]:
+            entity.hass = self.hass  # type: ignore[assignment]
+            entity.async_write_ha_state = self._count_write  # type: ignore[method-assign]
+            coordinator.async_add_listener(entity._handle_coordinator_update, queue)
+        for entity in entities[3:]:
+            entity._last_value = entity.native_value
+            self.clock.async_register(entity)
+        self.calendars.append(calendar)
+
+    def _count_write(self) -> None:
+        self.writes += 1
+
+    # ---- випадки ----
+
+    def push_changed(self) -> None:
+        """Цикл хаба з новим JSON: перебудова, порівняння, подія зміни, запис станів."""
+        self._flip = not self._flip
+        snapshot = self.snap_b if self._flip else self.snap_a
+        for coordinator in self.coordinators:
+            coordinator.async_handle_api_update(snapshot)
+
+    def push_unchanged(self) -> None:
+        """Цикл хаба з тим самим знімком (304 / той самий хеш тіла)."""
+        for coordinator in self.coordinators:
+            coordinator.async_handle_api_update(coordinator._snapshot)  # type: ignore[arg-type]
+
+    def build_from_api(self) -> None:
+        for coordinator in self.coordinators:
+            coordinator._build_from_api(self.snap_a)
+
+    def slot_tick(self) -> None:
+        """Межа півгодинного слоту: локальне перерахування без мережі."""
+        for coordinator in self.coordinators:
+            coordinator._async_advance_slot()
+
+    def next_change_scan(self) -> None:
+        for coordinator in self.coordinators:
+            for payload in coordinator.data.values():
+                day = payload["today_schedule"]
+                for idx in range(48):
+                    day.next_change(idx)
+
+    def calendar_rebuild(self) -> None:
+        for calendar in self.calendars:
+            calendar._index_key = None
+            calendar._ensure_index()
+
+    def calendar_query(self) -> None:
+        """Запит діапазону, як від UI календаря, плюс поточна/найближча подія."""
+        now = dt_util.utcnow()
+        start, end = now - timedelta(days=1), now + timedelta(days=2)
+        for calendar in self.calendars:
+            _run_sync(calendar.async_get_events(calendar.hass, start, end))
+            _run_sync(calendar.async_update())
+
+    def minutes_tick(self) -> None:
+        self.clock._tick(dt_util.utcnow())
+
+    def shutdown(self) -> None:
+        self.clock._async_cancel()
+        for coordinator in self.coordinators:
+            if coordinator._unsub_precise is not None:
+                coordinator._unsub_precise()
+                coordinator._unsub_precise = None
+
+
+def _run_sync(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Корутини календаря нічого не чекають — проганяємо їх без циклу подій,
+    щоб не міряти накладні витрати планувальника."""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coro.close()
+    raise RuntimeError("calendar coroutine unexpectedly awaited")
+
+
+CASES = (
+    "push_changed",
+    "push_unchanged",
+    "build_from_api",
+    "slot_tick",
+    "next_change_scan",
+    "calendar_rebuild",
+    "calendar_query",
+    "minutes_tick",
+)
+
+
+def stream_parse(body: bytes, api: dict[str, Any], chunk: int) -> Any:
+    region = (api.get("regions") or [{}])[0]
+    queue = next(iter(region.get("schedule") or {}), "")
+    parser = RegionStreamParser({region.get("cpu"): frozenset({queue})})
+    for start in range(0, len(body), chunk):
+        parser.feed(body[start:start + chunk])
+    return build_snapshot(parser.finish())
+
+
+def region_matrices(snapshot: Any) -> list[RegionDay]:
+    """Зведення всіх областей знімка на сьогодні — те, що координатор з region_stats робить раз на знімок."""
+    day = snapshot.date_today
+    return [
+        RegionDay({queue: days[day] for queue, days in snapshot.region_queues(region).items() if day in days})
+        for region in snapshot.regions
+    ]
+
+
+# -------------------------------------------------------------------------
+# запуск
+# -------------------------------------------------------------------------
+
+async def run(fixture: Path, counts: tuple[int, ...], repeat: int, per_entry: int) -> dict[str, Any]:
+    hass = FakeHass(asyncio.get_running_loop())
+    api = load_fixture(fixture)
+    body = json.dumps(api).encode()
+    snapshot = build_snapshot(api)
+
+    results: dict[str, Any] = {
+        "fixture": {"bytes": len(body), "regions": len(api.get("regions") or [])},
+        "queues_per_entry": per_entry,
+        "once": {
+            "json_decode": measure(lambda: json.loads(body), repeat),
+            "orjson_decode": measure(lambda: json_loads(body), repeat),
+            "build_snapshot": measure(lambda: build_snapshot(api), repeat),
+            # те, що хаб робить на новому тілі (в executor, якщо тіло велике)
+            "process_body": measure(lambda: _process_body(body, None), repeat),
+            # потоковий розбір повного тіла з однією чергою entry (проксі без ?regions=)
+            "stream_one_queue": measure(lambda: stream_parse(body, api, STREAM_CHUNK_BYTES), repeat),
+            # матриці слотів + стовпцеві суми для всіх областей (зведені сенсори)
+            "region_matrix": measure(lambda: region_matrices(snapshot), repeat),
+        },
+        "per_count": {},
+    }
+    for count in counts:
+        bench = Bench(hass, api, count, per_entry)
+        row: dict[str, Any] = {"entries": len(bench.coordinators)}
+        for case in CASES:
+            row[case] = measure(getattr(bench, case), repeat)
+        bench.push_changed()
+        writes_before = bench.writes
+        bench.push_changed()
+        row["writes_per_changed_push"] = bench.writes - writes_before
+        bench.shutdown()
+        results["per_count"][str(count)] = row
+    return results
+
+
+def report(results: dict[str, Any], baseline: Optional[dict[str, Any]]) -> None:
+    fx = results["fixture"]
+    print(f"fixture: {fx['bytes']} bytes, {fx['regions']} regions")
+    per_entry = results.get("queues_per_entry", 1)
+    print(f"queues per entry: {per_entry or 'whole region'}")
+    for name, m in results["once"].items():
+        print(f"  {name:<18} {m['ms']:9.3f} ms  peak {m['peak_kib']:9.1f} KiB")
+    print()
+    header = f"{'case':<18}{'queues':>7}{'cycle ms':>11}{'µs/queue':>11}{'peak KiB':>11}"
+    if baseline:
+        header += f"{'vs base':>9}"
+    print(header)
+    for count, row in results["per_count"].items():
+        n = int(count)
+        for case in CASES:
+            m = row[case]
+            line = f"{case:<18}{n:>7}{m['ms']:>11.3f}{m['ms'] * 1000 / n:>11.1f}{m['peak_kib']:>11.1f}"
+            if baseline:
+                base = baseline.get("per_count", {}).get(count, {}).get(case)
+                line += f"{m['ms'] / base['ms']:>8.2f}x" if base and base["ms"] else f"{'—':>9}"
+            print(line)
+        print(f"{'entity writes / changed push':<36}{row['writes_per_changed_push']:>11}")
+        print(f"{'config entries (coordinators)':<36}{row.get('entries', n):>11}")
+        print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixture", type=Path, default=DEFAULT_FIXTURE)
+    parser.add_argument("--counts", type=int, nargs="+", default=list(QUEUE_COUNTS))
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--queues-per-entry", type=int, default=1,
+        help="скільки черг однієї області в entry (0 — усі черги області в одній)",
+    )
+    parser.add_argument("--json", type=Path, help="зберегти результат у файл")
+    parser.add_argument("--compare", type=Path, help="порівняти з раніше збереженим результатом")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.fixture, tuple(args.counts), args.repeat, args.queues_per_entry))
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    report(results, baseline)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""Мінімальна заміна hass і aiohttp-сесії для офлайн-прогонів інтеграції.
+
+Потрібен встановлений пакет homeassistant (pip install homeassistant) —
+модулі HA не підміняються, підміняються лише hass і мережа.
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib
+import json
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.svitlo_live import api_hub
+from custom_components.svitlo_live.const import DOMAIN, DATA_CLOCK, DATA_HUB
+
+from .make_fixture import DEFAULT_FIXTURE, shift_dates
+
+TZ_KYIV = dt_util.get_time_zone("Europe/Kyiv")
+
+
+# -------------------------------------------------------------------------
+# hass
+# -------------------------------------------------------------------------
+
+class FakeBus:
+    def __init__(self) -> None:
+        self.fired: dict[str, int] = {}
+
+    def async_fire(self, event_type: str, event_data: Optional[dict[str, Any]] = None, *args: Any, **kwargs: Any) -> None:
+        self.fired[event_type] = self.fired.get(event_type, 0) + 1
+
+    def async_listen_once(self, event_type: str, listener: Callable[..., Any]) -> Callable[[], None]:
+        return lambda: None
+
+
+class FakeDeviceRegistry:
+    """Порожній реєстр: календар бере назву за замовчуванням, як для нового пристрою."""
+
+    def async_get_device(self, *args: Any, **kwargs: Any) -> None:
+        return None
+
+
+class FakeConfig:
+    def __init__(self) -> None:
+        self.config_dir = tempfile.mkdtemp(prefix="svitlo_bench_")
+        self.time_zone = "Europe/Kyiv"
+        # recorder не завантажено — імпорт статистики архіву відкладається
+        self.components: set[str] = set()
+
+    def path(self, *parts: str) -> str:
+        return str(Path(self.config_dir, *parts))
+
+
+class FakeHass:
+    """Те, що інтеграція реально чіпає в hass: loop, data, bus, config, задачі й таймери."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.data: dict[str, Any] = {"device_registry": FakeDeviceRegistry()}
+        self.bus = FakeBus()
+        self.config = FakeConfig()
+        self.state = None
+        self.config_entries = FakeConfigEntries(self)
+        self.entity_writes = 0
+        self._tasks: set[asyncio.Task[Any]] = set()
+
+    def async_create_task(self, target: Any, name: Optional[str] = None, *args: Any, **kwargs: Any) -> asyncio.Task[Any]:
+        task = self.loop.create_task(target)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def async_run_hass_job(self, job: Any, *args: Any, **kwargs: Any) -> Any:
+        return job.target(*args)
+
+    def async_add_executor_job(self, target: Callable[..., Any], *args: Any) -> asyncio.Future[Any]:
+        return self.loop.run_in_executor(None, target, *args)
+
+    async def async_block_till_done(self) -> None:
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+class FakeConfigEntry:
+    def __init__(self, entry_id: str, data: dict[str, Any], options: Optional[dict[str, Any]] = None) -> None:
+        self.entry_id = entry_id
+        self.data = data
+        self.options = options or {}
+        self.title = entry_id
+        self._on_unload: list[Callable[[], Any]] = []
+
+    def async_on_unload(self, func: Callable[[], Any]) -> None:
+        self._on_unload.append(func)
+
+    def add_update_listener(self, listener: Callable[..., Any]) -> Callable[[], None]:
+        return lambda: None
+
+    def async_unload(self) -> None:
+        while self._on_unload:
+            self._on_unload.pop()()
+
+
+class FakeConfigEntries:
+    """Форвард платформ: ентіті додаються "як у HA" — hass, слухачі координатора, перший стан.
+
+    Запис стану лише рахується (hass.entity_writes), state machine немає.
+    """
+
+    def __init__(self, hass: FakeHass) -> None:
+        self.hass = hass
+        self.entities: dict[str, list[Any]] = {}
+
+    async def async_forward_entry_setups(self, entry: FakeConfigEntry, platforms: Any) -> None:
+        for platform in platforms:
+            module = importlib.import_module(f"custom_components.svitlo_live.{platform.value}")
+            added: list[Any] = []
+            await module.async_setup_entry(self.hass, entry, added.extend)
+            for entity in added:
+                entity.hass = self.hass
+                entity.async_write_ha_state = self._count_write
+                await entity.async_added_to_hass()
+                self._count_write()
+            self.entities.setdefault(entry.entry_id, []).extend(added)
+
+    async def async_unload_platforms(self, entry: FakeConfigEntry, platforms: Any) -> bool:
+        for entity in self.entities.pop(entry.entry_id, []):
+            entity._call_on_remove_callbacks()
+        return True
+
+    def _count_write(self) -> None:
+        self.hass.entity_writes += 1
+
+
+# -------------------------------------------------------------------------
+# мережа
+# -------------------------------------------------------------------------
+
+class FakeResponse:
+    def __init__(self, body: bytes, status: int = 200, headers: Optional[dict[str, str]] = None) -> None:
+        self._body = body
+        self.status = status
+        self.headers = headers or {}
+
+    @property
+    def content_length(self) -> int:
+        return len(self._body)
+
+    @property
+    def content(self) -> FakeResponse:
+        return self
+
+    async def iter_chunked(self, size: int) -> AsyncIterator[bytes]:
+        for start in range(0, len(self._body), size):
+            yield self._body[start:start + size]
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def json(self, content_type: Optional[str] = None) -> Any:
+        return json.loads(self._body)
+
+    async def __aenter__(self) -> FakeResponse:
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        return None
+
+
+class FakeSession:
+    """Віддає фіксовані байти; рахує запити, щоб перевіряти спільний фетч."""
+
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+        self.requests = 0
+
+    def get(self, url: str, **kwargs: Any) -> FakeResponse:
+        self.requests += 1
+        return FakeResponse(self.body)
+
+
+@contextmanager
+def use_session(session: Any) -> Iterator[None]:
+    """Хаб, створений усередині, ходить у задану сесію замість aiohttp-сесії HA."""
+    original = api_hub.async_get_clientsession
+    api_hub.async_get_clientsession = lambda _hass: session
+    try:
+        yield
+    finally:
+        api_hub.async_get_clientsession = original
+
+
+def make_hub(hass: FakeHass, session: Any) -> api_hub.SvitloApiHub:
+    with use_session(session):
+        hub = api_hub.SvitloApiHub(hass)  # type: ignore[arg-type]
+    hass.data.setdefault(DOMAIN, {})[DATA_HUB] = hub
+    return hub
+
+
+class TimedLock:
+    """asyncio.Lock, що записує, скільки кожен виклик чекав на захоплення."""
+
+    def __init__(self) -> None:
+        self._lock = asyncio.Lock()
+        self.waits: list[float] = []
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    async def __aenter__(self) -> None:
+        start = time.perf_counter()
+        await self._lock.acquire()
+        self.waits.append(time.perf_counter() - start)
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self._lock.release()
+
+
+def install_clock(hass: FakeHass) -> Any:
+    from custom_components.svitlo_live.clock import SvitloCountdownClock
+
+    clock = SvitloCountdownClock(hass)  # type: ignore[arg-type]
+    hass.data.setdefault(DOMAIN, {})[DATA_CLOCK] = clock
+    return clock
+
+
+# -------------------------------------------------------------------------
+# фікстури
+# -------------------------------------------------------------------------
+
+def load_fixture(path: Path = DEFAULT_FIXTURE, today: Optional[date] = None) -> dict[str, Any]:
+    """JSON проксі з датами, перенесеними на сьогодні/завтра (за Києвом).
+
+    Без перенесення _derive_payload бачив би "чужий" день і рахував би від слоту 0.
+    """
+    api = json.loads(Path(path).read_text(encoding="utf-8"))
+    return shift_dates(api, today or dt_util.now(TZ_KYIV).date())
+
+
+def queue_pairs(api: dict[str, Any], count: int) -> list[tuple[str, str]]:
+    """Перші count пар (region, queue) з фікстури; якщо пар менше — по колу.
+
+    Повтори імітують кілька entry на одну чергу (напр. різні HA на одному воркері).
+    """
+    pairs = [
+        (region["cpu"], queue)
+        for region in api.get("regions") or []
+        for queue in (region.get("schedule") or {})
+    ]
+    return [pairs[i % len(pairs)] for i in range(count)]
+
+
+def group_pairs(pairs: list[tuple[str, str]], per_entry: int) -> list[tuple[str, list[str]]]:
+    """Пари (region, queue) -> entry з кількома чергами однієї області (per_entry 0 — без обмеження).
+
+    Черга, що вже є в поточній entry (повтор з queue_pairs), відкриває нову entry.
+    """
+    groups: list[tuple[str, list[str]]] = []
+    for region, queue in pairs:
+        if groups:
+            last_region, queues = groups[-1]
+            if last_region == region and queue not in queues and (per_entry <= 0 or len(queues) < per_entry):
+                queues.append(queue)
+                continue
+        groups.append((region, [queue]))
+    return groups
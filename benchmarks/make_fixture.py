@@ -0,0 +1,111 @@
+"""Фікстура відповіді svitlo-proxy для бенчмарків.
+
+    python -m benchmarks.make_fixture                  # синтетична, детермінована
+    python -m benchmarks.make_fixture --capture URL    # запис реальної відповіді проксі
+
+Синтетична фікстура повторює форму JSON проксі: усі області з REGIONS,
+усі черги/групи з config_flow, розклад на сьогодні й завтра (коди 1/2/0).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import urllib.request
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+from zoneinfo import ZoneInfo
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+DEFAULT_FIXTURE = FIXTURE_DIR / "proxy_all_regions.json"
+
+# Дати фікстури; harness.load_fixture переносить їх на поточну добу за Києвом
+FIXTURE_TODAY = date(2025, 1, 15)
+
+# Ті самі області та режими черг, що й у const.py / config_flow.py
+# (без імпорту інтеграції — щоб генератор працював і без Home Assistant)
+REGIONS = [
+    "cherkaska-oblast", "chernigivska-oblast", "chernivetska-oblast",
+    "dnipropetrovska-oblast", "donetska-oblast", "harkivska-oblast",
+    "hmelnitska-oblast", "ivano-frankivska-oblast", "kirovogradska-oblast",
+    "kyiv", "kiivska-oblast", "lvivska-oblast", "mikolaivska-oblast",
+    "odeska-oblast", "poltavska-oblast", "rivnenska-oblast", "sumska-oblast",
+    "ternopilska-oblast", "vinnitska-oblast", "volinska-oblast",
+    "zakarpatska-oblast", "zaporizka-oblast", "jitomirska-oblast",
+]
+
+
+def _queues(region: str) -> list[str]:
+    if region == "chernivetska-oblast":
+        return [str(i) for i in range(1, 13)]
+    if region == "donetska-oblast":
+        return [str(i) for i in range(1, 7)]
+    return [f"{i}.{j}" for i in range(1, 7) for j in (1, 2)]
+
+
+def _day_slots(rnd: random.Random, known: bool = True) -> dict[str, int]:
+    """48 слотів блоками по 1–4 години, як у реальних графіках."""
+    slots: dict[str, int] = {}
+    state = rnd.choice((1, 2))
+    left = 0
+    for h in range(24):
+        for m in (0, 30):
+            if left == 0:
+                state = 3 - state
+                left = rnd.randint(2, 8)
+            left -= 1
+            slots[f"{h:02d}:{m:02d}"] = state if known else 0
+    return slots
+
+
+def synthetic_payload(today: date = FIXTURE_TODAY, seed: int = 1) -> dict[str, Any]:
+    rnd = random.Random(seed)
+    days = [today.isoformat(), (today + timedelta(days=1)).isoformat()]
+    regions = []
+    for region in REGIONS:
+        schedule = {
+            queue: {day: _day_slots(rnd) for day in days}
+            for queue in _queues(region)
+        }
+        regions.append({"cpu": region, "name_ua": region, "schedule": schedule})
+    return {"date_today": days[0], "date_tomorrow": days[1], "regions": regions}
+
+
+def kyiv_today() -> date:
+    return datetime.now(ZoneInfo("Europe/Kyiv")).date()
+
+
+def shift_dates(api: dict[str, Any], today: date) -> dict[str, Any]:
+    """Переносить date_today/date_tomorrow (і ключі днів у розкладах) на задану добу."""
+    old = [api.get("date_today"), api.get("date_tomorrow")]
+    new = [today.isoformat(), (today + timedelta(days=1)).isoformat()]
+    mapping = {o: n for o, n in zip(old, new) if o}
+    for region in api.get("regions") or []:
+        schedule = region.get("schedule") or {}
+        for queue, days in schedule.items():
+            schedule[queue] = {mapping.get(d, d): slots for d, slots in days.items()}
+    api["date_today"], api["date_tomorrow"] = new
+    return api
+
+
+def capture(url: str) -> dict[str, Any]:
+    with urllib.request.urlopen(url, timeout=30) as resp:  # noqa: S310 — URL задає користувач
+        return json.loads(resp.read())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--capture", metavar="URL", help="записати реальну відповідь проксі")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("-o", "--output", type=Path, default=DEFAULT_FIXTURE)
+    args = parser.parse_args()
+
+    payload = capture(args.capture) if args.capture else synthetic_payload(seed=args.seed)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    print(f"{args.output}: {args.output.stat().st_size} bytes, {len(payload.get('regions') or [])} regions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""Навантажувальний сценарій: N config entry проти локального стенду проксі.
+
+    python -m benchmarks.scenario --entries 50 --cycles 5 --latency 300
+    python -m benchmarks.scenario --entries 200 --failure-rate 0.3 --fail-mode 5xx --restart
+    python -m benchmarks.scenario --entries 20 --url http://127.0.0.1:8787/    # зовнішній стенд
+
+Entry піднімаються одночасно, як при старті HA, через справжні async_setup /
+async_setup_entry інтеграції (hass і реєстр ентіті — заміни з harness.py).
+Звіт: скільки запитів дійшло до стенду, очікування на локу хаба, латентність
+першого refresh кожного entry та кількість записів стану ентіті.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+import urllib.request
+from datetime import timedelta
+from typing import Any, Optional
+
+import aiohttp
+
+from custom_components.svitlo_live import async_setup, async_setup_entry, async_unload_entry
+from custom_components.svitlo_live.api_hub import MIN_REUSE_SECONDS
+from custom_components.svitlo_live.const import CONF_API_URL, CONF_QUEUES, CONF_REGION, DATA_HUB, DOMAIN
+
+from .harness import FakeConfigEntry, FakeHass, TimedLock, group_pairs, queue_pairs, use_session
+from .make_fixture import kyiv_today, shift_dates
+from .standin_proxy import StandinProxy, add_standin_args, load_payload, standin_from_args
+
+
+def _pct(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def _ms_summary(values: list[float]) -> str:
+    if not values:
+        return "—"
+    ms = [v * 1000 for v in values]
+    return f"p50 {_pct(ms, 0.5):8.1f}  p95 {_pct(ms, 0.95):8.1f}  max {max(ms):8.1f} ms  (n={len(ms)})"
+
+
+class Scenario:
+    def __init__(self, args: argparse.Namespace, proxy: Optional[StandinProxy]) -> None:
+        self.args = args
+        self.proxy = proxy
+        self.url = args.url or (proxy.url if proxy else "")
+        self.hass: Optional[FakeHass] = None
+        self.config_dir: Optional[str] = None
+
+    def upstream_stats(self) -> dict[str, int]:
+        if self.proxy is not None:
+            return self.proxy.stats.as_dict()
+        with urllib.request.urlopen(self.url.rstrip("/") + "/stats", timeout=5) as resp:  # noqa: S310
+            return json.loads(resp.read())
+
+    def upstream_requests(self) -> int:
+        return int(self.upstream_stats()["requests"])
+
+    async def start(self, groups: list[tuple[str, list[str]]], session: aiohttp.ClientSession) -> dict[str, Any]:
+        """Один "старт HA": async_setup + усі entry одночасно."""
+        hass = FakeHass(asyncio.get_running_loop())
+        if self.config_dir:
+            hass.config.config_dir = self.config_dir  # той самий .storage — теплий рестарт
+        self.config_dir = hass.config.config_dir
+        self.hass = hass
+
+        requests_before = self.upstream_requests()
+        with use_session(session):
+            await async_setup(hass, {DOMAIN: {CONF_API_URL: self.url}})  # type: ignore[arg-type]
+        hub = hass.data[DOMAIN][DATA_HUB]
+        hub._lock = TimedLock()
+
+        entries = [
+            FakeConfigEntry(f"entry_{i}", {CONF_REGION: region, CONF_QUEUES: queues})
+            for i, (region, queues) in enumerate(groups)
+        ]
+        latencies: list[float] = []
+        failures = 0
+
+        async def _setup(entry: FakeConfigEntry) -> bool:
+            nonlocal failures
+            start = time.perf_counter()
+            try:
+                await async_setup_entry(hass, entry)  # type: ignore[arg-type]
+            except Exception:  # ConfigEntryNotReady та ін. — HA повторив би пізніше
+                failures += 1
+                return False
+            latencies.append(time.perf_counter() - start)
+            return True
+
+        ok = await asyncio.gather(*(_setup(entry) for entry in entries))
+        self.entries = [entry for entry, good in zip(entries, ok) if good]
+        await hass.async_block_till_done()
+        return {
+            "requests": self.upstream_requests() - requests_before,
+            "latencies": latencies,
+            "failures": failures,
+            "lock_waits": list(hub._lock.waits),
+            "writes": hass.entity_writes,
+        }
+
+    async def cycles(self, count: int, change_every: int) -> dict[str, Any]:
+        """Цикли опитування хаба (як від його таймера), з опційною зміною розкладу на стенді."""
+        assert self.hass is not None
+        hub = self.hass.data[DOMAIN][DATA_HUB]
+        before = self.upstream_stats()
+        writes_before = self.hass.entity_writes
+        durations: list[float] = []
+        for i in range(count):
+            if change_every and self.proxy is not None and (i + 1) % change_every == 0:
+                self.proxy.set_payload(_changed_payload(self.args, i))
+            if hub._last_fetch_utc is not None:
+                # "старимо" кеш на MIN_REUSE_SECONDS: кожен цикл — справжній фетч, як від таймера
+                hub._last_fetch_utc -= timedelta(seconds=MIN_REUSE_SECONDS)
+            start = time.perf_counter()
+            await hub.async_poll()
+            durations.append(time.perf_counter() - start)
+        after = self.upstream_stats()
+        return {
+            "requests": after["requests"] - before["requests"],
+            "bytes": after["bytes_sent"] - before["bytes_sent"],
+            "regions": hub.wanted_regions() if hub.region_filter else None,
+            "cadence": f"{hub.poller.interval.total_seconds() / 60:.0f} min ({hub.poller.reason})",
+            "writes": self.hass.entity_writes - writes_before,
+            "durations": durations,
+            "events": dict(self.hass.bus.fired),
+        }
+
+    async def stop(self) -> None:
+        assert self.hass is not None
+        hub = self.hass.data[DOMAIN][DATA_HUB]
+        if hub.snapshot is not None:
+            # те, що Store дописав би при зупинці HA
+            await hub._store.async_save(hub._data_to_save())
+        for entry in self.entries:
+            coordinator = self.hass.data[DOMAIN][entry.entry_id]
+            await async_unload_entry(self.hass, entry)  # type: ignore[arg-type]
+            entry.async_unload()
+            await coordinator.async_shutdown()
+        self.hass.data[DOMAIN]["_countdown_clock"]._async_cancel()
+        await self.hass.async_block_till_done()
+
+
+def _changed_payload(args: argparse.Namespace, i: int) -> dict[str, Any]:
+    api = load_payload(args.fixture, (args.synthetic or 0) + i + 1, args.scale)
+    return shift_dates(api, kyiv_today())
+
+
+def _report_start(title: str, res: dict[str, Any], groups: list[tuple[str, list[str]]]) -> None:
+    queues = sum(len(queues) for _, queues in groups)
+    print(f"== {title}: {len(groups)} entries, {queues} queues")
+    print(f"  upstream requests     {res['requests']}")
+    print(f"  setup failures        {res['failures']}")
+    print(f"  first refresh         {_ms_summary(res['latencies'])}")
+    print(f"  hub lock wait         {_ms_summary(res['lock_waits'])}")
+    print(f"  entity writes         {res['writes']}")
+
+
+async def run(args: argparse.Namespace) -> None:
+    proxy = None if args.url else standin_from_args(args).start()
+    scenario = Scenario(args, proxy)
+    payload = load_payload(args.fixture, args.synthetic, args.scale)
+    groups = group_pairs(queue_pairs(payload, args.entries), args.queues_per_entry)
+    try:
+        async with aiohttp.ClientSession() as session:
+            res = await scenario.start(groups, session)
+            _report_start("cold start", res, groups)
+
+            if args.cycles:
+                cyc = await scenario.cycles(args.cycles, args.change_every)
+                print(f"== {args.cycles} poll cycles")
+                print(f"  upstream requests     {cyc['requests']}")
+                print(f"  bytes per poll        {cyc['bytes'] // max(1, cyc['requests'])}"
+                      f"  (regions: {len(cyc['regions']) if cyc['regions'] else 'all'})")
+                print(f"  cycle duration        {_ms_summary(cyc['durations'])}")
+                print(f"  next poll in          {cyc['cadence']}")
+                print(f"  entity writes         {cyc['writes']}")
+                print(f"  bus events            {cyc['events'] or '—'}")
+
+            await scenario.stop()
+            if args.restart:
+                res = await scenario.start(groups, session)
+                _report_start("warm restart (disk cache)", res, groups)
+                await scenario.stop()
+    finally:
+        if proxy is not None:
+            proxy.stop()
+            print(f"stand-in totals: {proxy.stats.as_dict()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=10, help="кількість черг (config entry при --queues-per-entry 1)")
+    parser.add_argument(
+        "--queues-per-entry", type=int, default=1,
+        help="скільки черг однієї області в entry (0 — усі черги області в одній)",
+    )
+    parser.add_argument("--cycles", type=int, default=3, help="циклів опитування після старту")
+    parser.add_argument("--change-every", type=int, default=0, help="міняти розклад на стенді кожні N циклів")
+    parser.add_argument("--restart", action="store_true", help="після зупинки стартувати ще раз з тим самим .storage")
+    parser.add_argument("--url", help="зовнішній стенд замість вбудованого")
+    parser.add_argument("-v", "--verbose", action="store_true", help="показувати лог інтеграції")
+    add_standin_args(parser)
+    args = parser.parse_args()
+    # помилки кожного entry при збоях стенду — очікувані, у звіті вони вже пораховані
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.CRITICAL)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
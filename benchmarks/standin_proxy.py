@@ -0,0 +1,248 @@
+"""Локальний стенд замість svitlo-proxy: записаний або синтетичний JSON з керованими збоями.
+
+    python -m benchmarks.standin_proxy --port 8787 --latency 200 --failure-rate 0.1 --fail-mode 5xx
+
+У configuration.yaml тестового HA:
+
+    svitlo_live:
+      api_url: http://127.0.0.1:8787/
+
+GET /        — розклад (з ETag; If-None-Match -> 304)
+GET /?regions=kyiv,odeska-oblast — лише ці області (окремий ETag на кожен набір)
+GET /stats   — лічильники запитів стенду в JSON
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Optional
+
+from .make_fixture import DEFAULT_FIXTURE, kyiv_today, shift_dates, synthetic_payload
+
+FAIL_MODES = ("5xx", "timeout", "reset")
+
+
+@dataclass
+class StandinConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    failure_rate: float = 0.0
+    fail_mode: str = "5xx"
+    # скільки секунд "висить" запит у режимі timeout (більше за FETCH_TIMEOUT хаба — справжній таймаут)
+    hang_s: float = 35.0
+    etag: bool = True
+    # False — старий проксі: ?regions= ігнорується, завжди повний JSON
+    region_filter: bool = True
+
+
+@dataclass
+class StandinStats:
+    requests: int = 0
+    ok: int = 0
+    not_modified: int = 0
+    filtered: int = 0
+    failed: int = 0
+    bytes_sent: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def bump(self, **deltas: int) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def as_dict(self) -> dict[str, int]:
+        return {k: v for k, v in self.__dict__.items() if not k.startswith("_")}
+
+
+def scale_payload(api: dict[str, Any], factor: int) -> dict[str, Any]:
+    """Збільшує JSON у factor разів копіями областей з іншими cpu — для замірів розміру."""
+    if factor <= 1:
+        return api
+    regions = list(api.get("regions") or [])
+    for i in range(1, factor):
+        regions.extend({**region, "cpu": f"{region['cpu']}-x{i}"} for region in api.get("regions") or [])
+    return {**api, "regions": regions}
+
+
+class StandinProxy:
+    """HTTP-сервер стенду у фоновому потоці; body можна підмінити на льоту (set_payload)."""
+
+    def __init__(self, payload: dict[str, Any], config: Optional[StandinConfig] = None,
+                 host: str = "127.0.0.1", port: int = 0) -> None:
+        self.config = config or StandinConfig()
+        self.stats = StandinStats()
+        self._rnd = random.Random()
+        self.set_payload(payload)
+
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 — ім'я з BaseHTTPRequestHandler
+                proxy._handle(self)
+
+            def log_message(self, *args: Any) -> None:
+                return
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def set_payload(self, payload: dict[str, Any]) -> None:
+        self._payload = payload
+        # (body, etag) на кожен набір областей; None — повний JSON
+        self._bodies: dict[Optional[tuple[str, ...]], tuple[bytes, str]] = {}
+        self._body, self._etag = self._body_for(None)
+
+    def _body_for(self, regions: Optional[tuple[str, ...]]) -> tuple[bytes, str]:
+        cached = self._bodies.get(regions)
+        if cached is not None:
+            return cached
+        payload = self._payload
+        if regions is not None:
+            wanted = set(regions)
+            payload = {**payload, "regions": [r for r in payload.get("regions") or [] if r.get("cpu") in wanted]}
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+        cached = self._bodies[regions] = (body, '"' + hashlib.sha256(body).hexdigest()[:16] + '"')
+        return cached
+
+    def _requested_regions(self, path: str) -> Optional[tuple[str, ...]]:
+        if not self.config.region_filter:
+            return None
+        values = parse_qs(urlsplit(path).query).get("regions")
+        if not values:
+            return None
+        return tuple(sorted({slug for value in values for slug in value.split(",") if slug}))
+
+    def start(self) -> StandinProxy:
+        self._thread = threading.Thread(target=self._server.serve_forever, name="svitlo-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    # ---------------------------------------------------------------------
+
+    def _handle(self, req: BaseHTTPRequestHandler) -> None:
+        if req.path.startswith("/stats"):
+            self._send(req, 200, json.dumps(self.stats.as_dict()).encode(), count=False)
+            return
+
+        self.stats.bump(requests=1)
+        cfg = self.config
+        delay = cfg.latency_ms + (self._rnd.uniform(-cfg.jitter_ms, cfg.jitter_ms) if cfg.jitter_ms else 0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        if cfg.failure_rate and self._rnd.random() < cfg.failure_rate:
+            self.stats.bump(failed=1)
+            if cfg.fail_mode == "timeout":
+                time.sleep(cfg.hang_s)
+                return
+            if cfg.fail_mode == "reset":
+                req.close_connection = True
+                req.connection.close()
+                return
+            self._send(req, self._rnd.choice((500, 502, 503)), b'{"error":"standin failure"}', count=False)
+            return
+
+        regions = self._requested_regions(req.path)
+        if regions is not None:
+            self.stats.bump(filtered=1)
+        body, etag = self._body_for(regions)
+
+        if cfg.etag and req.headers.get("If-None-Match") == etag:
+            self.stats.bump(not_modified=1)
+            req.send_response(304)
+            req.send_header("ETag", etag)
+            req.end_headers()
+            return
+
+        self.stats.bump(ok=1)
+        self._send(req, 200, body, etag=etag)
+
+    def _send(self, req: BaseHTTPRequestHandler, status: int, body: bytes, count: bool = True,
+              etag: Optional[str] = None) -> None:
+        req.send_response(status)
+        req.send_header("Content-Type", "application/json")
+        req.send_header("Content-Length", str(len(body)))
+        if status == 200 and etag and self.config.etag:
+            req.send_header("ETag", etag)
+        req.end_headers()
+        req.wfile.write(body)
+        if count:
+            self.stats.bump(bytes_sent=len(body))
+
+
+def load_payload(fixture: Optional[Path], synthetic_seed: Optional[int], scale: int) -> dict[str, Any]:
+    """Розклад для стенду; дати записаної фікстури переносяться на сьогодні/завтра."""
+    if synthetic_seed is not None:
+        api = synthetic_payload(kyiv_today(), seed=synthetic_seed)
+    else:
+        api = json.loads(Path(fixture or DEFAULT_FIXTURE).read_text(encoding="utf-8"))
+        api = shift_dates(api, kyiv_today())
+    return scale_payload(api, scale)
+
+
+def add_standin_args(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("стенд")
+    group.add_argument("--fixture", type=Path, default=None, help="записаний JSON (за замовчуванням — фікстура бенчмарків)")
+    group.add_argument("--synthetic", type=int, metavar="SEED", help="синтетичний розклад на сьогодні/завтра")
+    group.add_argument("--scale", type=int, default=1, help="збільшити payload у N разів")
+    group.add_argument("--latency", type=float, default=0.0, help="затримка відповіді, мс")
+    group.add_argument("--jitter", type=float, default=0.0, help="± розкид затримки, мс")
+    group.add_argument("--failure-rate", type=float, default=0.0, help="частка збійних відповідей 0..1")
+    group.add_argument("--fail-mode", choices=FAIL_MODES, default="5xx")
+    group.add_argument("--hang", type=float, default=35.0, help="скільки секунд висить запит у режимі timeout")
+    group.add_argument("--no-etag", action="store_true", help="не віддавати ETag / 304")
+    group.add_argument("--no-region-filter", action="store_true",
+                       help="ігнорувати ?regions= (поведінка старого проксі)")
+
+
+def standin_from_args(args: argparse.Namespace, host: str = "127.0.0.1", port: int = 0) -> StandinProxy:
+    config = StandinConfig(
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        failure_rate=args.failure_rate,
+        fail_mode=args.fail_mode,
+        hang_s=args.hang,
+        etag=not args.no_etag,
+        region_filter=not args.no_region_filter,
+    )
+    return StandinProxy(load_payload(args.fixture, args.synthetic, args.scale), config, host=host, port=port)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    add_standin_args(parser)
+    args = parser.parse_args()
+
+    proxy = standin_from_args(args, host=args.host, port=args.port)
+    print(f"svitlo stand-in proxy on {proxy.url} ({len(proxy._body)} bytes), Ctrl+C to stop")
+    try:
+        proxy._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        proxy._server.server_close()
+        print(json.dumps(proxy.stats.as_dict()))
+
+
+if __name__ == "__main__":
+    main()
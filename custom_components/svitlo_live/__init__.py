@@ -2,23 +2,67 @@ from __future__ import annotations
 import logging
 import shutil
 from pathlib import Path
-from homeassistant.core import HomeAssistant
+import voluptuous as vol
+from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, Platform
+from homeassistant.helpers import config_validation as cv
 from .const import (
     DOMAIN,
     PLATFORMS,
+    API_URL,
+    CONF_API_URL,
     CONF_REGION,
-    CONF_QUEUE,
+    CONF_QUEUES,
+    CONF_REGION_STATS,
+    CONF_STALE_AFTER,
+    CONF_MIN_POLL,
+    CONF_MAX_POLL,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_STALE_AFTER_HOURS,
+    DEFAULT_MIN_POLL_MINUTES,
+    DEFAULT_MAX_POLL_MINUTES,
+    DATA_HUB,
+    DATA_CLOCK,
+    entry_queues,
 )
+from .api_hub import SvitloApiHub
+from .clock import SvitloCountdownClock
 from .coordinator import SvitloCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
+# Необов'язковий YAML: лише перевизначення ендпоінта (entry як і раніше — через UI)
+CONFIG_SCHEMA = vol.Schema(
+    {
+        vol.Optional(DOMAIN): vol.Schema(
+            {vol.Optional(CONF_API_URL, default=API_URL): cv.url}
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the Svitlo Live component."""
+    api_url = config.get(DOMAIN, {}).get(CONF_API_URL, API_URL)
+    if api_url != API_URL:
+        _LOGGER.info("Svitlo Live: using custom API endpoint %s", api_url)
+    # Один спільний fetch-рушій на весь HA: всі entry підписуються на нього
+    hub = SvitloApiHub(hass, DEFAULT_SCAN_INTERVAL, api_url)
+    # Останній вдалий знімок з диска: entry піднімаються без мережі (і навіть опівночі)
+    await hub.async_load()
+    hass.data.setdefault(DOMAIN, {})[DATA_HUB] = hub
+
+    @callback
+    def _async_stop(_event: Event) -> None:
+        # Нічний імпорт статистики архіву запускає перший entry; при зупинці HA — гасимо таймер
+        hub.archive.async_stop()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_stop)
+    # Один годинник на всі сенсори "хвилини до" замість таймера в кожному
+    hass.data[DOMAIN][DATA_CLOCK] = SvitloCountdownClock(hass)
+
     # Копіюємо blueprints при першому завантаженні компонента
     await hass.async_add_executor_job(_copy_blueprints, hass)
     return True
@@ -26,25 +70,41 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Svitlo.live v2 from a config entry."""
-    hass.data.setdefault(DOMAIN, {})
-    
-    # Фіксований інтервал опитування (15 хв)
+    hub: SvitloApiHub = hass.data[DOMAIN][DATA_HUB]
+
+    # Options flow пише змінені налаштування в entry.options — вони мають пріоритет
+    settings = {**entry.data, **entry.options}
     config = {
-        CONF_REGION: entry.data[CONF_REGION],
-        CONF_QUEUE: entry.data[CONF_QUEUE],
-        "scan_interval_seconds": DEFAULT_SCAN_INTERVAL,
+        CONF_REGION: settings[CONF_REGION],
+        # Одна entry — один координатор на всі її черги (старі entry мають лише CONF_QUEUE)
+        CONF_QUEUES: entry_queues(settings),
+        CONF_REGION_STATS: settings.get(CONF_REGION_STATS, False),
+        CONF_STALE_AFTER: settings.get(CONF_STALE_AFTER, DEFAULT_STALE_AFTER_HOURS),
+        CONF_MIN_POLL: settings.get(CONF_MIN_POLL, DEFAULT_MIN_POLL_MINUTES),
+        CONF_MAX_POLL: settings.get(CONF_MAX_POLL, DEFAULT_MAX_POLL_MINUTES),
     }
     
-    coordinator = SvitloCoordinator(hass, config)
+    coordinator = SvitloCoordinator(hass, config, hub)
     await coordinator.async_config_entry_first_refresh()
     
     hass.data[DOMAIN][entry.entry_id] = coordinator
+    # Далі оновлення приходять від таймера хаба (1 запит на всі entry)
+    entry.async_on_unload(hub.async_subscribe(coordinator))
+    # Фонове оновлення після старту з диска могло завершитись до підписки — підхоплюємо його
+    if hub.snapshot is not None:
+        coordinator.async_handle_api_update(hub.snapshot)
+    entry.async_on_unload(entry.add_update_listener(_async_reload_entry))
     
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     
     return True
 
 
+async def _async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Перезавантаження entry після змін в options flow."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload Svitlo.live v2 entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
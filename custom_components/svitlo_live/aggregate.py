@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, Mapping, Optional
+
+from .schedule import DaySchedule, SLOT_LABELS, SLOTS_PER_DAY
+
+_FULL = (1 << SLOTS_PER_DAY) - 1
+
+
+def column_add(planes: list[int], row: int) -> None:
+    """Додає рядок-маску до стовпцевих лічильників planes (на місці).
+
+    Лічильники тримаються бітовими зрізами (planes[k] — k-й біт лічильника кожного
+    слота), тож додавання рядка — двійкове додавання з переносом одразу для всіх
+    48 стовпців: O(log рядків) операцій над int замість 48.
+    """
+    carry = row
+    for k, plane in enumerate(planes):
+        planes[k] = plane ^ carry
+        carry &= plane
+        if not carry:
+            return
+    if carry:
+        planes.append(carry)
+
+
+def column_totals(planes: list[int]) -> tuple[int, ...]:
+    """Значення лічильників planes по 48 слотах."""
+    return tuple(
+        sum(((plane >> slot) & 1) << k for k, plane in enumerate(planes))
+        for slot in range(SLOTS_PER_DAY)
+    )
+
+
+def _column_counts(rows: Iterable[int]) -> tuple[int, ...]:
+    """Скільки рядків-масок мають біт у кожному з 48 слотів — один прохід по рядках."""
+    planes: list[int] = []
+    for row in rows:
+        column_add(planes, row)
+    return column_totals(planes)
+
+
+class RegionDay:
+    """Усі черги області на одну добу як 2-D матриця слотів: рядок — черга, стовпець — слот.
+
+    Рядки — бітові маски DaySchedule; стовпцеві суми (черг без світла / з відомим станом)
+    рахуються один раз при побудові, далі все — O(1) за індексом слота.
+    Незмінний: будується раз на новий знімок (або перехід доби).
+    """
+
+    __slots__ = ("queues", "off_masks", "off_counts", "known_counts", "change_mask")
+
+    def __init__(self, days: Mapping[str, DaySchedule]) -> None:
+        """days: queue -> DaySchedule цієї доби; черги без розкладу не рахуються."""
+        self.queues: tuple[str, ...] = tuple(queue for queue, day in days.items() if day.has_slots)
+        rows = [days[queue] for queue in self.queues]
+        self.off_masks: tuple[int, ...] = tuple(day.off_mask for day in rows)
+        self.off_counts = _column_counts(self.off_masks)
+        self.known_counts = _column_counts(day.on_mask | day.off_mask for day in rows)
+        # Слоти, на початку яких хоч одна черга вмикається чи вимикається
+        change = 0
+        for mask in self.off_masks:
+            change |= (mask ^ (mask << 1)) & _FULL
+        self.change_mask = change
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RegionDay):
+            return NotImplemented
+        return (
+            self.queues == other.queues
+            and self.off_masks == other.off_masks
+            and self.known_counts == other.known_counts
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.queues, self.off_masks))
+
+    def __repr__(self) -> str:
+        return f"RegionDay(queues={len(self.queues)}, peak={self.peak()})"
+
+    def __bool__(self) -> bool:
+        return bool(self.queues)
+
+    def queues_off(self, idx: int) -> list[str]:
+        bit = 1 << idx
+        return [queue for queue, mask in zip(self.queues, self.off_masks) if mask & bit]
+
+    def share(self, idx: int) -> Optional[float]:
+        """Частка черг без світла у слоті, % від черг з відомим станом."""
+        known = self.known_counts[idx]
+        return round(100 * self.off_counts[idx] / known, 1) if known else None
+
+    def shares(self) -> list[Optional[float]]:
+        return [self.share(idx) for idx in range(SLOTS_PER_DAY)]
+
+    def peak(self) -> Optional[int]:
+        """Перший слот з найбільшою кількістю черг без світла; None — відключень немає."""
+        most = max(self.off_counts)
+        return self.off_counts.index(most) if most else None
+
+    def next_change(self, idx: int) -> Optional[int]:
+        """Перший слот після idx, де змінюється набір черг без світла."""
+        later = self.change_mask >> (idx + 1)
+        if not later:
+            return None
+        return idx + 1 + ((later & -later).bit_length() - 1)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Для diagnostics: кількість черг без світла по слотах."""
+        peak = self.peak()
+        return {
+            "queues": list(self.queues),
+            "off_counts": dict(zip(SLOT_LABELS, self.off_counts)),
+            "peak": SLOT_LABELS[peak] if peak is not None else None,
+        }
+
+
+EMPTY_REGION_DAY = RegionDay({})
@@ -1,117 +1,790 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import logging
+import random
 from datetime import datetime, timedelta
-from typing import Any, Optional
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Iterable, Optional
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.helpers.storage import Store
 from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
 
-from .const import API_URL
+from .const import (
+    API_URL,
+    DEFAULT_MAX_POLL_MINUTES,
+    DEFAULT_MIN_POLL_MINUTES,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+)
+from .archive import ScheduleArchive
+from .polling import PollScheduler
+from .snapshot import ApiSnapshot, build_snapshot, restore_snapshot
+from .stream import RegionStreamParser
+from .telemetry import SvitloTelemetry
+
+if TYPE_CHECKING:
+    from .coordinator import SvitloCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
+# Таймзона України
+TZ_KYIV = dt_util.get_time_zone("Europe/Kyiv")
+
+# Мін інтервал між реальними фетчами: примусове опитування не ходить у мережу,
+# якщо JSON отримано менше ніж стільки секунд тому (напр. одразу після старту)
+MIN_REUSE_SECONDS = 120
+
+# Блок оновлень навколо опівночі (за Києвом)
+MIDNIGHT_BLOCK_MINUTES = 5  # 00:00–00:04
+
+# Таймаут HTTP-запиту до проксі (сек)
+FETCH_TIMEOUT = 30
+
+# Відповідь, більша за це, хешується/декодується/індексується в executor, а не в event loop
+# (повний JSON усіх областей ~300 КБ — це десятки мс на слабкому залізі)
+EXECUTOR_MIN_BYTES = 64 * 1024
+
+# Ще більшу відповідь (повний JSON усіх областей) розбираємо потоково по шматках і тримаємо
+# лише області/черги entry — повне тіло й повне дерево JSON у пам'ять не потрапляють.
+# Без Content-Length спершу читаємо до STREAM_MIN_BYTES: коротше тіло йде буферизованим шляхом.
+# Шматки розбираються в executor пачками по EXECUTOR_MIN_BYTES: один перехід у потік
+# на пачку, а в пам'яті понад буфер парсера — щонайбільше одна пачка сирих байтів
+STREAM_MIN_BYTES = 256 * 1024
+STREAM_CHUNK_BYTES = 16 * 1024
+
+# Статуси, якими старий проксі може відповісти на невідомий ?regions= —
+# тоді один раз перепитуємо повний JSON і далі фільтр не шлемо
+REGION_FILTER_REJECTED = (400, 404, 414, 422)
+
+# Повтори після збою: експоненційно від BACKOFF_BASE до BACKOFF_MAX (сек) з розкидом,
+# щоб усі HA на одному воркері не поверталися одночасно
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = DEFAULT_SCAN_INTERVAL
+
+# Після стількох збоїв поспіль "ланцюг розмикається": мережу не чіпаємо ~30 хв,
+# потім одна пробна спроба (half-open)
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_OPEN_SECONDS = 1800
+
+# Останній вдалий знімок на диску (.storage/svitlo_live.snapshot) — старт без мережі
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.snapshot"
+# Запис на диск відкладається й об'єднується; при зупинці HA Store дописує сам
+SAVE_DELAY = 10
+
 
 class SvitloApiHub:
-    """Єдиний хаб: 1 запит -> спільний JSON для всіх entry."""
+    """Єдиний fetch-рушій: 1 таймер -> 1 запит за цикл -> push у всі координатори."""
 
-    def __init__(self, hass: HomeAssistant) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        scan_interval: int = DEFAULT_SCAN_INTERVAL,
+        api_url: str = API_URL,
+    ) -> None:
         self.hass = hass
+        self.api_url = api_url
         self._session = async_get_clientsession(hass)
         self._lock = asyncio.Lock()
-        self._data: Optional[dict[str, Any]] = None
+        self._snapshot: Optional[ApiSnapshot] = None
         self._last_fetch_utc: Optional[datetime] = None
 
-        # Антидубль / кеш
-        self._debounce_sec = 15                      # мін інтервал між реальними фетчами
-        self._cache_ttl = timedelta(seconds=900)     # 15 хв (як скан-інтервал)
-        self._inflight: Optional[asyncio.Task] = None
+        # Умовні запити: валідатори від проксі + хеш тіла як запасний варіант
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._body_hash: Optional[str] = None
+
+        # Фільтр ?regions=: лише області активних entry (+ тих, що саме стартують).
+        # Проксі без підтримки фільтра -> повний JSON, як раніше.
+        self._region_filter = True
+        # (region, None) — entry зі зведеними сенсорами області: потрібні всі її черги
+        self._pending: set[tuple[str, Optional[str]]] = set()
+        # Що є в поточному знімку: region -> черги (None — усі); None — увесь JSON
+        self._selection: Optional[dict[str, Optional[frozenset[str]]]] = None
+
+        # Кеш живе весь цикл опитування — далі його оновлює таймер.
+        # Цикл адаптивний: scan_interval — базовий, межі задають опції entry.
+        self._scan_interval = timedelta(seconds=scan_interval)
+        self._cache_ttl = self._scan_interval
+        self.poller = PollScheduler(self._scan_interval)
+        self._last_poll_utc: Optional[datetime] = None
+
+        self._subscribers: list[SvitloCoordinator] = []
+        self._unsub_timer: Optional[Callable[[], None]] = None
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._refresh_task: Optional[asyncio.Task[None]] = None
 
-        # Сигнал готовності кешу для координування паралельних entry
-        self._ready_event = asyncio.Event()
+        # Збої поспіль і момент, раніше якого мережу не чіпаємо (backoff / розімкнений ланцюг)
+        self._failures = 0
+        self._retry_at: Optional[datetime] = None
+        self._retry_after: Optional[float] = None
+        self._unsub_retry: Optional[Callable[[], None]] = None
+
+        # Лічильники/гістограми фетчу — для diagnostics і діагностичних сенсорів
+        self.telemetry = SvitloTelemetry()
+        # Розклади минулих днів черг підписників (окремий Store) + довгострокова статистика
+        self.archive = ScheduleArchive(hass)
+
+    @property
+    def snapshot(self) -> Optional[ApiSnapshot]:
+        return self._snapshot
+
+    @property
+    def last_fetch_utc(self) -> Optional[datetime]:
+        return self._last_fetch_utc
+
+    @property
+    def age(self) -> Optional[timedelta]:
+        if self._last_fetch_utc is None:
+            return None
+        return dt_util.utcnow() - self._last_fetch_utc
 
     @property
-    def json(self) -> Optional[dict[str, Any]]:
-        return self._data
+    def failures(self) -> int:
+        return self._failures
+
+    @property
+    def retry_at(self) -> Optional[datetime]:
+        return self._retry_at
+
+    @property
+    def circuit_open(self) -> bool:
+        return self._failures >= CIRCUIT_FAILURE_THRESHOLD
+
+    @property
+    def region_filter(self) -> bool:
+        return self._region_filter
+
+    @property
+    def selection(self) -> Optional[dict[str, Optional[frozenset[str]]]]:
+        return self._selection
+
+    def _subscribed(self) -> set[tuple[str, str]]:
+        """Пари (region, queue) усіх черг активних entry."""
+        return {(s.region, queue) for s in self._subscribers for queue in s.queues}
+
+    def wanted(self) -> dict[str, Optional[frozenset[str]]]:
+        """Області й черги активних entry (+ тих, що саме стартують); None — усі черги області."""
+        pairs: set[tuple[str, Optional[str]]] = {*self._subscribed(), *self._pending}
+        pairs.update((s.region, None) for s in self._subscribers if s.region_wide)
+        wanted: dict[str, set[Optional[str]]] = {}
+        for region, queue in pairs:
+            wanted.setdefault(region, set()).add(queue)
+        return {
+            region: None if None in queues else frozenset(queues)
+            for region, queues in wanted.items()
+        }
+
+    def wanted_regions(self) -> list[str]:
+        """Відсортований набір областей для ?regions= (порожній -> повний JSON)."""
+        return sorted(self.wanted())
+
+    def _covers(self, region: Optional[str], queues: Optional[Iterable[str]] = ()) -> bool:
+        """Чи потрапили черги (None — уся область) в поточний знімок (відсутні в самому API — теж "покриті")."""
+        if region is None or self._snapshot is None or self._selection is None:
+            return True
+        if region not in self._selection:
+            return False
+        selected = self._selection[region]
+        if selected is None:
+            return True
+        return queues is not None and all(queue in selected for queue in queues)
 
     def is_fresh(self) -> bool:
-        return bool(self._last_fetch_utc and (dt_util.utcnow() - self._last_fetch_utc) < self._cache_ttl)
+        return self._age_below(self._cache_ttl)
+
+    def _age_below(self, max_age: timedelta) -> bool:
+        return bool(self._last_fetch_utc and (dt_util.utcnow() - self._last_fetch_utc) < max_age)
+
+    def poll_bounds(self) -> tuple[timedelta, timedelta]:
+        """Межі інтервалу: найвибагливіший entry перемагає (найменші мін і макс)."""
+        if not self._subscribers:
+            return (
+                timedelta(minutes=DEFAULT_MIN_POLL_MINUTES),
+                timedelta(minutes=DEFAULT_MAX_POLL_MINUTES),
+            )
+        return (
+            min(s.poll_bounds[0] for s in self._subscribers),
+            min(s.poll_bounds[1] for s in self._subscribers),
+        )
+
+    def awaiting_tomorrow(self) -> bool:
+        """Чи бракує комусь із підписників графіка на завтра (за датою Києва, не проксі).
+
+        Черга без розкладу на сьогодні (в області не публікують відключень) графіка на
+        завтра не чекає — інакше хаб щовечора сидів би на мінімальному інтервалі.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return False
+        base_day = dt_util.now(TZ_KYIV).date()
+        today = base_day.isoformat()
+        tomorrow = (base_day + timedelta(days=1)).isoformat()
+        for region, queue in self._subscribed():
+            days = snapshot.queue_days(region, queue)
+            if days.get(today) and not days.get(tomorrow):
+                return True
+        return False
+
+    # ---------------------------------------------------------------------
+    # Підписки
+    # ---------------------------------------------------------------------
+
+    @callback
+    def async_subscribe(self, subscriber: SvitloCoordinator) -> Callable[[], None]:
+        """Підписує координатор на спільні оновлення. Перший підписник запускає таймери."""
+        self._subscribers.append(subscriber)
+        if len(self._subscribers) == 1:
+            # завершені дні архіву -> довгострокова статистика (наздоганяє пропущене і далі щоночі)
+            self.archive.async_start()
+        self._pending.difference_update((subscriber.region, queue) for queue in (*subscriber.queues, None))
+        if self._snapshot is not None:
+            self.archive.async_record(self._snapshot, ((subscriber.region, queue) for queue in subscriber.queues))
+        # межі інтервалу могли змінитись — перепланувати від останнього опитування
+        self._async_schedule_poll()
+
+        @callback
+        def _unsubscribe() -> None:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+            if all(s.region != subscriber.region for s in self._subscribers):
+                # останній entry області: хвости її стартів (повторні refresh) теж більше не потрібні
+                self._pending = {pair for pair in self._pending if pair[0] != subscriber.region}
+            self._async_schedule_poll()
+            if not self._subscribers:
+                self._async_cancel_retry()
+                self.archive.async_stop()
+
+        return _unsubscribe
 
-    async def warm_once(self) -> None:
-        """Гарантовано прогріває кеш один раз; інші чекатимуть на готовність."""
-        # Вже свіже — просто позначаємо готовність
-        if self._data and self.is_fresh():
-            self._ready_event.set()
+    @callback
+    def _async_schedule_poll(self) -> None:
+        """Таймер наступного опитування: інтервал щоразу заново обирає PollScheduler."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        if not self._subscribers:
+            self.poller.next_poll = None
             return
 
-        async with self._lock:
-            if self._data and self.is_fresh():
-                self._ready_event.set()
-                return
+        now = dt_util.utcnow()
+        low, high = self.poll_bounds()
+        interval = self.poller.next_interval(now, low, high, self.awaiting_tomorrow())
+        self._cache_ttl = interval
+        next_poll = max((self._last_poll_utc or now) + interval, now + timedelta(seconds=1))
+        self.poller.next_poll = next_poll
+        self._unsub_timer = async_track_point_in_utc_time(self.hass, self._tick, next_poll)
 
-            # Якщо вже біжить фетч — чекаємо його завершення
-            if self._inflight and not self._inflight.done():
-                try:
-                    await self._inflight
-                finally:
-                    self._ready_event.set()
-                return
+    @callback
+    def _tick(self, _now: datetime) -> None:
+        self._unsub_timer = None
+        self.hass.async_create_task(self.async_poll())
 
-            # Запускаємо один спільний фетч
-            self._inflight = self.hass.async_create_task(self._fetch())
-            try:
-                await self._inflight
-            finally:
-                self._inflight = None
-                self._ready_event.set()
+    async def async_poll(self) -> None:
+        """Один цикл опитування: один запит на всіх, знімок — кожному підписнику.
+
+        Якщо відповідь не змінилась, хаб віддає той самий об'єкт ApiSnapshot —
+        координатори по ідентичності розуміють, що перебудовувати нічого.
+        """
+        self.telemetry.incr("polls")
+        self._last_poll_utc = dt_util.utcnow()
+        try:
+            snapshot = await self.ensure_data(force=True)
+        except Exception as e:  # помилку отримає кожен координатор
+            _LOGGER.debug("API hub: poll failed: %s", e)
+            for subscriber in list(self._subscribers):
+                subscriber.async_handle_api_error(e)
+            self._async_schedule_poll()
+            self.telemetry.async_notify()
+            return
 
-    async def wait_ready(self) -> None:
-        """Чекає, доки warm_once зробить кеш готовим."""
-        await self._ready_event.wait()
+        with self.telemetry.timer("push_ms"):
+            for subscriber in list(self._subscribers):
+                subscriber.async_handle_api_update(snapshot)
+        self._async_schedule_poll()
+        self.telemetry.async_notify()
+
+    @callback
+    def async_request_refresh(self) -> None:
+        """Фонове опитування (напр. після старту з диска); одночасні запити зливаються в один."""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._refresh_task = self.hass.async_create_task(self.async_poll())
+
+    # ---------------------------------------------------------------------
+    # Диск
+    # ---------------------------------------------------------------------
+
+    async def async_load(self) -> None:
+        """Піднімає останній збережений знімок, щоб entry стартували без мережі."""
+        await self.archive.async_load()
+        try:
+            data = await self._store.async_load()
+        except Exception as e:  # битий файл не повинен ламати старт
+            _LOGGER.warning("API hub: failed to load cached snapshot: %s", e)
+            return
+        if not data:
+            return
 
-    async def ensure_data(self) -> dict[str, Any]:
+        try:
+            self.poller.restore(data.get("polling") or {})
+        except (TypeError, ValueError) as e:
+            _LOGGER.debug("API hub: ignoring malformed polling history: %s", e)
+
+        try:
+            snapshot = restore_snapshot(data["snapshot"])
+            fetched = dt_util.parse_datetime(data["fetched"])
+        except (KeyError, IndexError, TypeError, ValueError, AttributeError) as e:
+            _LOGGER.warning("API hub: ignoring malformed cached snapshot: %s", e)
+            return
+        if fetched is None:
+            return
+        if data.get("api_url", API_URL) != self.api_url:
+            _LOGGER.debug("API hub: cached snapshot is from another endpoint, ignoring it")
+            return
+
+        self._snapshot = snapshot
+        self._last_fetch_utc = fetched
+        self._etag = data.get("etag")
+        self._last_modified = data.get("last_modified")
+        self._body_hash = data.get("body_hash")
+        self._region_filter = data.get("region_filter", True)
+        selection = data.get("selection", {region: None for region in snapshot.regions})
+        self._selection = (
+            {region: None if queues is None else frozenset(queues) for region, queues in selection.items()}
+            if selection is not None else None
+        )
+        _LOGGER.debug("API hub: restored snapshot fetched at %s from disk", fetched)
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        assert self._snapshot is not None and self._last_fetch_utc is not None
+        return {
+            "fetched": self._last_fetch_utc.isoformat(),
+            "api_url": self.api_url,
+            "etag": self._etag,
+            "last_modified": self._last_modified,
+            "body_hash": self._body_hash,
+            "region_filter": self._region_filter,
+            "selection": (
+                {region: None if queues is None else sorted(queues) for region, queues in self._selection.items()}
+                if self._selection is not None else None
+            ),
+            "polling": self.poller.as_dict(),
+            "snapshot": self._snapshot.as_dict(),
+        }
+
+    # ---------------------------------------------------------------------
+    # Дані
+    # ---------------------------------------------------------------------
+
+    async def async_get_startup_data(
+        self, stale_after: timedelta, region: Optional[str] = None, queues: Optional[Iterable[str]] = ()
+    ) -> ApiSnapshot:
+        """Дані для першого refresh entry.
+
+        Знімок (з диска чи пам'яті), не старший за stale_after, віддається одразу,
+        а оновлення з мережі йде у фоні. Старший — лише після мережевого фетчу.
+        Якщо у відфільтрованому знімку немає якоїсь черги entry — теж фетч (вже з нею).
+        queues=None — entry потрібна вся область (зведені сенсори).
         """
-        Повертає JSON. Фетчить мережу лише якщо кеш прострочений і пройшов debounce.
-        Всі одночасні виклики чекають одну in-flight задачу.
+        queues = None if queues is None else tuple(queues)
+        if region is not None:
+            self._pending.update((region, queue) for queue in queues or (None,))
+        if self._snapshot is not None and self._age_below(stale_after) and self._covers(region, queues):
+            if not self.is_fresh():
+                self.async_request_refresh()
+            return self._snapshot
+        try:
+            return await self.ensure_data(region=region, queues=queues)
+        except Exception:
+            # entry не стартує — його черги не повинні лишатись у ?regions= назавжди
+            if region is not None:
+                self.async_discard_pending(region, queues)
+            raise
+
+    @callback
+    def async_discard_pending(self, region: str, queues: Optional[Iterable[str]] = ()) -> None:
+        """Прибирає черги entry, що так і не підписалось (збій старту), з вибірки хаба."""
+        self._pending.difference_update((region, queue) for queue in queues or (None,))
+
+    async def ensure_data(
+        self, force: bool = False, region: Optional[str] = None, queues: Optional[Iterable[str]] = ()
+    ) -> ApiSnapshot:
+        """
+        Повертає індексований знімок JSON. Без force кеш живе весь цикл опитування;
+        з force мережа використовується, якщо з останнього фетчу минуло більше
+        MIN_REUSE_SECONDS. Знімок без потрібних черг (region/queues) кешем не вважається.
+        Всі одночасні виклики чекають один запит під локом.
         """
-        # Свіжий кеш — одразу
-        if self._data and self.is_fresh():
-            return self._data
+        queues = None if queues is None else tuple(queues)
+        max_age = timedelta(seconds=MIN_REUSE_SECONDS) if force else self._cache_ttl
+
+        if self._snapshot is not None and self._age_below(max_age) and self._covers(region, queues):
+            self.telemetry.incr("cache_reuse")
+            return self._snapshot
 
         async with self._lock:
-            now = dt_util.utcnow()
+            if self._snapshot is not None and self._age_below(max_age) and self._covers(region, queues):
+                # дочекались чужого фетчу під локом
+                self.telemetry.incr("cache_reuse")
+                return self._snapshot
 
-            if self._data and self.is_fresh():
-                return self._data
+            # -------- MIDNIGHT GUARD: 00:00–00:04 Europe/Kyiv --------
+            now_kyiv = dt_util.now(TZ_KYIV)
+            if now_kyiv.hour == 0 and now_kyiv.minute < MIDNIGHT_BLOCK_MINUTES:
+                self.telemetry.incr("midnight_guard")
+                if self._snapshot is None:
+                    # Старт рівно опівночі без кешу – взагалі не ліземо в API
+                    raise RuntimeError(
+                        "Midnight guard active (00:00–00:04 Europe/Kyiv) "
+                        "and no cached data available yet"
+                    )
+                _LOGGER.debug(
+                    "Midnight guard: 00:00–00:%02d Europe/Kyiv, "
+                    "reusing cached JSON from %s without new API call",
+                    MIDNIGHT_BLOCK_MINUTES - 1,
+                    self._last_fetch_utc,
+                )
+                return self._snapshot
 
-            if (
-                self._data
-                and self._last_fetch_utc
-                and (now - self._last_fetch_utc).total_seconds() < self._debounce_sec
-            ):
-                return self._data
+            # -------- BACKOFF / CIRCUIT BREAKER --------
+            # Під час паузи ні таймер, ні повтори entry не йдуть у мережу —
+            # підписники й далі працюють зі старим знімком, поки він не застарів
+            if self._retry_at is not None and dt_util.utcnow() < self._retry_at:
+                self.telemetry.incr("backoff_skips")
+                raise RuntimeError(
+                    f"API unavailable ({self._failures} failure(s) in a row), "
+                    f"next attempt at {self._retry_at.isoformat()}"
+                )
 
-            if self._inflight and not self._inflight.done():
-                await self._inflight
-                return self._data or {}
+            # Entry стартують пачкою (gather): один прохід циклу, щоб усі встигли
+            # додати свої області і перший запит пішов одразу з повним набором
+            await asyncio.sleep(0)
 
-            self._inflight = self.hass.async_create_task(self._fetch())
             try:
-                await self._inflight
-            finally:
-                self._inflight = None
+                with self.telemetry.timer("fetch_ms"):
+                    await self._fetch()
+            except Exception as e:
+                self.telemetry.incr("fetch_errors")
+                self._async_register_failure(e)
+                raise
+            self._async_register_success()
+            return self._snapshot
 
-            return self._data or {}
+    # ---------------------------------------------------------------------
+    # Повтори після збоїв
+    # ---------------------------------------------------------------------
+
+    @callback
+    def _async_register_failure(self, err: Exception) -> None:
+        self._failures += 1
+        if self._failures >= CIRCUIT_FAILURE_THRESHOLD:
+            delay = CIRCUIT_OPEN_SECONDS * random.uniform(0.8, 1.2)
+            if self._failures == CIRCUIT_FAILURE_THRESHOLD:
+                _LOGGER.warning(
+                    "API hub: %s failures in a row (%s), pausing requests for ~%d min",
+                    self._failures, err, CIRCUIT_OPEN_SECONDS // 60,
+                )
+        else:
+            ceiling = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (self._failures - 1))
+            delay = ceiling / 2 + random.uniform(0, ceiling / 2)
+        # Retry-After від проксі (429/503) — нижня межа паузи
+        delay = max(delay, self._retry_after or 0)
+
+        self._retry_at = dt_util.utcnow() + timedelta(seconds=delay)
+        _LOGGER.debug("API hub: failure #%s, next attempt in %.0f s", self._failures, delay)
+
+        self._async_cancel_retry()
+        if self._subscribers:
+            self._unsub_retry = async_track_point_in_utc_time(self.hass, self._retry, self._retry_at)
+
+    @callback
+    def _async_register_success(self) -> None:
+        if self._failures >= CIRCUIT_FAILURE_THRESHOLD:
+            _LOGGER.info("API hub: API is reachable again after %s failures", self._failures)
+        self._failures = 0
+        self._retry_at = None
+        self._async_cancel_retry()
+
+    @callback
+    def _retry(self, _now: datetime) -> None:
+        self._unsub_retry = None
+        self.async_request_refresh()
+
+    @callback
+    def _async_cancel_retry(self) -> None:
+        if self._unsub_retry is not None:
+            self._unsub_retry()
+            self._unsub_retry = None
+
+    # ---------------------------------------------------------------------
+    # Мережа
+    # ---------------------------------------------------------------------
+
+    @callback
+    def _async_probe_loop_block(self) -> None:
+        """Скільки event loop буде зайнятий від цього місця до найближчого await (loop_block_ms)."""
+        loop = self.hass.loop
+        start = loop.time()
+        loop.call_soon(lambda: self.telemetry.observe("loop_block_ms", (loop.time() - start) * 1000))
 
     async def _fetch(self) -> None:
-        """Реальний мережевий фетч (один на всіх)."""
-        _LOGGER.debug("API hub: fetching %s", API_URL)
-        async with self._session.get(API_URL, timeout=20) as resp:
-            if resp.status != 200:
-                raise RuntimeError(f"HTTP {resp.status} for {API_URL}")
-            data = await resp.json()
-
-        self._data = data
+        """Реальний мережевий фетч (один на всіх), умовний, якщо вже є знімок."""
+        self._retry_after = None
+        wanted = self.wanted()
+        headers: dict[str, str] = {}
+        # 304 має сенс лише якщо в знімку вже є все потрібне: нову чергу з
+        # повного JSON (розібраного вибірково) доведеться завантажити знову
+        if self._snapshot is not None and all(
+            self._covers(region, queues) for region, queues in wanted.items()
+        ):
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+            if self._last_modified:
+                headers["If-Modified-Since"] = self._last_modified
+
+        regions = sorted(wanted) if self._region_filter else []
+        params = {"regions": ",".join(regions)} if regions else None
+
+        _LOGGER.debug("API hub: fetching %s (regions: %s)", self.api_url, regions or "all")
+        self.telemetry.incr("requests")
+        streamed = None
+        async with self._session.get(
+            self.api_url, params=params, headers=headers, timeout=FETCH_TIMEOUT
+        ) as resp:
+            rejected = params is not None and resp.status in REGION_FILTER_REJECTED
+            if not rejected and resp.status == 304 and self._snapshot is not None:
+                self._last_fetch_utc = dt_util.utcnow()
+                self._async_schedule_save()
+                self.telemetry.incr("not_modified")
+                _LOGGER.debug("API hub: 304 Not Modified, keeping current snapshot")
+                return
+            if not rejected and resp.status != 200:
+                self._retry_after = _parse_retry_after(resp.headers.get("Retry-After"))
+                raise RuntimeError(f"HTTP {resp.status} for {self.api_url}")
+            if not rejected:
+                etag = resp.headers.get("ETag")
+                last_modified = resp.headers.get("Last-Modified")
+                length = resp.content_length
+                if wanted and (length is None or length >= STREAM_MIN_BYTES):
+                    chunks = resp.content.iter_chunked(STREAM_CHUNK_BYTES)
+                    # розмір невідомий — голова тіла вирішує, чи варто розбирати потоково
+                    head = [] if length is not None else await _async_read_head(chunks, STREAM_MIN_BYTES)
+                    if length is None and sum(map(len, head)) < STREAM_MIN_BYTES:
+                        body = b"".join(head)
+                    else:
+                        streamed = await self._async_read_streaming(chunks, head, wanted, bool(params))
+                else:
+                    body = await resp.read()
+
+        if rejected:
+            # Проксі не знає ?regions= — повний JSON, і далі без фільтра
+            _LOGGER.info(
+                "API hub: %s rejected the regions filter (HTTP %s), using the full payload",
+                self.api_url, resp.status,
+            )
+            self._region_filter = False
+            self.telemetry.incr("region_filter_rejected")
+            await self._fetch()
+            return
+
+        self._etag = etag
+        self._last_modified = last_modified
         self._last_fetch_utc = dt_util.utcnow()
+
+        if streamed is not None:
+            body_hash, snapshot, selection = streamed
+        else:
+            self.telemetry.observe("payload_bytes", len(body))
+            # Відфільтрований проксі віддає всі черги запитаних областей
+            selection = {region: None for region in regions} if regions else None
+            # Проксі може не віддавати валідатори — тоді порівнюємо хеш тіла.
+            # Хеш, декодування (orjson) і індекс — один прохід; великий JSON — в executor.
+            known_hash = self._body_hash if self._snapshot is not None and selection == self._selection else None
+            self._async_probe_loop_block()
+            if len(body) >= EXECUTOR_MIN_BYTES:
+                start = perf_counter()
+                body_hash, snapshot, timings = await self.hass.async_add_executor_job(
+                    _process_body, body, known_hash
+                )
+                self.telemetry.observe("executor_ms", (perf_counter() - start) * 1000)
+                self.telemetry.incr("executor_jobs")
+                # далі до першого await — запис знімка і push у координатори
+                self._async_probe_loop_block()
+            else:
+                body_hash, snapshot, timings = _process_body(body, known_hash)
+            for name, value in timings.items():
+                self.telemetry.observe(name, value)
+
+        if snapshot is None:
+            self._async_schedule_save()
+            self.telemetry.incr("body_unchanged")
+            _LOGGER.debug("API hub: response body unchanged, skipping JSON decode")
+            return
+
+        if streamed is None and regions and not set(snapshot.regions) <= set(regions):
+            # Зайві області -> проксі ігнорує ?regions=; далі канонічний URL без параметра
+            _LOGGER.debug("API hub: %s ignores the regions filter, disabling it", self.api_url)
+            self._region_filter = False
+            selection = None
+
+        if self._schedule_changed(self._snapshot, snapshot):
+            self.poller.record_change(dt_util.utcnow())
+            self.telemetry.incr("schedule_changes")
+
+        # JSON розібрано один раз на фетч — далі координатори лише читають індекс
+        self._snapshot = snapshot
+        self._selection = selection
+        self._body_hash = body_hash
+        self._async_schedule_save()
+        self.archive.async_record(snapshot, self._subscribed())
+        _LOGGER.debug("Fetched API once for all entries (%s)", self.api_url)
+
+    def _schedule_changed(self, old: Optional[ApiSnapshot], new: ApiSnapshot) -> bool:
+        """Реальна зміна/публікація розкладу черги підписника (для навчання інтервалу).
+
+        Новий день без слотів (перехід через північ) — не зміна; поява графіка на завтра — зміна.
+        """
+        if old is None:
+            return False
+        for region, queue in self._subscribed():
+            old_days = old.queue_days(region, queue)
+            for day, schedule in new.queue_days(region, queue).items():
+                if schedule.has_slots and old_days.get(day) != schedule:
+                    return True
+        return False
+
+    async def _async_read_streaming(
+        self,
+        chunks: AsyncIterator[bytes],
+        head: list[bytes],
+        wanted: dict[str, Optional[frozenset[str]]],
+        filtered: bool,
+    ) -> tuple[str, Optional[ApiSnapshot], dict[str, Optional[frozenset[str]]]]:
+        """Потоковий розбір тіла (вже прочитана голова head + решта chunks):
+        у знімок потрапляють лише області/черги entry.
+
+        Шматки збираються в пачку й розбираються в executor, поки мережа віддає
+        наступні, — event loop лише читає сокет. Повертає
+        (hash тіла, знімок або None, якщо нічого не змінилось, вибірку).
+        """
+        selection: dict[str, Optional[frozenset[str]]] = dict(wanted)
+        known_hash = self._body_hash if self._snapshot is not None and selection == self._selection else None
+        parser = RegionStreamParser(selection)
+        digest = hashlib.sha256()
+        batch = list(head)
+        batch_size = size = sum(map(len, head))
+        parse_ms = 0.0
+        async for chunk in chunks:
+            batch.append(chunk)
+            batch_size += len(chunk)
+            size += len(chunk)
+            if batch_size >= EXECUTOR_MIN_BYTES:
+                parse_ms += await self._async_stream_job(_stream_feed, parser, digest, batch)
+                batch, batch_size = [], 0
+
+        body_hash, snapshot, timings = await self._async_stream_job(
+            _stream_finish, parser, digest, batch, known_hash
+        )
+        self.telemetry.incr("streamed")
+        self.telemetry.observe("payload_bytes", size)
+        self.telemetry.observe("stream_peak_bytes", parser.peak)
+        timings["decode_ms"] = timings.get("decode_ms", 0.0) + parse_ms
+        for name, value in timings.items():
+            self.telemetry.observe(name, value)
+        if filtered and parser.skipped:
+            _LOGGER.debug("API hub: %s ignores the regions filter, disabling it", self.api_url)
+            self._region_filter = False
+        return body_hash, snapshot, selection
+
+    async def _async_stream_job(self, target: Callable[..., Any], *args: Any) -> Any:
+        """Крок потокового розбору в executor (з тією ж телеметрією, що й _process_body)."""
+        start = perf_counter()
+        result = await self.hass.async_add_executor_job(target, *args)
+        self.telemetry.observe("executor_ms", (perf_counter() - start) * 1000)
+        self.telemetry.incr("executor_jobs")
+        return result
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After у секундах (формат HTTP-дати проксі не використовує)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+async def _async_read_head(chunks: AsyncIterator[bytes], limit: int) -> list[bytes]:
+    """Шматки з початку тіла, поки їх сумарно менше за limit (або до кінця тіла)."""
+    head: list[bytes] = []
+    size = 0
+    async for chunk in chunks:
+        head.append(chunk)
+        size += len(chunk)
+        if size >= limit:
+            break
+    return head
+
+
+def _stream_feed(parser: RegionStreamParser, digest: Any, chunks: list[bytes]) -> float:
+    """Пачка шматків у хеш і парсер; повертає час розбору в мс. Парсер і хеш у цей
+    момент не чіпає ніхто інший (хаб чекає на крок), тож виконується в executor."""
+    start = perf_counter()
+    for chunk in chunks:
+        digest.update(chunk)
+        parser.feed(chunk)
+    return (perf_counter() - start) * 1000
+
+
+def _stream_finish(
+    parser: RegionStreamParser, digest: Any, chunks: list[bytes], known_hash: Optional[str]
+) -> tuple[str, Optional[ApiSnapshot], dict[str, float]]:
+    """Залишок тіла -> кінець розбору -> ApiSnapshot; результат як у _process_body."""
+    decode_ms = _stream_feed(parser, digest, chunks)
+    start = perf_counter()
+    api = parser.finish()
+    decoded = perf_counter()
+    body_hash = digest.hexdigest()
+    if body_hash == known_hash:
+        return body_hash, None, {"decode_ms": decode_ms + (decoded - start) * 1000}
+    snapshot = build_snapshot(api)
+    return body_hash, snapshot, {
+        "decode_ms": decode_ms + (decoded - start) * 1000,
+        "snapshot_build_ms": (perf_counter() - decoded) * 1000,
+    }
+
+
+def _process_body(body: bytes, known_hash: Optional[str]) -> tuple[str, Optional[ApiSnapshot], dict[str, float]]:
+    """Хеш тіла -> (якщо змінилось) orjson-декодування -> ApiSnapshot.
+
+    Чиста функція без HA-стану: безпечно виконується в потоці executor.
+    Повертає (hash, snapshot або None, якщо тіло не змінилось, часи етапів у мс).
+    """
+    body_hash = hashlib.sha256(body).hexdigest()
+    if body_hash == known_hash:
+        return body_hash, None, {}
+
+    start = perf_counter()
+    api = json_loads(body)
+    decoded = perf_counter()
+    if not isinstance(api, dict):
+        raise ValueError("Unexpected API payload: JSON object expected")
+    snapshot = build_snapshot(api)
+    built = perf_counter()
+    return body_hash, snapshot, {
+        "decode_ms": (decoded - start) * 1000,
+        "snapshot_build_ms": (built - decoded) * 1000,
+    }
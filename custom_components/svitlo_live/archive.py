@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import logging
+import re
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Iterable, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .forecast import OutageProfile
+from .schedule import DaySchedule
+from .slots import TZ_KYIV, day_stats, slot_boundaries
+from .snapshot import ApiSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+# Архів розкладів на диску (.storage/svitlo_live.archive): по два 48-бітні числа на день
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.archive"
+# Архів змінюється щонайбільше раз на опитування — пишемо рідше за знімок
+SAVE_DELAY = 60
+
+# Скільки днів тримаємо: понад рік — щоб профіль за днями тижня мав кілька сезонів
+DEFAULT_RETENTION_DAYS = 400
+
+# Імпорт довгострокової статистики — трохи після півночі за Києвом, коли доба завершилась
+IMPORT_DELAY = timedelta(minutes=5)
+
+# Одиниця та назва зовнішньої статистики (svitlo_live:outage_minutes_<region>_<queue>)
+STAT_UNIT = "min"
+_STAT_ID_INVALID = re.compile(r"[^a-z0-9]+")
+
+
+def statistic_id(region: str, queue: str) -> str:
+    """ID зовнішньої статистики: лише [a-z0-9_], без подвійних "_"."""
+    slug = _STAT_ID_INVALID.sub("_", f"{region}_{queue}".lower()).strip("_")
+    return f"{DOMAIN}:outage_minutes_{slug}"
+
+
+class ScheduleArchive:
+    """Архів розкладів по днях для кожної (region, queue), що її колись відстежував entry.
+
+    Лише додає: минула доба (за Києвом) більше не переписується, сьогодні/завтра
+    оновлюються, доки проксі їх змінює. Дні старші за retention_days відкидаються.
+    Раз на добу завершені дні йдуть у довгострокову статистику HA одним пакетом
+    (хвилини відключень за добу + наростаючий підсумок).
+    """
+
+    def __init__(self, hass: HomeAssistant, retention_days: int = DEFAULT_RETENTION_DAYS) -> None:
+        self.hass = hass
+        self.retention_days = retention_days
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        # (region, queue) -> date_iso -> DaySchedule
+        self._days: dict[tuple[str, str], dict[str, DaySchedule]] = {}
+        # (region, queue) -> (остання імпортована доба, наростаючий підсумок хвилин)
+        self._imported: dict[tuple[str, str], tuple[str, float]] = {}
+        self._unsub_import: Optional[Callable[[], None]] = None
+        # (region, queue) -> профіль за днем тижня; доповнюється новими завершеними днями
+        self._profiles: dict[tuple[str, str], OutageProfile] = {}
+
+    # ---------------------------------------------------------------------
+    # Запити
+    # ---------------------------------------------------------------------
+
+    def profile(self, region: str, queue: str) -> OutageProfile:
+        """Профіль відключень черги з завершених днів архіву (інкрементально, без повторного проходу)."""
+        key = (region, queue)
+        profile = self._profiles.get(key)
+        if profile is None:
+            profile = self._profiles[key] = OutageProfile()
+        today_iso = dt_util.now(TZ_KYIV).date().isoformat()
+        for day, schedule in self._days.get(key, {}).items():
+            if profile.through < day < today_iso:
+                profile.add(date.fromisoformat(day), schedule)
+        return profile
+
+    def as_dict(self) -> dict[str, Any]:
+        """Для diagnostics: скільки днів і що вже в статистиці."""
+        return {
+            "retention_days": self.retention_days,
+            "queues": {
+                f"{region}/{queue}": {
+                    "days": len(days),
+                    "first": next(iter(days), None),
+                    "last": next(reversed(days), None) if days else None,
+                    "imported_through": self._imported.get((region, queue), (None,))[0],
+                }
+                for (region, queue), days in sorted(self._days.items())
+            },
+        }
+
+    # ---------------------------------------------------------------------
+    # Запис
+    # ---------------------------------------------------------------------
+
+    @callback
+    def async_record(self, snapshot: ApiSnapshot, pairs: Iterable[tuple[str, str]]) -> int:
+        """Додає дні зі знімка для черг pairs; повертає кількість нових/змінених днів."""
+        today = dt_util.now(TZ_KYIV).date()
+        today_iso = today.isoformat()
+        cutoff = (today - timedelta(days=self.retention_days)).isoformat()
+        added = 0
+        for region, queue in pairs:
+            archived = self._days.get((region, queue))
+            before = added
+            for day, schedule in snapshot.queue_days(region, queue).items():
+                # минула доба заморожена: пізніший знімок її не переписує
+                if not schedule.has_slots or day < today_iso:
+                    continue
+                if archived is None:
+                    archived = self._days[(region, queue)] = {}
+                if archived.get(day) == schedule:
+                    continue
+                archived[day] = schedule
+                added += 1
+            if added > before:
+                trimmed = self._trimmed(archived, cutoff)
+                if len(trimmed) < len(archived):
+                    # дні поза retention випали — профіль перебудується з того, що лишилось
+                    self._profiles.pop((region, queue), None)
+                self._days[(region, queue)] = trimmed
+        if added:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        return added
+
+    @staticmethod
+    def _trimmed(days: dict[str, DaySchedule], cutoff: str) -> dict[str, DaySchedule]:
+        """Дні в хронологічному порядку без старших за cutoff."""
+        return {day: days[day] for day in sorted(days) if day >= cutoff}
+
+    # ---------------------------------------------------------------------
+    # Диск
+    # ---------------------------------------------------------------------
+
+    async def async_load(self) -> None:
+        try:
+            data = await self._store.async_load()
+        except Exception as e:  # битий файл не повинен ламати старт
+            _LOGGER.warning("Archive: failed to load: %s", e)
+            return
+        if not data:
+            return
+        cutoff = (dt_util.now(TZ_KYIV).date() - timedelta(days=self.retention_days)).isoformat()
+        for key, item in (data.get("queues") or {}).items():
+            try:
+                region, queue = key.split("/", 1)
+                days = {day: DaySchedule(int(on), int(off)) for day, (on, off) in item["days"].items()}
+                imported = item.get("imported")
+            except (KeyError, TypeError, ValueError) as e:
+                _LOGGER.debug("Archive: ignoring malformed entry %s: %s", key, e)
+                continue
+            self._days[(region, queue)] = self._trimmed(days, cutoff)
+            if imported:
+                self._imported[(region, queue)] = (str(imported[0]), float(imported[1]))
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "queues": {
+                f"{region}/{queue}": {
+                    "days": {day: [sched.on_mask, sched.off_mask] for day, sched in days.items()},
+                    "imported": list(self._imported[(region, queue)]) if (region, queue) in self._imported else None,
+                }
+                for (region, queue), days in self._days.items()
+            },
+        }
+
+    # ---------------------------------------------------------------------
+    # Довгострокова статистика
+    # ---------------------------------------------------------------------
+
+    @callback
+    def async_start(self) -> None:
+        """Імпорт того, що накопичилось (напр. поки HA був вимкнений), і таймер на кожну північ."""
+        self._async_import_statistics()
+        self._async_schedule_import()
+
+    @callback
+    def async_stop(self) -> None:
+        if self._unsub_import is not None:
+            self._unsub_import()
+            self._unsub_import = None
+
+    @callback
+    def _async_schedule_import(self) -> None:
+        self.async_stop()
+        midnight = slot_boundaries(dt_util.now(TZ_KYIV).date())[-1]
+
+        @callback
+        def _run(_now: datetime) -> None:
+            self._unsub_import = None
+            self._async_import_statistics()
+            self._async_schedule_import()
+
+        self._unsub_import = async_track_point_in_utc_time(self.hass, _run, midnight + IMPORT_DELAY)
+
+    @callback
+    def _async_import_statistics(self) -> None:
+        """Завершені дні, яких ще немає в статистиці, — одним викликом на чергу."""
+        if "recorder" not in self.hass.config.components:
+            _LOGGER.debug("Archive: recorder is not loaded, statistics import postponed")
+            return
+        # recorder — необов'язкова залежність: імпорт лише коли він є
+        from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+        today_iso = dt_util.now(TZ_KYIV).date().isoformat()
+        changed = False
+        for (region, queue), days in self._days.items():
+            last, total = self._imported.get((region, queue), ("", 0.0))
+            rows: list[dict[str, Any]] = []
+            for day, schedule in days.items():
+                if not last < day < today_iso:
+                    continue
+                stats = day_stats(date.fromisoformat(day), schedule)
+                if stats is None:
+                    continue
+                total += stats["off_minutes"]
+                # рядок статистики — на початок доби (північ за Києвом, ціла година в UTC)
+                rows.append(
+                    {
+                        "start": slot_boundaries(date.fromisoformat(day))[0],
+                        "state": stats["off_minutes"],
+                        "sum": total,
+                    }
+                )
+                last = day
+            if not rows:
+                continue
+            metadata = {
+                "has_mean": False,
+                "has_sum": True,
+                "name": f"Svitlo • {region} / {queue} outage minutes",
+                "source": DOMAIN,
+                "statistic_id": statistic_id(region, queue),
+                "unit_of_measurement": STAT_UNIT,
+            }
+            async_add_external_statistics(self.hass, metadata, rows)
+            self._imported[(region, queue)] = (last, total)
+            changed = True
+            _LOGGER.debug("Archive: imported %d day(s) of %s/%s into statistics", len(rows), region, queue)
+        if changed:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
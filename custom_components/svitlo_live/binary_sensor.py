@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Any
+from typing import Any, Optional
 
 from homeassistant.core import HomeAssistant
 from homeassistant.components.binary_sensor import (
@@ -17,17 +17,27 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities([SvitloElectricityStatusBinary(coordinator, entry)])
+    async_add_entities(
+        [SvitloElectricityStatusBinary(coordinator, entry, queue) for queue in coordinator.queues]
+    )
 
 
 class SvitloBaseEntity(CoordinatorEntity):
-    def __init__(self, coordinator) -> None:
-        super().__init__(coordinator)
+    def __init__(self, coordinator, queue: str) -> None:
+        # контекст = черга: координатор будить ентіті лише при зміні її payload
+        super().__init__(coordinator, context=queue)
+        self._queue = queue
+
+    @property
+    def queue_data(self) -> Optional[dict[str, Any]]:
+        """payload черги цієї ентіті (None — даних ще немає)."""
+        data = getattr(self.coordinator, "data", None)
+        return data.get(self._queue) if data else None
 
     @property
     def device_info(self) -> dict[str, Any]:
         region = getattr(self.coordinator, "region", "region")
-        queue = getattr(self.coordinator, "queue", "queue")
+        queue = self._queue
         return {
             "identifiers": {(DOMAIN, f"{region}_{queue}")},
             "manufacturer": "svitlo.live",
@@ -48,13 +58,13 @@ class SvitloElectricityStatusBinary(SvitloBaseEntity, BinarySensorEntity):
     _attr_name = "Electricity status"
     _attr_device_class = BinarySensorDeviceClass.POWER
 
-    def __init__(self, coordinator, entry: ConfigEntry) -> None:
-        super().__init__(coordinator)
-        self._attr_unique_id = f"{entry.entry_id}_power_{coordinator.region}_{coordinator.queue}"
+    def __init__(self, coordinator, entry: ConfigEntry, queue: str) -> None:
+        super().__init__(coordinator, queue)
+        self._attr_unique_id = f"{entry.entry_id}_power_{coordinator.region}_{queue}"
 
     @property
     def is_on(self) -> bool | None:
-        data = getattr(self.coordinator, "data", None)
+        data = self.queue_data
 
         # Якщо даних немає або останнє оновлення неуспішне — Unknown
         if not data or not getattr(self.coordinator, "last_update_success", False):
@@ -73,9 +83,10 @@ class SvitloElectricityStatusBinary(SvitloBaseEntity, BinarySensorEntity):
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        d = getattr(self.coordinator, "data", {}) or {}
+        d = self.queue_data or {}
         return {
             "next_change_at": d.get("next_change_at"),
             "queue": d.get("queue"),
             "status_raw": d.get("now_status"),
+            "stale": getattr(self.coordinator, "stale", False),
         }
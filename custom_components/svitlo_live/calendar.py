@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from typing import Any, List, Optional
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Any, Hashable, List, Optional
 
 from homeassistant.components.calendar import CalendarEntity, CalendarEvent
 from homeassistant.config_entries import ConfigEntry
@@ -12,6 +13,9 @@ from homeassistant.util import dt as dt_util
 from homeassistant.helpers import device_registry as dr  # ⬅️ додано
 
 from .const import DOMAIN
+from .forecast import LikelyOff
+from .schedule import DaySchedule
+from .slots import slot_boundaries, slot_label
 
 # Таймзона України (не імпортуємо з coordinator, щоб уникнути циклу)
 TZ_KYIV = dt_util.get_time_zone("Europe/Kyiv")
@@ -24,21 +28,29 @@ async def async_setup_entry(
 ) -> None:
     coordinator = hass.data[DOMAIN][entry.entry_id]
     # ⬇️ передаємо entry, щоб за бажанням у майбутньому тягнути options — не завадить
-    async_add_entities([SvitloCalendar(coordinator, entry)])
+    async_add_entities([SvitloCalendar(coordinator, entry, queue) for queue in coordinator.queues])
 
 
 class SvitloCalendar(CoordinatorEntity, CalendarEntity):
     """Календар відключень світла для конкретного регіону/черги."""
 
-    def __init__(self, coordinator, entry: ConfigEntry) -> None:
-        super().__init__(coordinator)
+    def __init__(self, coordinator, entry: ConfigEntry, queue: str) -> None:
+        # контекст = черга: координатор будить календар лише при зміні її payload
+        super().__init__(coordinator, context=queue)
         self._entry = entry
         self._region = getattr(coordinator, "region", "region")
-        self._queue = getattr(coordinator, "queue", "queue")
+        self._queue = queue
 
         self._attr_unique_id = f"svitlo_calendar_{self._region}_{self._queue}"
         self._event: Optional[CalendarEvent] = None
 
+        # Індекс подій: відсортовані та неперекривні, тож і starts, і ends монотонні.
+        # Перебудовується лише коли змінюється розклад (або назва пристрою в описі).
+        self._index_key: Optional[Hashable] = None
+        self._events: List[CalendarEvent] = []
+        self._starts: List[datetime] = []
+        self._ends: List[datetime] = []
+
     # Динамічне ім'я ентіті: підтягуємо назву пристрою, якщо користувач її змінив
     @property
     def name(self) -> str:
@@ -52,19 +64,17 @@ class SvitloCalendar(CoordinatorEntity, CalendarEntity):
 
     async def async_update(self) -> None:
         """Оновити self._event з координатора (поточна або найближча)."""
-        now_utc = dt_util.utcnow()
-        # беремо події за сьогодні+завтра із запасом
-        start = now_utc - timedelta(days=1)
-        end = now_utc + timedelta(days=2)
-        events = await self.async_get_events(self.hass, start, end)
-
-        # відсортуємо, знайдемо поточну або найближчу
-        events.sort(key=lambda e: e.start)
-        current = next((e for e in events if e.start <= now_utc < e.end), None)
-        upcoming = next((e for e in events if e.start > now_utc), None)
-        self._event = current or upcoming
+        self._ensure_index()
+        # перша подія, що ще не закінчилась, — це поточна, а якщо такої немає, то найближча
+        i = bisect_right(self._ends, dt_util.utcnow())
+        self._event = self._events[i] if i < len(self._events) else None
 
     # ---- стандартні штуки ----
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        # region/queue — щоб блупрінти зіставляли календар з подією svitlo_live_schedule_changed
+        return {"region": self._region, "queue": self._queue}
+
     @property
     def available(self) -> bool:
         return bool(self.coordinator.last_update_success)
@@ -85,80 +95,91 @@ class SvitloCalendar(CoordinatorEntity, CalendarEntity):
     ) -> List[CalendarEvent]:
         """
         Повертаємо події 'Немає світла' у вказаному діапазоні.
-        Події створюються на базі today_48half / tomorrow_48half з координатора.
+        Події беруться з індексу (today_schedule / tomorrow_schedule з координатора
+        + прогноз на наступні дні), діапазон вибирається двома бінарними пошуками.
         """
-        d = getattr(self.coordinator, "data", {}) or {}
-        today_half = d.get("today_48half") or []
-        tomorrow_half = d.get("tomorrow_48half") or []
-        date_today_str = d.get("date")
-        date_tomorrow_str = d.get("tomorrow_date")
+        self._ensure_index()
+        start_utc = dt_util.as_utc(start_date)
+        end_utc = dt_util.as_utc(end_date)
+        # перетин з [start; end): ev.end > start і ev.start < end
+        lo = bisect_right(self._ends, start_utc)
+        hi = bisect_left(self._starts, end_utc, lo)
+        return self._events[lo:hi]
+
+    def _ensure_index(self) -> None:
+        """Перебудовує відсортований список подій, лише якщо змінились дні чи їх розклад."""
+        d = (getattr(self.coordinator, "data", None) or {}).get(self._queue) or {}
+        label = self._device_label()
+        key = (
+            d.get("date"),
+            d.get("today_schedule"),
+            d.get("tomorrow_date"),
+            d.get("tomorrow_schedule"),
+            d.get("forecast"),
+            label,
+        )
+        if key == self._index_key:
+            return
 
         events: List[CalendarEvent] = []
-        events.extend(self._build_day_events(date_today_str, today_half))
-        events.extend(self._build_day_events(date_tomorrow_str, tomorrow_half))
-
-        # Фільтрація за діапазоном, який запросив HA
-        filtered: List[CalendarEvent] = []
-        for ev in events:
-            ev_start = ev.start if ev.start.tzinfo else dt_util.as_utc(ev.start)
-            ev_end = ev.end if ev.end.tzinfo else dt_util.as_utc(ev.end)
-            if ev_start < end_date and ev_end > start_date:
-                filtered.append(ev)
-
-        return filtered
-
-    def _build_day_events(self, date_str: str | None, halfhours: list[str]) -> List[CalendarEvent]:
-        """Генеруємо події для одного дня (послідовності 'off' у 48 слотах)."""
-        if not date_str or not halfhours or len(halfhours) != 48:
+        events.extend(self._build_day_events(d.get("date"), d.get("today_schedule"), label))
+        events.extend(self._build_day_events(d.get("tomorrow_date"), d.get("tomorrow_schedule"), label))
+        # Далі за опублікований графік — попередні події з прогнозу архіву (до FORECAST_DAYS)
+        events.extend(self._build_forecast_events(d.get("forecast") or (), label))
+        events.sort(key=lambda e: e.start)
+
+        self._events = events
+        self._starts = [ev.start for ev in events]
+        self._ends = [ev.end for ev in events]
+        self._index_key = key
+
+    def _build_day_events(
+        self, date_str: str | None, day: Optional[DaySchedule], label: str
+    ) -> List[CalendarEvent]:
+        """Генеруємо події для одного дня (суцільні серії 'off' у 48 слотах)."""
+        if not date_str or not day:
             return []
 
         base_day = datetime.fromisoformat(date_str).date()
+        bounds = slot_boundaries(base_day)
+        # Якщо день завершується у стані "off" — остання серія йде до півночі (end_idx = 48).
+        # Серія лише з неіснуючих (весняний перехід) слотів має нульову довжину — пропускаємо.
+        return [
+            self._make_event(bounds, start_idx, end_idx, label)
+            for start_idx, end_idx in day.off_intervals()
+            if bounds[start_idx] < bounds[end_idx]
+        ]
+
+    def _build_forecast_events(self, windows: tuple[LikelyOff, ...], label: str) -> List[CalendarEvent]:
+        """Попередні (tentative) події "ймовірно без світла" на дні без опублікованого графіка."""
+        prefix = f"[{label}]"
         events: List[CalendarEvent] = []
-
-        current_state = halfhours[0]
-        start_idx = 0
-
-        for i in range(1, 48):
-            if halfhours[i] != current_state:
-                if current_state == "off":
-                    events.append(self._make_event(base_day, start_idx, i))
-                current_state = halfhours[i]
-                start_idx = i
-
-        # Якщо день завершується у стані "off" — подія до півночі
-        if current_state == "off":
-            events.append(self._make_event(base_day, start_idx, 48))
-
-        return events
-
-    def _make_event(self, day, start_idx: int, end_idx: int) -> CalendarEvent:
-        """Створює CalendarEvent для проміжку [start_idx; end_idx) у півгодинах."""
-        start_h = start_idx // 2
-        start_m = 30 if start_idx % 2 else 0
-        end_h = end_idx // 2
-        end_m = 30 if end_idx % 2 else 0
-
-        start_local = datetime.combine(day, datetime.min.time()).replace(
-            hour=start_h, minute=start_m, tzinfo=TZ_KYIV
-        )
-        if end_idx < 48:
-            end_local = datetime.combine(day, datetime.min.time()).replace(
-                hour=end_h, minute=end_m, tzinfo=TZ_KYIV
-            )
-        else:
-            end_local = datetime.combine(day + timedelta(days=1), datetime.min.time()).replace(
-                tzinfo=TZ_KYIV
+        for window in windows:
+            bounds = slot_boundaries(datetime.fromisoformat(window.day).date())
+            if not bounds[window.start] < bounds[window.end]:
+                continue
+            events.append(
+                CalendarEvent(
+                    summary=f"{prefix} ❔ Ймовірне відключення (прогноз)",
+                    start=bounds[window.start],
+                    end=bounds[window.end],
+                    description=(
+                        f"{prefix} Графіка ще немає; за архівом світла не було "
+                        f"{slot_label(window.start)}–{slot_label(window.end)} "
+                        f"у {round(window.probability * 100)}% таких днів тижня"
+                    ),
+                )
             )
+        return events
 
-        start_utc = dt_util.as_utc(start_local)
-        end_utc = dt_util.as_utc(end_local)
-
-        prefix = f"[{self._device_label()}]"
+    def _make_event(self, bounds, start_idx: int, end_idx: int, label: str) -> CalendarEvent:
+        """Створює CalendarEvent для проміжку [start_idx; end_idx) у півгодинах (межі — з таблиці слотів)."""
+        prefix = f"[{label}]"
         return CalendarEvent(
             summary=f"{prefix} ❌ Відключення електроенергії",
-            start=start_utc,
-            end=end_utc,
-            description=f"{prefix} Немає світла {start_local.strftime('%H:%M')}–{end_local.strftime('%H:%M')}",
+            start=bounds[start_idx],
+            end=bounds[end_idx],
+            description=f"{prefix} Немає світла {slot_label(start_idx)}–{slot_label(end_idx)}",
         )
 
     # -------------------------
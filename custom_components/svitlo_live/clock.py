@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Callable, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+if TYPE_CHECKING:
+    from .sensor import _MinutesBase
+
+
+class SvitloCountdownClock:
+    """Один годинник на всю інтеграцію для сенсорів "хвилини до ...".
+
+    Прокидається на межі кожної хвилини лише поки хоч один відлік активний
+    і перераховує всі сенсори пакетом; стан пишуть тільки ті, чиє значення змінилось.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._entities: list[_MinutesBase] = []
+        self._unsub_timer: Optional[Callable[[], None]] = None
+
+    @callback
+    def async_register(self, entity: _MinutesBase) -> Callable[[], None]:
+        self._entities.append(entity)
+        self.async_arm()
+
+        @callback
+        def _unregister() -> None:
+            if entity in self._entities:
+                self._entities.remove(entity)
+            if not self._entities:
+                self._async_cancel()
+
+        return _unregister
+
+    @callback
+    def async_arm(self) -> None:
+        """Запускає годинник, якщо є активний відлік і він ще не запущений."""
+        if self._unsub_timer is not None:
+            return
+        if not any(entity.countdown_active for entity in self._entities):
+            return
+        now = dt_util.utcnow()
+        next_minute = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        self._unsub_timer = async_track_point_in_utc_time(self.hass, self._tick, next_minute)
+
+    @callback
+    def _async_cancel(self) -> None:
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    @callback
+    def _tick(self, _now: datetime) -> None:
+        self._unsub_timer = None
+        for entity in list(self._entities):
+            entity.async_clock_tick()
+        self.async_arm()
@@ -1,12 +1,28 @@
 from __future__ import annotations
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import callback
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.selector import selector
 
-from .const import DOMAIN, CONF_REGION, CONF_QUEUE, REGIONS, REGION_QUEUE_MODE
+from .const import (
+    DOMAIN,
+    CONF_REGION,
+    CONF_QUEUE,
+    CONF_QUEUES,
+    CONF_ALL_QUEUES,
+    CONF_REGION_STATS,
+    CONF_STALE_AFTER,
+    CONF_MIN_POLL,
+    CONF_MAX_POLL,
+    DEFAULT_STALE_AFTER_HOURS,
+    DEFAULT_MIN_POLL_MINUTES,
+    DEFAULT_MAX_POLL_MINUTES,
+    REGIONS,
+    entry_queues,
+    region_queues,
+)
 
 REGION_SLUG_TO_UI: Dict[str, str] = dict(sorted(REGIONS.items(), key=lambda kv: kv[1]))
 REGION_UI_TO_SLUG: Dict[str, str] = {v: k for k, v in REGION_SLUG_TO_UI.items()}
@@ -14,20 +30,59 @@ REGION_UI_LIST: List[str] = list(REGION_SLUG_TO_UI.values())
 REGION_UI_OPTIONS = [{"label": name, "value": name} for name in REGION_UI_LIST]
 
 def _queue_options_for_region(region_slug: str) -> Tuple[List[str], List[Dict[str, str]], str]:
-    mode = REGION_QUEUE_MODE.get(region_slug, "DEFAULT")
-    if mode == "CHERGA_NUM":
-        values = [str(i) for i in range(1, 7)]
-        default = "1"
-    elif mode == "GRUPA_NUM":
-        max_n = 12 if region_slug == "chernivetska-oblast" else 6
-        values = [str(i) for i in range(1, max_n + 1)]
-        default = "1"
-    else:
-        values = [f"{i}.{j}" for i in range(1, 7) for j in (1, 2)]
-        default = "1.1"
+    values = region_queues(region_slug)
+    default = values[0]
     options = [{"label": v, "value": v} for v in values]
     return values, options, default
 
+
+def _queues_schema(
+    q_options: List[Dict[str, str]], queues: List[str], all_queues: bool, region_stats: bool
+) -> Dict[Any, Any]:
+    """Поля вибору черг: кілька зі списку або всі черги області; плюс зведені сенсори області."""
+    return {
+        vol.Required(CONF_QUEUES, default=queues): selector({
+            "select": {"options": q_options, "multiple": True, "mode": "list"}
+        }),
+        vol.Required(CONF_ALL_QUEUES, default=all_queues): selector({"boolean": {}}),
+        vol.Required(CONF_REGION_STATS, default=region_stats): selector({"boolean": {}}),
+    }
+
+
+def _validate_queues(
+    hass: HomeAssistant,
+    region_slug: str,
+    q_values: List[str],
+    user_input: dict[str, Any],
+    exclude_entry_id: Optional[str] = None,
+) -> Tuple[List[str], Optional[str]]:
+    """Вибрані черги (у порядку області) або код помилки форми.
+
+    Одна черга (і зведення області) не може належати двом entry — інакше дублювались
+    би ентіті й пристрої.
+    """
+    all_queues = bool(user_input.get(CONF_ALL_QUEUES))
+    region_stats = bool(user_input.get(CONF_REGION_STATS))
+    chosen = set(user_input.get(CONF_QUEUES) or [])
+    queues = [q for q in q_values if all_queues or q in chosen]
+    if not queues:
+        return queues, "no_queues"
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if entry.entry_id == exclude_entry_id:
+            continue
+        settings = {**entry.data, **entry.options}
+        if settings.get(CONF_REGION) != region_slug:
+            continue
+        if set(entry_queues(settings)) & set(queues):
+            return queues, "queue_configured"
+        if region_stats and settings.get(CONF_REGION_STATS):
+            return queues, "region_stats_configured"
+    return queues, None
+
+
+def _entry_title(region_ui: str, queues: List[str], all_queues: bool) -> str:
+    return f"{region_ui} / {'усі черги' if all_queues else ', '.join(queues)}"
+
 class SvitloConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
@@ -53,27 +108,36 @@ class SvitloConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         region_ui = self._region_ui
         region_slug = REGION_UI_TO_SLUG.get(region_ui, region_ui)
-        _, queue_options, default_queue = _queue_options_for_region(region_slug)
+        q_values, queue_options, default_queue = _queue_options_for_region(region_slug)
+        queues, all_queues, region_stats = [default_queue], False, False
+        errors: dict[str, str] = {}
 
         if user_input is not None:
-            queue = user_input[CONF_QUEUE]
-            title = f"{region_ui} / {queue}"
-            await self.async_set_unique_id(f"{region_slug}_{queue}")
-            self._abort_if_unique_id_configured()
-            return self.async_create_entry(
-                title=title,
-                data={CONF_REGION: region_slug, CONF_QUEUE: queue},
-                options={},
-            )
-
-        data_schema = vol.Schema({
-            vol.Required(CONF_QUEUE, default=default_queue): selector({
-                "select": {"options": queue_options, "mode": "dropdown"}
-            })
-        })
+            all_queues = bool(user_input.get(CONF_ALL_QUEUES))
+            region_stats = bool(user_input.get(CONF_REGION_STATS))
+            queues, error = _validate_queues(self.hass, region_slug, q_values, user_input)
+            if error is None:
+                # одна черга — той самий unique_id, що й у entry до підтримки кількох черг
+                suffix = "all" if all_queues else "_".join(queues)
+                await self.async_set_unique_id(f"{region_slug}_{suffix}")
+                self._abort_if_unique_id_configured()
+                return self.async_create_entry(
+                    title=_entry_title(region_ui, queues, all_queues),
+                    data={
+                        CONF_REGION: region_slug,
+                        CONF_QUEUES: queues,
+                        CONF_ALL_QUEUES: all_queues,
+                        CONF_REGION_STATS: region_stats,
+                    },
+                    options={},
+                )
+            errors["base"] = error
+
+        data_schema = vol.Schema(_queues_schema(queue_options, queues, all_queues, region_stats))
         return self.async_show_form(
             step_id="details",
             data_schema=data_schema,
+            errors=errors,
             description_placeholders={"region": region_ui},  # ← додано
         )
 
@@ -87,7 +151,7 @@ class SvitloOptionsFlow(config_entries.OptionsFlow):
         self._region_ui: str | None = None
 
     async def async_step_init(self, user_input: dict[str, Any] | None = None):
-        saved_slug = self.entry.data.get(CONF_REGION)
+        saved_slug = {**self.entry.data, **self.entry.options}.get(CONF_REGION)
         current_region_ui = REGION_SLUG_TO_UI.get(saved_slug, REGION_UI_LIST[0])
 
         if user_input is not None:
@@ -108,22 +172,58 @@ class SvitloOptionsFlow(config_entries.OptionsFlow):
         region_ui = self._region_ui
         region_slug = REGION_UI_TO_SLUG.get(region_ui, region_ui)
 
-        saved_queue = self.entry.data.get(CONF_QUEUE)
+        saved = {**self.entry.data, **self.entry.options}
         q_values, q_options, q_default = _queue_options_for_region(region_slug)
-        default_queue = saved_queue if saved_queue in q_values else q_default
+        all_queues = bool(saved.get(CONF_ALL_QUEUES))
+        region_stats = bool(saved.get(CONF_REGION_STATS))
+        queues = [q for q in entry_queues(saved) if q in q_values] or [q_default]
+        stale_after = saved.get(CONF_STALE_AFTER, DEFAULT_STALE_AFTER_HOURS)
+        min_poll = saved.get(CONF_MIN_POLL, DEFAULT_MIN_POLL_MINUTES)
+        max_poll = saved.get(CONF_MAX_POLL, DEFAULT_MAX_POLL_MINUTES)
+        errors: dict[str, str] = {}
 
         if user_input is not None:
-            queue = user_input[CONF_QUEUE]
-            new_data = {**self.entry.data, CONF_REGION: region_slug, CONF_QUEUE: queue}
-            return self.async_create_entry(title="", data=new_data, options=self.entry.options)
+            all_queues = bool(user_input.get(CONF_ALL_QUEUES))
+            region_stats = bool(user_input.get(CONF_REGION_STATS))
+            queues, error = _validate_queues(
+                self.hass, region_slug, q_values, user_input, exclude_entry_id=self.entry.entry_id
+            )
+            new_options = {
+                **saved,
+                CONF_REGION: region_slug,
+                CONF_QUEUES: queues,
+                CONF_ALL_QUEUES: all_queues,
+                CONF_REGION_STATS: region_stats,
+                CONF_STALE_AFTER: int(user_input.get(CONF_STALE_AFTER, stale_after)),
+                CONF_MIN_POLL: int(user_input.get(CONF_MIN_POLL, min_poll)),
+                CONF_MAX_POLL: int(user_input.get(CONF_MAX_POLL, max_poll)),
+            }
+            # стара одиночна черга більше не потрібна — її замінив список
+            new_options.pop(CONF_QUEUE, None)
+            if new_options[CONF_MAX_POLL] < new_options[CONF_MIN_POLL]:
+                error = error or "poll_bounds"
+            if error is None:
+                return self.async_create_entry(title="", data=new_options)
+            errors["base"] = error
+            stale_after = new_options[CONF_STALE_AFTER]
+            min_poll = new_options[CONF_MIN_POLL]
+            max_poll = new_options[CONF_MAX_POLL]
 
         data_schema = vol.Schema({
-            vol.Required(CONF_QUEUE, default=default_queue): selector({
-                "select": {"options": q_options, "mode": "dropdown"}
-            })
+            **_queues_schema(q_options, queues, all_queues, region_stats),
+            vol.Required(CONF_STALE_AFTER, default=stale_after): selector({
+                "number": {"min": 1, "max": 72, "step": 1, "unit_of_measurement": "h", "mode": "box"}
+            }),
+            vol.Required(CONF_MIN_POLL, default=min_poll): selector({
+                "number": {"min": 3, "max": 60, "step": 1, "unit_of_measurement": "min", "mode": "box"}
+            }),
+            vol.Required(CONF_MAX_POLL, default=max_poll): selector({
+                "number": {"min": 15, "max": 240, "step": 5, "unit_of_measurement": "min", "mode": "box"}
+            }),
         })
         return self.async_show_form(
             step_id="details",
             data_schema=data_schema,
+            errors=errors,
             description_placeholders={"region": region_ui},  # ← додано
         )
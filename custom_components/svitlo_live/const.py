@@ -11,8 +11,32 @@ PLATFORMS: list[Platform] = [
 # Фіксований інтервал опитування (сек)
 DEFAULT_SCAN_INTERVAL = 900  # 15 хв
 
+# Ключ спільного SvitloApiHub у hass.data[DOMAIN]
+DATA_HUB = "_api_hub"
+
+# Ключ спільного годинника сенсорів "хвилини до" у hass.data[DOMAIN]
+DATA_CLOCK = "_countdown_clock"
+
+# Подія на шині HA: розклад черги на сьогодні/завтра реально змінився
+EVENT_SCHEDULE_CHANGED = f"{DOMAIN}_schedule_changed"
+
 CONF_REGION = "region"
 CONF_QUEUE = "queue"
+# Кілька черг в одній entry (CONF_QUEUE лишається для entry, створених раніше)
+CONF_QUEUES = "queues"
+CONF_ALL_QUEUES = "all_queues"
+# Зведені сенсори області (скільки черг без світла, частка по слотах, пік) — одна entry на область
+CONF_REGION_STATS = "region_stats"
+CONF_STALE_AFTER = "stale_after_hours"
+
+# Скільки годин знімок з диска/кешу вважається придатним, якщо проксі недоступний
+DEFAULT_STALE_AFTER_HOURS = 12
+
+# Межі адаптивного інтервалу опитування (хв): мін — коли чекаємо графік/після змін, макс — коли все стабільно
+CONF_MIN_POLL = "min_poll_minutes"
+CONF_MAX_POLL = "max_poll_minutes"
+DEFAULT_MIN_POLL_MINUTES = 5
+DEFAULT_MAX_POLL_MINUTES = 60
 
 # Оновлений список (Херсонська прибрана)
 REGIONS = {
@@ -48,5 +72,29 @@ REGION_QUEUE_MODE = {
     "donetska-oblast": "GRUPA_NUM",
 }
 
+
+def region_queues(region_slug: str) -> list[str]:
+    """Усі черги/групи області в порядку показу."""
+    mode = REGION_QUEUE_MODE.get(region_slug, "DEFAULT")
+    if mode == "CHERGA_NUM":
+        return [str(i) for i in range(1, 7)]
+    if mode == "GRUPA_NUM":
+        max_n = 12 if region_slug == "chernivetska-oblast" else 6
+        return [str(i) for i in range(1, max_n + 1)]
+    return [f"{i}.{j}" for i in range(1, 7) for j in (1, 2)]
+
+
+def entry_queues(settings: dict) -> list[str]:
+    """Черги entry ({**data, **options}): усі черги області, вибраний список або одна стара."""
+    if settings.get(CONF_ALL_QUEUES):
+        return region_queues(settings[CONF_REGION])
+    queues = settings.get(CONF_QUEUES)
+    if queues:
+        return list(queues)
+    return [settings[CONF_QUEUE]]
+
 # Публічний URL твого Cloudflare Worker (без секретів)
 API_URL = "https://svitlo-proxy.svitlo-proxy.workers.dev"
+
+# YAML (svitlo_live: api_url: ...) — інший ендпоінт для цього HA, напр. локальний стенд
+CONF_API_URL = "api_url"
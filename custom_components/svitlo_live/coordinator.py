@@ -1,335 +1,576 @@
 from __future__ import annotations
 
-import asyncio
+import hashlib
 import logging
-from datetime import datetime, timedelta, date, time
-from typing import Any, Optional, Callable
+from datetime import datetime, timedelta, date
+from typing import Any, Collection, Optional, Callable
 
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.event import async_track_point_in_utc_time
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt as dt_util
 
+from .aggregate import EMPTY_REGION_DAY, RegionDay
+from .api_hub import SvitloApiHub, TZ_KYIV
+from .schedule import DaySchedule, EMPTY_DAY, SLOT_LABELS, SLOTS_PER_DAY, STATE_ON, STATE_OFF
+from .forecast import FORECAST_DAYS, likely_off
+from .slots import day_stats, slot_boundaries, slot_boundaries_iso, slot_index_at
+from .snapshot import ApiSnapshot
+from .telemetry import SvitloTelemetry
 from .const import (
-    DOMAIN,
-    API_URL,
     CONF_REGION,
-    CONF_QUEUE,
-    DEFAULT_SCAN_INTERVAL,
+    CONF_QUEUES,
+    CONF_REGION_STATS,
+    CONF_STALE_AFTER,
+    CONF_MIN_POLL,
+    CONF_MAX_POLL,
+    DEFAULT_STALE_AFTER_HOURS,
+    DEFAULT_MIN_POLL_MINUTES,
+    DEFAULT_MAX_POLL_MINUTES,
+    EVENT_SCHEDULE_CHANGED,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
-# Таймзона України
-TZ_KYIV = dt_util.get_time_zone("Europe/Kyiv")
+# Ключ data і контекст слухачів для зведених даних області (назви черг такими не бувають)
+REGION_KEY = "_region"
 
-# Спільний кеш: скільки секунд перевикористовуємо JSON, щоби уникнути дублів на старті
-MIN_REUSE_SECONDS = 120
+# Поле payload лише для diagnostics: його зсув (спільний тік на межі іншої черги) ентіті не будить
+_SLOT_INDEX = "now_halfhour_index"
 
-# Блок оновлень навколо опівночі (за Києвом)
-MIDNIGHT_BLOCK_MINUTES = 5  # 00:00–00:04
 
+def _same_for_entities(old: Optional[dict[str, Any]], new: Optional[dict[str, Any]]) -> bool:
+    if old is None or new is None:
+        return old is new
+    if old == new:
+        return True
+    return old.keys() == new.keys() and all(old[key] == new[key] for key in new if key != _SLOT_INDEX)
 
-class SvitloCoordinator(DataUpdateCoordinator[dict[str, Any]]):
-    """Тягне JSON з проксі 1 раз на весь HA і будує дані для конкретного region/queue."""
 
-    def __init__(self, hass: HomeAssistant, config: dict[str, Any]) -> None:
+class SvitloCoordinator(DataUpdateCoordinator[dict[str, dict[str, Any]]]):
+    """Будує дані для черг одного region з JSON, який роздає спільний SvitloApiHub.
+
+    Одна entry — одна область і одна чи кілька черг: всі вони будуються з того самого
+    знімка за один прохід, data — queue -> payload. Ентіті слухають з контекстом своєї
+    черги й будяться лише тоді, коли змінився payload саме цієї черги.
+    """
+
+    def __init__(self, hass: HomeAssistant, config: dict[str, Any], hub: SvitloApiHub) -> None:
         self.hass = hass
         self.region: str = config[CONF_REGION]
-        self.queue: str = config[CONF_QUEUE]
+        self.queues: tuple[str, ...] = tuple(config[CONF_QUEUES])
+        # Зведені дані по всіх чергах області: хаб тоді тримає в знімку всю область
+        self.region_wide: bool = bool(config.get(CONF_REGION_STATS, False))
+        self._hub = hub
+        # Старший за це знімок (напр. з диска після довгого простою) не показуємо
+        self._stale_after = timedelta(
+            hours=float(config.get(CONF_STALE_AFTER, DEFAULT_STALE_AFTER_HOURS))
+        )
+        # Межі адаптивного інтервалу опитування хаба (хаб бере найвибагливіші серед entry)
+        self.poll_bounds = (
+            timedelta(minutes=float(config.get(CONF_MIN_POLL, DEFAULT_MIN_POLL_MINUTES))),
+            timedelta(minutes=float(config.get(CONF_MAX_POLL, DEFAULT_MAX_POLL_MINUTES))),
+        )
+        # Останній знімок, з якого побудовано data (хаб віддає той самий об'єкт, якщо JSON не змінився)
+        self._snapshot: Optional[ApiSnapshot] = None
 
-        scan_seconds = int(config.get("scan_interval_seconds", DEFAULT_SCAN_INTERVAL))
+        self._unsub_precise: Optional[Callable[[], None]] = None
 
-        shared = hass.data.setdefault(DOMAIN, {})
-        if "_shared_api" not in shared:
-            shared["_shared_api"] = {
-                "lock": asyncio.Lock(),
-                "last_json": None,
-                "last_json_utc": None,
-            }
-        self._shared_api = shared["_shared_api"]
+        # Час останнього опитування та останньої реальної зміни розкладу кожної черги (UTC;
+        # черги без зміни з моменту старту в last_changed_utc немає).
+        # У payload їх немає, щоб однакові дані давали рівні dict-и і не будили ентіті.
+        self.last_polled_utc: Optional[datetime] = None
+        self.last_changed_utc: dict[str, datetime] = {}
+        self._poll_listeners: list[Callable[[], None]] = []
 
-        self._unsub_precise: Optional[Callable[[], None]] = None
+        # Проксі недоступний, але показуємо останній вдалий розклад (молодший за stale_after).
+        # Поза payload — як і часи вище; ентіті пишуть стан лише при зміні прапорця.
+        self.stale_since: Optional[datetime] = None
+
+        # Час побудови payload (усіх черг за прохід), точні тіки, записи ентіті — для diagnostics
+        self.telemetry = SvitloTelemetry()
 
+        # Власного update_interval немає: опитування веде таймер хаба і пушить сюди.
+        # always_update=False — слухачі отримують лише payload, що відрізняється від попереднього.
         super().__init__(
             hass=hass,
             logger=_LOGGER,
-            name=f"svitlo_live_{self.region}_{self.queue}",
-            update_interval=timedelta(seconds=scan_seconds),
+            name=f"svitlo_live_{self.region}_{'+'.join(self.queues)}",
+            update_interval=None,
+            always_update=False,
         )
 
     async def _async_update_data(self) -> dict[str, Any]:
-        # 1) Спільний кеш
-        now_utc = dt_util.utcnow()
-        shared = self._shared_api
-        last_json = shared.get("last_json")
-        last_json_utc: Optional[datetime] = shared.get("last_json_utc")
-
-        should_reuse = (
-            last_json is not None
-            and last_json_utc is not None
-            and (now_utc - last_json_utc).total_seconds() < MIN_REUSE_SECONDS
-        )
+        # 1) Спільний кеш хаба: знімок з диска/пам'яті одразу, оновлення — у фоні;
+        #    мережа тут лише якщо знімка немає або він застарий
+        try:
+            snapshot = await self._hub.async_get_startup_data(
+                self._stale_after, self.region, None if self.region_wide else self.queues
+            )
+        except Exception as e:
+            raise UpdateFailed(f"Network error: {e}") from e
 
-        if not should_reuse:
-            async with shared["lock"]:
-                last_json = shared.get("last_json")
-                last_json_utc = shared.get("last_json_utc")
-                should_reuse = (
-                    last_json is not None
-                    and last_json_utc is not None
-                    and (dt_util.utcnow() - last_json_utc).total_seconds() < MIN_REUSE_SECONDS
-                )
-
-                if not should_reuse:
-                    # -------- MIDNIGHT GUARD: 00:00–00:04 Europe/Kyiv --------
-                    now_kyiv = dt_util.now(TZ_KYIV)
-                    if now_kyiv.hour == 0 and now_kyiv.minute < MIDNIGHT_BLOCK_MINUTES:
-                        if last_json is None:
-                            # Старт рівно опівночі без кешу – взагалі не ліземо в API
-                            raise UpdateFailed(
-                                "Midnight guard active (00:00–00:04 Europe/Kyiv) "
-                                "and no cached data available yet"
-                            )
-
-                        _LOGGER.debug(
-                            "Midnight guard: 00:00–00:%02d Europe/Kyiv, "
-                            "reusing cached JSON from %s without new API call",
-                            MIDNIGHT_BLOCK_MINUTES - 1,
-                            last_json_utc,
-                        )
-                        # Просто використовуємо last_json, не роблячи новий запит
-                    else:
-                        # -------- Звичайний фетч --------
-                        try:
-                            session = async_get_clientsession(self.hass)
-                            async with session.get(API_URL, timeout=30) as resp:
-                                if resp.status != 200:
-                                    raise UpdateFailed(f"HTTP {resp.status} for {API_URL}")
-                                last_json = await resp.json(content_type=None)
-                                shared["last_json"] = last_json
-                                shared["last_json_utc"] = dt_util.utcnow()
-                                _LOGGER.debug("Fetched API once for all entries (%s)", API_URL)
-                        except Exception as e:
-                            raise UpdateFailed(f"Network error: {e}") from e
+        age = self._hub.age
+        if age is not None and age >= self._stale_after:
+            # до підписки черги entry тримаються в хабі як "очікувані" — не лишаємо їх там
+            self._hub.async_discard_pending(self.region, None if self.region_wide else self.queues)
+            raise UpdateFailed(f"Cached schedule is stale (fetched {age} ago)")
 
         # 2) Побудова payload
+        payload = self._build_payload(snapshot)
+        self._async_mark_polled()
+        return payload
+
+    @property
+    def stale(self) -> bool:
+        return self.stale_since is not None
+
+    @callback
+    def async_handle_api_update(self, snapshot: ApiSnapshot) -> None:
+        """Новий знімок від хаба (раз на цикл опитування)."""
+        was_stale = self.stale
+        self.stale_since = None
+        if snapshot is self._snapshot and self.last_update_success and not self._day_rolled():
+            # Відповідь проксі не змінилась: лишаємо попередній payload, ентіті не пишуть стан
+            self._async_mark_polled()
+            if was_stale:
+                self.async_update_listeners()
+            return
+        try:
+            payload = self._build_payload(snapshot)
+        except UpdateFailed as e:
+            self.async_set_update_error(e)
+            return
+        self._async_mark_polled()
+        if self.data is None or not self.last_update_success:
+            self.async_set_updated_data(payload)
+            return
+        if payload == self.data:
+            # Новий JSON, але для наших черг нічого не змінилось
+            if was_stale:
+                self.async_update_listeners()
+            return
+        changed = self._changed_queues(payload)
+        # Будимо лише ентіті змінених черг (усі — якщо треба зняти позначку stale)
+        self.data = payload
+        if was_stale or changed:
+            self.async_update_listeners(None if was_stale else changed)
+
+    @callback
+    def async_handle_api_error(self, err: Exception) -> None:
+        """Хаб не зміг отримати JSON у цьому циклі.
+
+        Поки останній вдалий знімок молодший за stale_after, лишаємо дані й лише
+        позначаємо їх застарілими; далі — звичайна помилка оновлення ("No data").
+        """
+        age = self._hub.age
+        if self.data is not None and self.last_update_success and age is not None and age < self._stale_after:
+            if self.stale_since is None:
+                self.stale_since = dt_util.utcnow().replace(microsecond=0)
+                _LOGGER.debug("%s: serving cached schedule (%s old): %s", self.name, age, err)
+                self.async_update_listeners()
+            return
+        self.stale_since = None
+        self.async_set_update_error(UpdateFailed(f"Network error: {err}"))
+
+    def _build_payload(self, snapshot: ApiSnapshot) -> dict[str, dict[str, Any]]:
         try:
-            payload = self._build_from_api(last_json)
+            with self.telemetry.timer("payload_build_ms"):
+                payload = self._build_from_api(snapshot)
         except Exception as e:
+            self.telemetry.incr("build_errors")
             raise UpdateFailed(f"Parse/build error: {e}") from e
+        self._snapshot = snapshot
+
+        old = self.data or {}
+        for queue in self.queues:
+            self._async_track_schedule_change(queue, old.get(queue), payload[queue])
 
         # 3) Точний тик
         self._schedule_precise_refresh(payload)
         return payload
 
+    # ---------------------------------------------------------------------
+    # Опитування / зміни
+    # ---------------------------------------------------------------------
+
+    @callback
+    def async_add_poll_listener(self, update_callback: Callable[[], None]) -> Callable[[], None]:
+        """Слухач кожного успішного опитування, навіть якщо розклад не змінився."""
+        self._poll_listeners.append(update_callback)
+
+        @callback
+        def _remove() -> None:
+            if update_callback in self._poll_listeners:
+                self._poll_listeners.remove(update_callback)
+
+        return _remove
+
+    @callback
+    def _async_mark_polled(self) -> None:
+        polled = (self._hub.last_fetch_utc or dt_util.utcnow()).replace(microsecond=0)
+        if polled == self.last_polled_utc:
+            return
+        self.last_polled_utc = polled
+        for update_callback in list(self._poll_listeners):
+            update_callback()
+
+    @staticmethod
+    def _schedule_days(payload: dict[str, Any]) -> dict[str, DaySchedule]:
+        """date_iso -> DaySchedule для днів, на які є розклад."""
+        days: dict[str, DaySchedule] = {}
+        if payload.get("date") and payload.get("today_schedule"):
+            days[payload["date"]] = payload["today_schedule"]
+        if payload.get("tomorrow_date") and payload.get("tomorrow_schedule"):
+            days[payload["tomorrow_date"]] = payload["tomorrow_schedule"]
+        return days
+
+    @staticmethod
+    def _schedule_hash(days: dict[str, DaySchedule], window: list[str]) -> str:
+        """Стабільний (між перезапусками) хеш розкладу на дні з window."""
+        raw = ";".join(
+            f"{d}:{days[d].on_mask:012x}:{days[d].off_mask:012x}" if d in days else f"{d}:-"
+            for d in window
+        )
+        return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+    @callback
+    def _async_track_schedule_change(
+        self, queue: str, old: Optional[dict[str, Any]], new: dict[str, Any]
+    ) -> None:
+        """Порівнює розклад черги по датах і шле EVENT_SCHEDULE_CHANGED лише при реальній зміні.
+
+        Перехід доби (вчорашнє "завтра" стало "сьогодні") зміною не вважається.
+        Перше завантаження (зокрема після перезапуску HA) — теж не зміна: час невідомий.
+        """
+        if old is None:
+            return
+
+        today_iso = new["date"]
+        tomorrow_iso = (date.fromisoformat(today_iso) + timedelta(days=1)).isoformat()
+        window = [today_iso, tomorrow_iso]
+
+        old_days = self._schedule_days(old)
+        new_days = self._schedule_days(new)
+        if all(old_days.get(d) == new_days.get(d) for d in window):
+            return
+
+        self.last_changed_utc[queue] = dt_util.utcnow().replace(microsecond=0)
+        self.telemetry.incr("schedule_changes")
+
+        def _windows(days: dict[str, DaySchedule], d: str) -> list[dict[str, Any]]:
+            return days[d].off_windows() if d in days else []
+
+        self.hass.bus.async_fire(
+            EVENT_SCHEDULE_CHANGED,
+            {
+                "region": self.region,
+                "queue": queue,
+                "date": today_iso,
+                "tomorrow_date": tomorrow_iso,
+                "has_tomorrow": tomorrow_iso in new_days,
+                "today_off": _windows(new_days, today_iso),
+                "tomorrow_off": _windows(new_days, tomorrow_iso),
+                "old_today_off": _windows(old_days, today_iso),
+                "old_tomorrow_off": _windows(old_days, tomorrow_iso),
+                "hash": self._schedule_hash(new_days, window),
+                "old_hash": self._schedule_hash(old_days, window),
+            },
+        )
+        _LOGGER.debug("Schedule changed for %s/%s", self.region, queue)
+
     # ---------------------------------------------------------------------
     # API -> payload
     # ---------------------------------------------------------------------
 
-    def _build_from_api(self, api: dict[str, Any]) -> dict[str, Any]:
-        date_today = api.get("date_today")
-        date_tomorrow = api.get("date_tomorrow")
+    def _build_from_api(self, snapshot: ApiSnapshot) -> dict[str, dict[str, Any]]:
+        return self._derive_payloads(self._select_days(snapshot))
+
+    def _select_region(self, snapshot: ApiSnapshot, date_today: str, date_tomorrow: str) -> dict[str, Any]:
+        """Усі черги області сьогодні/завтра як матриці слотів — лише при новому знімку чи новій добі."""
+        queues = snapshot.region_queues(self.region)
+        today = RegionDay({queue: days.get(date_today) or EMPTY_DAY for queue, days in queues.items()})
+        tomorrow = RegionDay({queue: days.get(date_tomorrow) or EMPTY_DAY for queue, days in queues.items()})
+        data: dict[str, Any] = {"date": date_today, "today_matrix": today}
+        if tomorrow:
+            data["tomorrow_date"] = date_tomorrow
+            data["tomorrow_matrix"] = tomorrow
+        return data
 
-        region_obj = next((r for r in api.get("regions", []) if r.get("cpu") == self.region), None)
-        if not region_obj:
-            raise ValueError(f"Region {self.region} not found in API")
+    def _select_days(self, snapshot: ApiSnapshot) -> dict[str, dict[str, Any]]:
+        """Частина payload усіх черг, що залежить лише від знімка й поточної дати за Києвом.
 
-        schedule = (region_obj.get("schedule") or {}).get(self.queue) or {}
-        slots_today_map: dict[str, int] = schedule.get(date_today) or {}
-        slots_tomorrow_map: dict[str, int] = schedule.get(date_tomorrow) or {}
+        Дні обираються за фактичною датою, а не за date_today проксі: після півночі
+        вчорашнє "завтра" зі знімка одразу стає "сьогодні" (без мережі), а розклад
+        минулої доби ніколи не видається за сьогоднішній.
+        """
+        if not snapshot.has_region(self.region):
+            raise ValueError(f"Region {self.region} not found in API")
 
-        # >>> ЛОГІКА nosched (нема розкладу на сьогодні)
-        has_any_slots = any(v in (1, 2) for v in slots_today_map.values())
-        if not has_any_slots:
-            base_day = (
-                datetime.fromisoformat(date_today).date()
-                if date_today else dt_util.now(TZ_KYIV).date()
-            )
-            data_nosched: dict[str, Any] = {
-                "queue": self.queue,
-                "date": base_day.isoformat(),
-                "now_status": "nosched",
-                "now_halfhour_index": None,
-                "next_change_at": None,
-                "today_48half": [],
-                "updated": dt_util.utcnow().replace(microsecond=0).isoformat(),
-                "source": API_URL,
-                "next_on_at": None,
-                "next_off_at": None,
+        base_day = dt_util.now(TZ_KYIV).date()
+        date_today = base_day.isoformat()
+        date_tomorrow = (base_day + timedelta(days=1)).isoformat()
+        source = self._hub.api_url
+
+        bases: dict[str, dict[str, Any]] = {}
+        for queue in self.queues:
+            # O(1): знімок уже проіндексований region -> queue -> date
+            schedule = snapshot.queue_days(self.region, queue)
+            today: DaySchedule = schedule.get(date_today) or EMPTY_DAY
+            tomorrow: Optional[DaySchedule] = schedule.get(date_tomorrow)
+
+            # підсумки доби рахуються тут — раз на знімок/добу, а не на кожному тіку
+            data: dict[str, Any] = {
+                "queue": queue,
+                "date": date_today,
+                "today_schedule": today,
+                "today_stats": day_stats(base_day, today),
+                "source": source,
             }
-            if date_tomorrow and (schedule.get(date_tomorrow) or {}):
-                data_nosched["tomorrow_date"] = date_tomorrow
-                data_nosched["tomorrow_48half"] = []
-            return data_nosched
-        # <<< КІНЕЦЬ nosched
-
-        def build_half_list(slots_map: dict[str, int]) -> list[str]:
-            res: list[str] = []
-            for h in range(24):
-                for m in (0, 30):
-                    label = f"{h:02d}:{m:02d}"
-                    code = int(slots_map.get(label, 0))
-                    if code == 1:
-                        res.append("on")
-                    elif code == 2:
-                        res.append("off")
-                    else:
-                        res.append("unknown")
-            return res
-
-        today_half = build_half_list(slots_today_map)
-        tomorrow_half = build_half_list(slots_tomorrow_map) if slots_tomorrow_map else []
-
-        now_local = dt_util.now(TZ_KYIV)
-        base_day = datetime.fromisoformat(date_today).date() if date_today else now_local.date()
-        if now_local.date() != base_day:
-            idx = 0
-        else:
-            idx = now_local.hour * 2 + (1 if now_local.minute >= 30 else 0)
+            if tomorrow:
+                data["tomorrow_date"] = date_tomorrow
+                data["tomorrow_schedule"] = tomorrow
+                data["tomorrow_stats"] = day_stats(base_day + timedelta(days=1), tomorrow)
+            # профіль з архіву (доповнюється лише новими завершеними днями) і прогноз
+            # на ще не опубліковані дні
+            archived = self._hub.archive.profile(self.region, queue)
+            data["outage_profile"] = archived.probabilities()
+            data["outage_samples"] = tuple(archived.samples)
+            data["forecast"] = likely_off(
+                archived,
+                base_day + timedelta(days=2 if tomorrow else 1),
+                base_day + timedelta(days=FORECAST_DAYS),
+            )
+            bases[queue] = data
+        if self.region_wide:
+            bases[REGION_KEY] = self._select_region(snapshot, date_today, date_tomorrow)
+        return bases
+
+    def _day_rolled(self) -> bool:
+        """Доба за Києвом змінилась після побудови поточного payload."""
+        if not self.data:
+            return False
+        payload = next(iter(self.data.values()))
+        return payload.get("date") != dt_util.now(TZ_KYIV).date().isoformat()
+
+    def _derive_payloads(self, bases: dict[str, dict[str, Any]]) -> dict[str, dict[str, Any]]:
+        """Похідні поля для всіх черг; у черг entry спільна дата, тож слот шукається один раз."""
+        if not bases:
+            return {}
+        base_day = date.fromisoformat(next(iter(bases.values()))["date"])
+        # межі слотів доби — з кешованої таблиці (DST-коректно), поточний слот — bisect
+        idx = slot_index_at(base_day, dt_util.utcnow())
+        return {
+            key: self._derive_region(base, idx) if key == REGION_KEY else self._derive_payload(base, base_day, idx)
+            for key, base in bases.items()
+        }
 
-        cur = today_half[idx] if today_half else "unknown"
+    @staticmethod
+    def _derive_region(base: dict[str, Any], idx: int) -> dict[str, Any]:
+        """Зведення області на поточний слот: O(черг) за готовою матрицею, без перерахунку сум."""
+        today: RegionDay = base.get("today_matrix") or EMPTY_REGION_DAY
+        data: dict[str, Any] = {"date": base["date"], "today_matrix": today}
+        if base.get("tomorrow_matrix"):
+            data["tomorrow_date"] = base["tomorrow_date"]
+            data["tomorrow_matrix"] = base["tomorrow_matrix"]
+        if not today:
+            data.update({"queues_off": [], "off_share": None, "next_change_at": None})
+            return data
+        nci = today.next_change(idx)
+        data.update(
+            {
+                "queues_off": today.queues_off(idx),
+                "off_share": today.share(idx),
+                # та сама форма, що в черг: точний тік враховує й межі інших черг області
+                "next_change_at": SLOT_LABELS[nci] if nci is not None else None,
+            }
+        )
+        return data
 
-        nci = self._next_change_idx(today_half, idx) if today_half else None
-        next_change_hhmm = None
-        if nci is not None:
-            h = nci // 2
-            m = 30 if (nci % 2) else 0
-            next_change_hhmm = f"{h:02d}:{m:02d}"
+    def _derive_payload(self, base: dict[str, Any], base_day: date, idx: int) -> dict[str, Any]:
+        """Похідні від поточного часу поля черги: now_status, індекс слота, next_*.
 
-        next_on_at = self._find_next_at(["on"], base_day, today_half, idx, date_tomorrow, tomorrow_half)
-        next_off_at = self._find_next_at(["off"], base_day, today_half, idx, date_tomorrow, tomorrow_half)
+        Викликається і після опитування, і на межі слота — без мережі та без
+        повторного розбору знімка.
+        """
+        today: DaySchedule = base["today_schedule"]
+        date_tomorrow: Optional[str] = base.get("tomorrow_date")
+        tomorrow: Optional[DaySchedule] = base.get("tomorrow_schedule")
 
         data: dict[str, Any] = {
-            "queue": self.queue,
-            "date": base_day.isoformat(),
-            "now_status": cur,
-            "now_halfhour_index": idx,
-            "next_change_at": next_change_hhmm,
-            "today_48half": today_half,
-            "updated": dt_util.utcnow().replace(microsecond=0).isoformat(),
-            "source": API_URL,
-            "next_on_at": next_on_at,
-            "next_off_at": next_off_at,
+            "queue": base["queue"],
+            "date": base["date"],
+            "today_schedule": today,
+            "today_stats": base.get("today_stats"),
+            "outage_profile": base.get("outage_profile"),
+            "outage_samples": base.get("outage_samples"),
+            "forecast": base.get("forecast", ()),
+            "source": base["source"],
         }
+        if date_tomorrow:
+            data["tomorrow_date"] = date_tomorrow
+            data["tomorrow_schedule"] = tomorrow
+            data["tomorrow_stats"] = base.get("tomorrow_stats")
 
-        if date_tomorrow and tomorrow_half:
+        # >>> ЛОГІКА nosched (нема розкладу на сьогодні)
+        if not today.has_slots:
             data.update(
                 {
-                    "tomorrow_date": date_tomorrow,
-                    "tomorrow_48half": tomorrow_half,
+                    "now_status": "nosched",
+                    "now_halfhour_index": None,
+                    "next_change_at": None,
+                    "next_on_at": None,
+                    "next_off_at": None,
                 }
             )
+            return data
+        # <<< КІНЕЦЬ nosched
+
+        nci = today.next_change(idx)
+        next_change_hhmm = None
+        if nci is not None:
+            h = nci // 2
+            m = 30 if (nci % 2) else 0
+            next_change_hhmm = f"{h:02d}:{m:02d}"
 
+        data.update(
+            {
+                "now_status": today.state_at(idx),
+                "now_halfhour_index": idx,
+                "next_change_at": next_change_hhmm,
+                "next_on_at": self._find_next_at(STATE_ON, base_day, today, idx, date_tomorrow, tomorrow),
+                "next_off_at": self._find_next_at(STATE_OFF, base_day, today, idx, date_tomorrow, tomorrow),
+            }
+        )
         return data
 
     # ---------------------------------------------------------------------
     # Планувальник точного оновлення
     # ---------------------------------------------------------------------
 
-    def _localize_kyiv(self, d: datetime) -> datetime:
-        """Коректно локалізує naive datetime до Europe/Kyiv з урахуванням DST."""
-        if d.tzinfo is not None:
-            return d.astimezone(TZ_KYIV)
-        localize = getattr(TZ_KYIV, "localize", None)
-        if callable(localize):
-            return localize(d)
-        return d.replace(tzinfo=TZ_KYIV)
-
-    def _schedule_precise_refresh(self, data: dict[str, Any]) -> None:
-        if data.get("now_status") == "nosched":
-            if self._unsub_precise:
-                self._unsub_precise()
-                self._unsub_precise = None
-            _LOGGER.debug("No schedule for %s/%s today — precise tick not scheduled", self.region, self.queue)
-            return
-
+    def _schedule_precise_refresh(self, payloads: dict[str, dict[str, Any]]) -> None:
+        """Один таймер на entry: найближча межа, де змінюється стан якоїсь із черг, або північ."""
         if self._unsub_precise:
             self._unsub_precise()
             self._unsub_precise = None
 
-        next_change_hhmm = data.get("next_change_at")
-        base_date_iso = data.get("date")
-        if not next_change_hhmm or not base_date_iso:
-            return
+        now_utc = dt_util.utcnow()
+        # Північ за Києвом плануємо завжди: перехід доби робиться локально зі знімка
+        today_bounds = slot_boundaries(dt_util.now(TZ_KYIV).date())
+        candidate_utc = today_bounds[SLOTS_PER_DAY]
 
         try:
-            hh, mm = [int(x) for x in next_change_hhmm.split(":")]
-            base_day = datetime.fromisoformat(base_date_iso).date()
-
-            local_naive = datetime.combine(base_day, time(hour=hh, minute=mm, second=0, microsecond=0))
-            candidate_kyiv = self._localize_kyiv(local_naive)
-
-            now_kyiv = dt_util.now(TZ_KYIV)
-            if candidate_kyiv <= now_kyiv:
-                candidate_kyiv = candidate_kyiv + timedelta(days=1)
-
-            candidate_utc = dt_util.as_utc(candidate_kyiv)
+            for data in payloads.values():
+                next_change_hhmm = data.get("next_change_at")
+                base_date_iso = data.get("date")
+                if data.get("now_status") == "nosched" or not (next_change_hhmm and base_date_iso):
+                    continue
+                hh, mm = [int(x) for x in next_change_hhmm.split(":")]
+                bounds = slot_boundaries(date.fromisoformat(base_date_iso))
+                change_utc = bounds[hh * 2 + mm // 30]
+                if now_utc < change_utc < candidate_utc:
+                    candidate_utc = change_utc
+
+            candidate_kyiv = candidate_utc.astimezone(TZ_KYIV)
 
             @callback
             def _tick(_now) -> None:
-                self.hass.async_create_task(self.async_request_refresh())
+                self._unsub_precise = None
+                self.telemetry.incr("precise_fired")
+                self._async_advance_slot()
 
             self._unsub_precise = async_track_point_in_utc_time(self.hass, _tick, candidate_utc)
+            self.telemetry.incr("precise_scheduled")
             _LOGGER.debug(
-                "Scheduled precise tick for %s/%s at %s (Kyiv) / %s (UTC)",
-                self.region, self.queue, candidate_kyiv.isoformat(), candidate_utc.isoformat(),
+                "Scheduled precise tick for %s at %s (Kyiv) / %s (UTC)",
+                self.name, candidate_kyiv.isoformat(), candidate_utc.isoformat(),
             )
             _LOGGER.debug("Now UTC: %s", dt_util.utcnow().isoformat())
 
         except Exception as e:
             _LOGGER.debug("Failed to schedule precise refresh: %s", e)
 
+    @callback
+    def _async_advance_slot(self) -> None:
+        """Межа слота: локально зсуваємо now_status / next_* з уже розібраного розкладу.
+
+        Мережа тут не використовується — нові дані приходять лише з опитуванням хаба.
+        """
+        if self.data is None:
+            return
+        with self.telemetry.timer("slot_advance_ms"):
+            base = self.data
+            if self._day_rolled() and self._snapshot is not None:
+                # Північ: "завтра" зі знімка стає "сьогодні" — в пам'яті, без запиту в мережу
+                base = self._select_days(self._snapshot)
+                self.telemetry.incr("day_rollovers")
+            payload = self._derive_payloads(base)
+        self._schedule_precise_refresh(payload)
+        if payload == self.data:
+            return
+        changed = self._changed_queues(payload)
+        # Не через async_set_updated_data: локальний тік не має скидати помилку опитування
+        self.data = payload
+        if changed:
+            self.async_update_listeners(changed)
+
+    def _changed_queues(self, payload: dict[str, dict[str, Any]]) -> list[str]:
+        """Черги (і REGION_KEY), чий payload змінився для ентіті (тік лише на межі іншої черги — не зміна)."""
+        old = self.data or {}
+        return [key for key in payload if not _same_for_entities(old.get(key), payload.get(key))]
+
+    @callback
+    def async_update_listeners(self, queues: Optional[Collection[str]] = None) -> None:
+        """Будить слухачів черг queues (None — усіх); слухачі без контексту — завжди."""
+        if queues is None:
+            listeners = list(self._listeners.values())
+        else:
+            listeners = [
+                (update_callback, context)
+                for update_callback, context in self._listeners.values()
+                if context is None or context in queues
+            ]
+        # Кожен слухач — одна ентіті, що зараз запише стан
+        self.telemetry.incr("listener_updates")
+        self.telemetry.incr("entity_writes", len(listeners))
+        for update_callback, _ in listeners:
+            update_callback()
+
+    async def async_shutdown(self) -> None:
+        """Скасовує точний тік разом з рештою запланованих викликів координатора."""
+        if self._unsub_precise:
+            self._unsub_precise()
+            self._unsub_precise = None
+        await super().async_shutdown()
+
     # ---------------------------------------------------------------------
     # Утиліти
     # ---------------------------------------------------------------------
 
-    @staticmethod
-    def _next_change_idx(series: list[str], idx: int) -> Optional[int]:
-        if not series:
-            return None
-        cur = series[idx]
-        n = len(series)
-        for step in range(1, n + 1):
-            j = (idx + step) % n
-            if series[j] != cur:
-                return j
-        return None
-
     @staticmethod
     def _find_next_at(
-        target_states: list[str],
+        target_state: str,
         base_date: date,
-        today_half: list[str],
+        today: DaySchedule,
         idx: int,
         tomorrow_date_iso: Optional[str],
-        tomorrow_half: Optional[list[str]],
+        tomorrow: Optional[DaySchedule],
     ) -> Optional[str]:
-        if not today_half:
+        if not today.has_slots:
             return None
 
-        today_tail = today_half[idx + 1 :]
-        seq = list(today_tail)
-
-        has_tomorrow = bool(tomorrow_date_iso and tomorrow_half)
-        if has_tomorrow:
-            seq.extend(tomorrow_half or [])
+        # Початок наступної серії target_state, а не наступний слот у ньому: поки стан
+        # уже target_state, значення не зсувається з кожним тіком і не будить ентіті.
+        # Межі слотів — готові рядки з кешованої таблиці, без арифметики datetime.
+        pos = today.next_run_start(target_state, idx + 1)
+        if pos is not None:
+            return slot_boundaries_iso(base_date)[pos]
 
-        pos = next((i for i, s in enumerate(seq) if s in target_states), None)
+        if not (tomorrow_date_iso and tomorrow):
+            return None
+        # серія, що триває до півночі, завтра з 0-го слота лише продовжується
+        continues = today.state_at(idx) == target_state and today.state_at(SLOTS_PER_DAY - 1) == target_state
+        pos = tomorrow.next_run_start(target_state, 1 if continues else 0)
         if pos is None:
             return None
-
-        if pos < len(today_tail):
-            base_local_midnight = datetime.combine(base_date, datetime.min.time(), tzinfo=TZ_KYIV)
-            minutes_from_base = (idx + 1 + pos) * 30
-            next_local = base_local_midnight + timedelta(minutes=minutes_from_base)
-        else:
-            if not has_tomorrow:
-                return None
-            tomorrow_date = datetime.fromisoformat(tomorrow_date_iso).date()
-            base_local_midnight = datetime.combine(tomorrow_date, datetime.min.time(), tzinfo=TZ_KYIV)
-            minutes_into_tomorrow = (pos - len(today_tail)) * 30
-            next_local = base_local_midnight + timedelta(minutes=minutes_into_tomorrow)
-
-        return dt_util.as_utc(next_local).isoformat()
+        return slot_boundaries_iso(date.fromisoformat(tomorrow_date_iso))[pos]
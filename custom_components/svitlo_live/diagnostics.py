@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .aggregate import RegionDay
+from .api_hub import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    MIN_REUSE_SECONDS,
+    SvitloApiHub,
+)
+from .const import DOMAIN, DATA_HUB
+from .coordinator import SvitloCoordinator
+from .schedule import DaySchedule
+
+
+def _iso(value: Any) -> Any:
+    return value.isoformat() if value is not None else None
+
+
+def _jsonable(payload: dict[str, Any]) -> dict[str, Any]:
+    """DaySchedule -> маски + вікна відключень, RegionDay -> лічильники по слотах; решта вже JSON-сумісна."""
+    out: dict[str, Any] = {}
+    for key, value in payload.items():
+        if isinstance(value, DaySchedule):
+            out[key] = {
+                "on_mask": f"{value.on_mask:012x}",
+                "off_mask": f"{value.off_mask:012x}",
+                "off_windows": value.off_windows(),
+            }
+        elif isinstance(value, RegionDay):
+            out[key] = value.as_dict()
+        else:
+            out[key] = value
+    return out
+
+
+def _polling(hub: SvitloApiHub) -> dict[str, Any]:
+    low, high = hub.poll_bounds()
+    poller = hub.poller
+    return {
+        "interval_seconds": round(poller.interval.total_seconds()),
+        "reason": poller.reason,
+        "next_poll": _iso(poller.next_poll),
+        "bounds_seconds": [round(low.total_seconds()), round(high.total_seconds())],
+        "awaiting_tomorrow": hub.awaiting_tomorrow(),
+        "learned": poller.learned,
+        "hot_hours_kyiv": poller.hot_hours(),
+        "history": poller.as_dict(),
+    }
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Стан entry, спільного хаба й телеметрія конвеєра fetch -> payload -> ентіті."""
+    hub: SvitloApiHub = hass.data[DOMAIN][DATA_HUB]
+    coordinator: SvitloCoordinator | None = hass.data[DOMAIN].get(entry.entry_id)
+
+    diag: dict[str, Any] = {
+        "entry": {"data": dict(entry.data), "options": dict(entry.options)},
+        "hub": {
+            "api_url": hub.api_url,
+            "region_filter": hub.region_filter,
+            "requested_regions": hub.wanted_regions() if hub.region_filter else None,
+            "snapshot_selection": (
+                {region: sorted(queues) if queues is not None else "all" for region, queues in hub.selection.items()}
+                if hub.selection is not None else "all"
+            ),
+            "last_fetch": _iso(hub.last_fetch_utc),
+            "age_seconds": round(hub.age.total_seconds()) if hub.age is not None else None,
+            "fresh": hub.is_fresh(),
+            "min_reuse_seconds": MIN_REUSE_SECONDS,
+            "failures": hub.failures,
+            "circuit_open": hub.circuit_open,
+            "circuit_threshold": CIRCUIT_FAILURE_THRESHOLD,
+            "retry_at": _iso(hub.retry_at),
+            "snapshot_dates": (
+                [hub.snapshot.date_today, hub.snapshot.date_tomorrow] if hub.snapshot else None
+            ),
+            "polling": _polling(hub),
+            "archive": hub.archive.as_dict(),
+            "telemetry": hub.telemetry.as_dict(),
+        },
+    }
+
+    if coordinator is not None:
+        diag["coordinator"] = {
+            "region": coordinator.region,
+            "queues": list(coordinator.queues),
+            "region_stats": coordinator.region_wide,
+            "last_update_success": coordinator.last_update_success,
+            "last_polled": _iso(coordinator.last_polled_utc),
+            "last_changed": {queue: _iso(at) for queue, at in coordinator.last_changed_utc.items()},
+            "stale_since": _iso(coordinator.stale_since),
+            "listeners": len(coordinator._listeners),
+            "data": (
+                {queue: _jsonable(payload) for queue, payload in coordinator.data.items()}
+                if coordinator.data else None
+            ),
+            "telemetry": coordinator.telemetry.as_dict(),
+        }
+
+    return diag
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Any, NamedTuple, Optional
+
+from .aggregate import column_add, column_totals
+from .schedule import SLOT_LABELS, SLOTS_PER_DAY, DaySchedule
+from .slots import slot_minutes
+
+# На скільки днів уперед (від сьогодні) будуємо прогноз для ще не опублікованих днів
+FORECAST_DAYS = 7
+# Слот "ймовірно без світла" — якщо в архіві так було щонайменше в половині таких днів тижня
+LIKELY_OFF = 0.5
+# Менше стількох днів з відомим станом слота — ймовірності не рахуємо (None)
+MIN_SAMPLES = 2
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+# 7 днів тижня × 48 слотів: частка днів без світла (0..1) або None — замало даних
+Profile = tuple[tuple[Optional[float], ...], ...]
+
+
+class LikelyOff(NamedTuple):
+    """Серія слотів [start; end) дня day, де відключення ймовірне за профілем."""
+
+    day: str
+    start: int
+    end: int
+    probability: float  # середня по серії, 0..1
+
+
+class OutageProfile:
+    """Профіль відключень черги за днем тижня й слотом з архіву завершених днів.
+
+    Для кожного дня тижня — стовпцеві лічильники бітовими зрізами (як у RegionDay):
+    новий день додається за O(log днів) операцій над 48-бітними масками, без
+    повторного проходу архівом. Ймовірності рахуються лише після зміни.
+    """
+
+    __slots__ = ("through", "samples", "_off", "_known", "_cache", "_runs")
+
+    def __init__(self) -> None:
+        # Останній врахований день (ISO) — далі додаються лише новіші
+        self.through: str = ""
+        self.samples: list[int] = [0] * 7
+        self._off: list[list[int]] = [[] for _ in range(7)]
+        self._known: list[list[int]] = [[] for _ in range(7)]
+        self._cache: Optional[Profile] = None
+        self._runs: Optional[tuple[tuple[tuple[int, int, float], ...], ...]] = None
+
+    def add(self, day: date, schedule: DaySchedule) -> None:
+        """Враховує завершений день (дні — у хронологічному порядку)."""
+        weekday = day.weekday()
+        column_add(self._off[weekday], schedule.off_mask)
+        column_add(self._known[weekday], schedule.on_mask | schedule.off_mask)
+        self.samples[weekday] += 1
+        self.through = day.isoformat()
+        self._cache = None
+        self._runs = None
+
+    def probabilities(self) -> Profile:
+        if self._cache is None:
+            self._cache = tuple(
+                tuple(
+                    round(off / known, 3) if known >= MIN_SAMPLES else None
+                    for off, known in zip(column_totals(self._off[weekday]), column_totals(self._known[weekday]))
+                )
+                for weekday in range(7)
+            )
+        return self._cache
+
+    def likely_runs(self) -> tuple[tuple[tuple[int, int, float], ...], ...]:
+        """Для кожного дня тижня — серії (start, end, середня ймовірність) з ймовірністю >= LIKELY_OFF."""
+        if self._runs is None:
+            runs = []
+            for row in self.probabilities():
+                mask = sum(1 << idx for idx, p in enumerate(row) if p is not None and p >= LIKELY_OFF)
+                runs.append(tuple(
+                    # у серії лише слоти з відомою ймовірністю (інакше біт не встановлено)
+                    (start, end, round(sum(p or 0.0 for p in row[start:end]) / (end - start), 3))
+                    for start, end in DaySchedule(0, mask).off_intervals()
+                ))
+            self._runs = tuple(runs)
+        return self._runs
+
+
+def likely_off(profile: OutageProfile, first: date, last: date) -> tuple[LikelyOff, ...]:
+    """Ймовірні відключення на дні [first; last] за профілем дня тижня."""
+    runs = profile.likely_runs()
+    windows: list[LikelyOff] = []
+    day = first
+    while day <= last:
+        day_iso = day.isoformat()
+        windows.extend(LikelyOff(day_iso, start, end, p) for start, end, p in runs[day.weekday()])
+        day += timedelta(days=1)
+    return tuple(windows)
+
+
+def weekday_known(profile: Optional[Profile], samples: Optional[tuple[int, ...]], weekday: int) -> bool:
+    """Чи є з чого прогнозувати цей день тижня: досить днів в архіві й хоч один слот з ймовірністю."""
+    if not profile or not samples or samples[weekday] < MIN_SAMPLES:
+        return False
+    return any(p is not None for p in profile[weekday])
+
+
+def forecast_minutes(windows: tuple[LikelyOff, ...], day: str) -> int:
+    """Сума хвилин ймовірних відключень дня (реальні хвилини, з урахуванням DST)."""
+    minutes = slot_minutes(date.fromisoformat(day))
+    return sum(sum(minutes[w.start:w.end]) for w in windows if w.day == day)
+
+
+def profile_as_dict(profile: Profile) -> dict[str, list[Optional[float]]]:
+    """Для атрибутів: день тижня -> 48 значень у %."""
+    return {
+        name: [round(p * 100, 1) if p is not None else None for p in row]
+        for name, row in zip(WEEKDAYS, profile)
+    }
+
+
+def window_as_dict(window: LikelyOff) -> dict[str, Any]:
+    return {
+        "date": window.day,
+        "start": SLOT_LABELS[window.start],
+        "end": SLOT_LABELS[window.end % SLOTS_PER_DAY],
+        "probability": round(window.probability * 100, 1),
+    }
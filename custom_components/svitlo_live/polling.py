@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from homeassistant.util import dt as dt_util
+
+TZ_KYIV = dt_util.get_time_zone("Europe/Kyiv")
+
+# Після реальної зміни розкладу годину опитуємо з мінімальним інтервалом —
+# оновлення зазвичай приходять серіями
+RECENT_CHANGE = timedelta(hours=1)
+
+# Кожні стільки годин без змін інтервал подвоюється (до верхньої межі)
+STABLE_DOUBLING = timedelta(hours=2)
+
+# Гістограма змін за годиною доби (Київ): кожна нова зміна трохи "старить" попередні,
+# щоб розклад публікацій міг зсуватися з часом
+HISTORY_DECAY = 0.95
+# Скільки змін потрібно, щоб довіряти гістограмі замість апріорного вікна
+MIN_LEARNED_CHANGES = 3
+# "Гаряча" година — змін щонайменше вдвічі більше за рівномірну частку
+HOT_FACTOR = 2.0
+# Поки статистики мало: графік на завтра зазвичай з'являється ввечері
+PRIOR_PUBLICATION_HOURS = frozenset(range(15, 24))
+
+
+class PollScheduler:
+    """Адаптивний інтервал опитування хаба.
+
+    Мінімальний інтервал — одразу після зміни розкладу і поки графіка на завтра
+    немає у "гарячі" години; поза ними й без змін інтервал росте до верхньої межі.
+    "Гарячі" години вчаться з моментів реальних змін (гістограма за годиною доби).
+    """
+
+    def __init__(self, base: timedelta) -> None:
+        self._base = base
+        self._started = dt_util.utcnow()
+        self.hours: list[float] = [0.0] * 24
+        self.changes = 0
+        self.last_change: Optional[datetime] = None
+        # Останнє рішення — для diagnostics і діагностичного сенсора
+        self.interval = base
+        self.reason = "default"
+        self.next_poll: Optional[datetime] = None
+
+    @property
+    def learned(self) -> bool:
+        return self.changes >= MIN_LEARNED_CHANGES
+
+    def record_change(self, when: datetime) -> None:
+        hour = when.astimezone(TZ_KYIV).hour
+        self.hours = [weight * HISTORY_DECAY for weight in self.hours]
+        self.hours[hour] += 1.0
+        self.changes += 1
+        self.last_change = when
+
+    def is_hot(self, hour: int) -> bool:
+        if not self.learned:
+            return hour in PRIOR_PUBLICATION_HOURS
+        total = sum(self.hours)
+        return total > 0 and self.hours[hour] >= HOT_FACTOR * total / 24
+
+    def hot_hours(self) -> list[int]:
+        return [hour for hour in range(24) if self.is_hot(hour)]
+
+    def next_interval(
+        self, now: datetime, low: timedelta, high: timedelta, awaiting_tomorrow: bool
+    ) -> timedelta:
+        """Інтервал до наступного опитування в межах [low, high]; причина — у self.reason."""
+        high = max(low, high)
+        hour = now.astimezone(TZ_KYIV).hour
+        # година перед "гарячою" теж рахується: публікація може прийти на її початку
+        hot = self.is_hot(hour) or self.is_hot((hour + 1) % 24)
+
+        if self.last_change is not None and now - self.last_change < RECENT_CHANGE:
+            interval, reason = low, "recent_change"
+        elif awaiting_tomorrow and hot:
+            interval, reason = low, "awaiting_tomorrow"
+        elif hot:
+            interval, reason = self._base, "change_window"
+        else:
+            stable_for = now - (self.last_change or self._started)
+            steps = min(int(stable_for / STABLE_DOUBLING), 8)
+            interval, reason = self._base * 2**steps, "stable"
+
+        self.interval = min(max(interval, low), high)
+        self.reason = reason
+        return self.interval
+
+    # ---------------------------------------------------------------------
+    # Збереження разом зі знімком (історія змін переживає перезапуск)
+    # ---------------------------------------------------------------------
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "hours": [round(weight, 4) for weight in self.hours],
+            "changes": self.changes,
+            "last_change": self.last_change.isoformat() if self.last_change else None,
+        }
+
+    def restore(self, data: dict[str, Any]) -> None:
+        hours = [float(weight) for weight in data.get("hours") or []]
+        if len(hours) == 24:
+            self.hours = hours
+        self.changes = int(data.get("changes") or 0)
+        last_change = data.get("last_change")
+        self.last_change = dt_util.parse_datetime(last_change) if last_change else None
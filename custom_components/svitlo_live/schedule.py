@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from typing import Any, Iterator, Optional
+
+# Півгодинних слотів у добі (за мітками API)
+SLOTS_PER_DAY = 48
+_FULL = (1 << SLOTS_PER_DAY) - 1
+
+# Мітки 48 півгодинних слотів у порядку API ("00:00" ... "23:30")
+SLOT_LABELS: tuple[str, ...] = tuple(f"{h:02d}:{m:02d}" for h in range(24) for m in (0, 30))
+
+STATE_ON = "on"
+STATE_OFF = "off"
+STATE_UNKNOWN = "unknown"
+
+
+def _lowest_bit(mask: int) -> int:
+    """Індекс наймолодшого встановленого біта (mask > 0)."""
+    return (mask & -mask).bit_length() - 1
+
+
+class DaySchedule:
+    """Розклад одного дня як дві 48-бітні маски: біт i = слот i (00:00, 00:30, ...).
+
+    Слот, що не входить у жодну маску, — "unknown". Об'єкт незмінний і
+    спільний для всіх координаторів, що читають той самий знімок.
+    """
+
+    __slots__ = ("on_mask", "off_mask")
+
+    def __init__(self, on_mask: int = 0, off_mask: int = 0) -> None:
+        object.__setattr__(self, "on_mask", on_mask & _FULL)
+        object.__setattr__(self, "off_mask", off_mask & _FULL & ~on_mask)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError("DaySchedule is immutable")
+
+    # ---------------------------------------------------------------------
+    # Порівняння / хешування
+    # ---------------------------------------------------------------------
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DaySchedule):
+            return NotImplemented
+        return self.on_mask == other.on_mask and self.off_mask == other.off_mask
+
+    def __hash__(self) -> int:
+        return hash((self.on_mask, self.off_mask))
+
+    def __repr__(self) -> str:
+        return f"DaySchedule(on={self.on_mask:012x}, off={self.off_mask:012x})"
+
+    def __bool__(self) -> bool:
+        return self.has_slots
+
+    # ---------------------------------------------------------------------
+    # Запити
+    # ---------------------------------------------------------------------
+
+    @property
+    def has_slots(self) -> bool:
+        """Є хоч один відомий (on/off) слот."""
+        return bool(self.on_mask | self.off_mask)
+
+    def _mask_for(self, state: str) -> int:
+        if state == STATE_ON:
+            return self.on_mask
+        if state == STATE_OFF:
+            return self.off_mask
+        return _FULL & ~(self.on_mask | self.off_mask)
+
+    def state_at(self, idx: int) -> str:
+        bit = 1 << idx
+        if self.on_mask & bit:
+            return STATE_ON
+        if self.off_mask & bit:
+            return STATE_OFF
+        return STATE_UNKNOWN
+
+    def next_change(self, idx: int) -> Optional[int]:
+        """Перший слот після idx з іншим станом (по колу в межах доби), або None."""
+        diff = _FULL & ~self._mask_for(self.state_at(idx))
+        later = diff >> (idx + 1)
+        if later:
+            return idx + 1 + _lowest_bit(later)
+        earlier = diff & ((1 << idx) - 1)
+        if earlier:
+            return _lowest_bit(earlier)
+        return None
+
+    def next_run_start(self, state: str, start: int = 0) -> Optional[int]:
+        """Перший слот >= start, з якого починається серія state (попередній слот — в іншому стані)."""
+        if start >= SLOTS_PER_DAY:
+            return None
+        mask = self._mask_for(state)
+        starts = (mask & ~(mask << 1)) >> start
+        if not starts:
+            return None
+        return start + _lowest_bit(starts)
+
+    def off_intervals(self) -> list[tuple[int, int]]:
+        """Суцільні відключення як [(start_idx, end_idx)), end_idx до 48 включно."""
+        return list(self._runs(self.off_mask))
+
+    def on_intervals(self) -> list[tuple[int, int]]:
+        """Суцільні періоди зі світлом, так само [(start_idx, end_idx))."""
+        return list(self._runs(self.on_mask))
+
+    @staticmethod
+    def _runs(mask: int) -> Iterator[tuple[int, int]]:
+        pos = 0
+        while mask:
+            skip = _lowest_bit(mask)
+            mask >>= skip
+            pos += skip
+            # кількість молодших одиничок = довжина серії
+            length = (mask ^ (mask + 1)).bit_length() - 1
+            yield pos, pos + length
+            mask >>= length
+            pos += length
+
+    def off_windows(self) -> list[dict[str, Any]]:
+        """off_intervals() у вигляді для подій/шаблонів: {"start": "HH:MM", "end": "HH:MM", "minutes": N}.
+
+        Кінець доби позначається "00:00", як і в описі подій календаря.
+        """
+        return [
+            {
+                "start": SLOT_LABELS[start],
+                "end": SLOT_LABELS[end % SLOTS_PER_DAY],
+                "minutes": (end - start) * 30,
+            }
+            for start, end in self.off_intervals()
+        ]
+
+
+EMPTY_DAY = DaySchedule()
@@ -1,36 +1,73 @@
 from __future__ import annotations
+from datetime import date, timedelta
 from typing import Any, Optional
-from datetime import timedelta
 
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN
+from .aggregate import RegionDay
+from .const import DOMAIN, DATA_CLOCK, DATA_HUB
+from .coordinator import REGION_KEY
+from .forecast import forecast_minutes, profile_as_dict, weekday_known, window_as_dict
+from .slots import slot_boundaries
 
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    entities: list[SensorEntity] = [
-        SvitloStatusSensor(coordinator),                 # Grid ON / Grid OFF / No schedules / No data
-        SvitloNextGridConnectionSensor(coordinator),     # TIMESTAMP
-        SvitloNextOutageSensor(coordinator),             # TIMESTAMP
-        SvitloMinutesToGridConnection(coordinator),      # minutes (number) — автооновлення кожні 30с
-        SvitloMinutesToOutage(coordinator),              # minutes (number) — автооновлення кожні 30с
-        SvitloScheduleUpdatedSensor(coordinator),        # TIMESTAMP
+    hub = hass.data[DOMAIN][DATA_HUB]
+    entities: list[SensorEntity] = []
+    # Окремий пристрій на кожну чергу entry; дані всіх черг — з одного координатора
+    for queue in coordinator.queues:
+        entities += [
+            SvitloStatusSensor(coordinator, queue),                 # Grid ON / Grid OFF / No schedules / No data
+            SvitloNextGridConnectionSensor(coordinator, queue),     # TIMESTAMP
+            SvitloNextOutageSensor(coordinator, queue),             # TIMESTAMP
+            SvitloMinutesToGridConnection(coordinator, queue),      # minutes (number) — спільний годинник, щохвилини
+            SvitloMinutesToOutage(coordinator, queue),              # minutes (number) — спільний годинник, щохвилини
+            SvitloScheduleUpdatedSensor(coordinator, queue),        # TIMESTAMP — остання зміна розкладу
+            SvitloOutageMinutesSensor(coordinator, queue, "today"),     # min — планових відключень за добу
+            SvitloOutageMinutesSensor(coordinator, queue, "tomorrow"),  # min — те саме на завтра
+            SvitloOutageWindowsSensor(coordinator, queue),          # кількість відключень сьогодні
+            SvitloLongestOutageSensor(coordinator, queue),          # min — найдовше відключення сьогодні
+            SvitloLongestPoweredSensor(coordinator, queue),         # min — найдовший період зі світлом сьогодні
+            SvitloOutageForecastSensor(coordinator, queue),         # min — прогноз на найближчий неопублікований день
+        ]
+    # Діагностика хаба й entry — по одній на entry (на пристрої першої черги, unique_id як раніше)
+    first = coordinator.queues[0]
+    entities += [
+        SvitloLastPollSensor(coordinator, first),                            # TIMESTAMP — останнє опитування
+        SvitloFetchLatencySensor(coordinator, first, hub.telemetry),         # ms — p95 спільного фетчу
+        SvitloPayloadBuildSensor(coordinator, first, coordinator.telemetry), # ms — p95 побудови payload entry
+        SvitloPollIntervalSensor(coordinator, first),                        # min — поточний адаптивний інтервал хаба
     ]
+    if coordinator.region_wide:
+        # Зведення по всій області — окремий пристрій, payload REGION_KEY
+        entities += [
+            SvitloRegionOffSensor(coordinator),      # черг без світла зараз
+            SvitloRegionShareSensor(coordinator),    # % черг без світла зараз + по слотах
+            SvitloRegionPeakSensor(coordinator),     # TIMESTAMP — пік відключень сьогодні
+        ]
     async_add_entities(entities)
 
 
 class SvitloBaseEntity(CoordinatorEntity, SensorEntity):
-    def __init__(self, coordinator) -> None:
-        super().__init__(coordinator)
+    def __init__(self, coordinator, queue: str) -> None:
+        # контекст = черга: координатор будить ентіті лише при зміні її payload
+        super().__init__(coordinator, context=queue)
+        self._queue = queue
+
+    @property
+    def queue_data(self) -> Optional[dict[str, Any]]:
+        """payload черги цієї ентіті (None — даних ще немає)."""
+        data = getattr(self.coordinator, "data", None)
+        return data.get(self._queue) if data else None
 
     @property
     def available(self) -> bool:
@@ -40,7 +77,7 @@ class SvitloBaseEntity(CoordinatorEntity, SensorEntity):
     @property
     def device_info(self) -> dict[str, Any]:
         region = getattr(self.coordinator, "region", "region")
-        queue = getattr(self.coordinator, "queue", "queue")
+        queue = self._queue
         return {
             "identifiers": {(DOMAIN, f"{region}_{queue}")},
             "manufacturer": "svitlo.live",
@@ -54,13 +91,13 @@ class SvitloStatusSensor(SvitloBaseEntity):
     _attr_name = "Electricity"
     _attr_icon = "mdi:transmission-tower"
 
-    def __init__(self, coordinator) -> None:
-        super().__init__(coordinator)
-        self._attr_unique_id = f"svitlo_status_{coordinator.region}_{coordinator.queue}"
+    def __init__(self, coordinator, queue: str) -> None:
+        super().__init__(coordinator, queue)
+        self._attr_unique_id = f"svitlo_status_{coordinator.region}_{queue}"
 
     @property
     def native_value(self) -> str | None:
-        data = getattr(self.coordinator, "data", None)
+        data = self.queue_data
         if not data or not getattr(self.coordinator, "last_update_success", False):
             return "No data"
         val = data.get("now_status")  # "on"/"off"/"unknown"/"nosched"
@@ -72,6 +109,17 @@ class SvitloStatusSensor(SvitloBaseEntity):
             return "No schedules"
         return "No data"
 
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        # Проксі недоступний, а показується останній вдалий розклад
+        stale_since = getattr(self.coordinator, "stale_since", None)
+        fetched = getattr(self.coordinator, "last_polled_utc", None) if stale_since else None
+        return {
+            "stale": stale_since is not None,
+            "stale_since": stale_since.isoformat() if stale_since else None,
+            "data_fetched_at": fetched.isoformat() if fetched else None,
+        }
+
 
 # ---------- TIMESTAMP сенсори (як раніше) ----------
 
@@ -81,13 +129,13 @@ class SvitloNextGridConnectionSensor(SvitloBaseEntity):
     _attr_icon = "mdi:clock-check"
     _attr_device_class = SensorDeviceClass.TIMESTAMP
 
-    def __init__(self, coordinator) -> None:
-        super().__init__(coordinator)
-        self._attr_unique_id = f"svitlo_next_grid_{coordinator.region}_{coordinator.queue}"
+    def __init__(self, coordinator, queue: str) -> None:
+        super().__init__(coordinator, queue)
+        self._attr_unique_id = f"svitlo_next_grid_{coordinator.region}_{queue}"
 
     @property
     def native_value(self):
-        d = getattr(self.coordinator, "data", None)
+        d = self.queue_data
         if not d or not getattr(self.coordinator, "last_update_success", False):
             return None
         if d.get("now_status") != "off":
@@ -102,13 +150,13 @@ class SvitloNextOutageSensor(SvitloBaseEntity):
     _attr_icon = "mdi:clock-alert"
     _attr_device_class = SensorDeviceClass.TIMESTAMP
 
-    def __init__(self, coordinator) -> None:
-        super().__init__(coordinator)
-        self._attr_unique_id = f"svitlo_next_off_{coordinator.region}_{coordinator.queue}"
+    def __init__(self, coordinator, queue: str) -> None:
+        super().__init__(coordinator, queue)
+        self._attr_unique_id = f"svitlo_next_off_{coordinator.region}_{queue}"
 
     @property
     def native_value(self):
-        d = getattr(self.coordinator, "data", None)
+        d = self.queue_data
         if not d or not getattr(self.coordinator, "last_update_success", False):
             return None
         if d.get("now_status") != "on":
@@ -120,29 +168,39 @@ class SvitloNextOutageSensor(SvitloBaseEntity):
 # ---------- Нові числові сенсори (хвилини до події) з локальним таймером ----------
 
 class _MinutesBase(SvitloBaseEntity):
-    """База для розрахунку хвилин до ISO-часу з автооновленням."""
+    """База для розрахунку хвилин до ISO-часу з автооновленням від спільного годинника."""
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_native_unit_of_measurement = "min"
 
-    _unsub_timer = None
+    _last_value: Optional[int] = None
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
+        self._last_value = self.native_value
+        # Годинник прокидається раз на хвилину лише поки якийсь відлік активний
+        clock = self.hass.data[DOMAIN][DATA_CLOCK]
+        self.async_on_remove(clock.async_register(self))
 
-        # Оновлюємо відображення кожні 30 секунд без жодних зовнішніх запитів
-        @callback
-        def _tick(now) -> None:
-            self.async_write_ha_state()
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._last_value = self.native_value
+        super()._handle_coordinator_update()
+        self.hass.data[DOMAIN][DATA_CLOCK].async_arm()
 
-        self._unsub_timer = async_track_time_interval(
-            self.hass, _tick, timedelta(seconds=30)
-        )
-
-    async def async_will_remove_from_hass(self) -> None:
-        await super().async_will_remove_from_hass()
-        if self._unsub_timer:
-            self._unsub_timer()
-            self._unsub_timer = None
+    @property
+    def countdown_active(self) -> bool:
+        return self._last_value is not None
+
+    @callback
+    def async_clock_tick(self) -> None:
+        """Тік спільного годинника: пишемо стан лише якщо ціле число хвилин змінилось."""
+        value = self.native_value
+        if value == self._last_value:
+            return
+        self._last_value = value
+        self.coordinator.telemetry.incr("entity_writes")
+        self.coordinator.telemetry.incr("countdown_writes")
+        self.async_write_ha_state()
 
     def _minutes_until(self, iso_utc: Optional[str]) -> Optional[int]:
         """Повертає ceil різниці в хвилинах між target і поточним UTC.
@@ -166,13 +224,13 @@ class SvitloMinutesToGridConnection(_MinutesBase):
     _attr_name = "Minutes to grid connection"
     _attr_icon = "mdi:timer-sand"
 
-    def __init__(self, coordinator) -> None:
-        super().__init__(coordinator)
-        self._attr_unique_id = f"svitlo_min_to_on_{coordinator.region}_{coordinator.queue}"
+    def __init__(self, coordinator, queue: str) -> None:
+        super().__init__(coordinator, queue)
+        self._attr_unique_id = f"svitlo_min_to_on_{coordinator.region}_{queue}"
 
     @property
     def native_value(self) -> Optional[int]:
-        d = getattr(self.coordinator, "data", None)
+        d = self.queue_data
         if not d or not getattr(self.coordinator, "last_update_success", False):
             return None
         if d.get("now_status") != "off":
@@ -185,13 +243,13 @@ class SvitloMinutesToOutage(_MinutesBase):
     _attr_name = "Minutes to outage"
     _attr_icon = "mdi:timer-sand"
 
-    def __init__(self, coordinator) -> None:
-        super().__init__(coordinator)
-        self._attr_unique_id = f"svitlo_min_to_off_{coordinator.region}_{coordinator.queue}"
+    def __init__(self, coordinator, queue: str) -> None:
+        super().__init__(coordinator, queue)
+        self._attr_unique_id = f"svitlo_min_to_off_{coordinator.region}_{queue}"
 
     @property
     def native_value(self) -> Optional[int]:
-        d = getattr(self.coordinator, "data", None)
+        d = self.queue_data
         if not d or not getattr(self.coordinator, "last_update_success", False):
             return None
         if d.get("now_status") != "on":
@@ -202,19 +260,411 @@ class SvitloMinutesToOutage(_MinutesBase):
 # ---------- Updated timestamp for “Schedule Updated” ----------
 
 class SvitloScheduleUpdatedSensor(SvitloBaseEntity):
-    """Час останнього опитування як timestamp."""
+    """Час останньої реальної зміни розкладу як timestamp (не кожного опитування)."""
     _attr_name = "Schedule Updated"
     _attr_icon = "mdi:update"
     _attr_device_class = SensorDeviceClass.TIMESTAMP
 
+    def __init__(self, coordinator, queue: str) -> None:
+        super().__init__(coordinator, queue)
+        self._attr_unique_id = f"svitlo_updated_{coordinator.region}_{queue}"
+
+    @property
+    def native_value(self):
+        if not self.queue_data:
+            return None
+        return self.coordinator.last_changed_utc.get(self._queue)
+
+
+# ---------- Підсумки доби (рахуються координатором раз на зміну розкладу) ----------
+
+class _DayStatBase(SvitloBaseEntity):
+    """Число з today_stats / tomorrow_stats payload; значення на завтра — в атрибуті "tomorrow"."""
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    _stat: str
+    _tomorrow_attr = True
+
+    def __init__(self, coordinator, queue: str, day: str = "today") -> None:
+        super().__init__(coordinator, queue)
+        self._day = day
+
+    def _value(self, day: str) -> Optional[int]:
+        d = self.queue_data
+        if not d or not getattr(self.coordinator, "last_update_success", False):
+            return None
+        stats = d.get(f"{day}_stats")
+        return stats[self._stat] if stats else None
+
+    @property
+    def native_value(self) -> Optional[int]:
+        return self._value(self._day)
+
+    @property
+    def extra_state_attributes(self) -> Optional[dict[str, Any]]:
+        if not self._tomorrow_attr:
+            return None
+        return {"tomorrow": self._value("tomorrow")}
+
+
+class _DayMinutesBase(_DayStatBase):
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = "min"
+
+
+class SvitloOutageMinutesSensor(_DayMinutesBase):
+    """Скільки хвилин без світла за графіком на добу (сьогодні або завтра)."""
+    _attr_icon = "mdi:power-plug-off-outline"
+    _stat = "off_minutes"
+    # завтра — окремий сенсор
+    _tomorrow_attr = False
+
+    def __init__(self, coordinator, queue: str, day: str) -> None:
+        super().__init__(coordinator, queue, day)
+        self._attr_name = f"Outage minutes {day}"
+        self._attr_unique_id = f"svitlo_off_minutes_{day}_{coordinator.region}_{queue}"
+
+
+class SvitloOutageWindowsSensor(_DayStatBase):
+    """Кількість окремих відключень сьогодні."""
+    _attr_name = "Outages today"
+    _attr_icon = "mdi:counter"
+    _stat = "off_windows"
+
+    def __init__(self, coordinator, queue: str) -> None:
+        super().__init__(coordinator, queue)
+        self._attr_unique_id = f"svitlo_off_windows_{coordinator.region}_{queue}"
+
+
+class SvitloLongestOutageSensor(_DayMinutesBase):
+    """Найдовше суцільне відключення сьогодні, хв."""
+    _attr_name = "Longest outage today"
+    _attr_icon = "mdi:timer-off-outline"
+    _stat = "longest_off_minutes"
+
+    def __init__(self, coordinator, queue: str) -> None:
+        super().__init__(coordinator, queue)
+        self._attr_unique_id = f"svitlo_longest_off_{coordinator.region}_{queue}"
+
+
+class SvitloLongestPoweredSensor(_DayMinutesBase):
+    """Найдовший суцільний період зі світлом сьогодні, хв."""
+    _attr_name = "Longest powered window today"
+    _attr_icon = "mdi:timer-outline"
+    _stat = "longest_on_minutes"
+
+    def __init__(self, coordinator, queue: str) -> None:
+        super().__init__(coordinator, queue)
+        self._attr_unique_id = f"svitlo_longest_on_{coordinator.region}_{queue}"
+
+
+class SvitloOutageForecastSensor(SvitloBaseEntity):
+    """Прогноз з архіву: хвилини ймовірних відключень у найближчий ще не опублікований день.
+
+    В атрибутах — вікна прогнозу на FORECAST_DAYS уперед і профіль ймовірностей
+    (день тижня × слот, %); значення профілю в recorder не пишуться.
+    """
+    _attr_name = "Outage forecast"
+    _attr_icon = "mdi:crystal-ball"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = "min"
+    _unrecorded_attributes = frozenset({"windows", "profile", "samples"})
+
+    def __init__(self, coordinator, queue: str) -> None:
+        super().__init__(coordinator, queue)
+        self._attr_unique_id = f"svitlo_forecast_{coordinator.region}_{queue}"
+
+    def _forecast_date(self, d: dict[str, Any]) -> Optional[str]:
+        """Перший день прогнозу: завтра, якщо графіка ще немає, інакше післязавтра."""
+        if not d.get("date"):
+            return None
+        first = date.fromisoformat(d["date"]) + timedelta(days=2 if d.get("tomorrow_schedule") else 1)
+        return first.isoformat()
+
+    @property
+    def native_value(self) -> Optional[int]:
+        d = self.queue_data
+        if not d or not getattr(self.coordinator, "last_update_success", False):
+            return None
+        day = self._forecast_date(d)
+        # Порожній архів для цього дня тижня — "невідомо", а не 0 хв у довгостроковій статистиці
+        if not day or not weekday_known(d.get("outage_profile"), d.get("outage_samples"), date.fromisoformat(day).weekday()):
+            return None
+        return forecast_minutes(d.get("forecast", ()), day)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        d = self.queue_data or {}
+        profile = d.get("outage_profile")
+        samples = d.get("outage_samples")
+        return {
+            "forecast_date": self._forecast_date(d),
+            "windows": [window_as_dict(w) for w in d.get("forecast", ())],
+            "profile": profile_as_dict(profile) if profile else None,
+            "samples": list(samples) if samples else None,
+        }
+
+
+class SvitloLastPollSensor(SvitloBaseEntity):
+    """Час останнього опитування API (діагностика; оновлюється навіть без змін розкладу)."""
+    _attr_name = "Last poll"
+    _attr_icon = "mdi:cloud-sync"
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator, queue: str) -> None:
+        super().__init__(coordinator, queue)
+        self._attr_unique_id = f"svitlo_last_poll_{coordinator.region}_{queue}"
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_poll_listener(self.async_write_ha_state)
+        )
+
+    @property
+    def native_value(self):
+        return getattr(self.coordinator, "last_polled_utc", None)
+
+
+class SvitloPollIntervalSensor(SvitloBaseEntity):
+    """Поточний інтервал опитування хаба (адаптивний) і чому саме такий."""
+    _attr_name = "Poll interval"
+    _attr_icon = "mdi:timer-sync-outline"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = "min"
+    _attr_suggested_display_precision = 0
+
+    def __init__(self, coordinator, queue: str) -> None:
+        super().__init__(coordinator, queue)
+        self._attr_unique_id = f"svitlo_poll_interval_{coordinator.region}_{queue}"
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        # інтервал перераховується після кожного опитування — разом із телеметрією хаба
+        hub_telemetry = self.hass.data[DOMAIN][DATA_HUB].telemetry
+        self.async_on_remove(hub_telemetry.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def native_value(self) -> float:
+        return round(self.hass.data[DOMAIN][DATA_HUB].poller.interval.total_seconds() / 60, 1)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        hub = self.hass.data[DOMAIN][DATA_HUB]
+        poller = hub.poller
+        low, high = hub.poll_bounds()
+        return {
+            "reason": poller.reason,
+            "next_poll": poller.next_poll.isoformat() if poller.next_poll else None,
+            "min_minutes": low.total_seconds() / 60,
+            "max_minutes": high.total_seconds() / 60,
+            "learned": poller.learned,
+            "hot_hours": poller.hot_hours(),
+            "last_change": poller.last_change.isoformat() if poller.last_change else None,
+        }
+
+
+# ---------- Діагностика конвеєра (телеметрія хаба / координатора) ----------
+
+class _TelemetryBase(SvitloBaseEntity):
+    """p95 гістограми телеметрії; оновлюється раз на цикл опитування хаба."""
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = "ms"
+    _attr_suggested_display_precision = 1
+
+    _histogram: str
+
+    def __init__(self, coordinator, queue: str, telemetry) -> None:
+        super().__init__(coordinator, queue)
+        # телеметрія хаба (спільний фетч) чи координатора (payload черги)
+        self._telemetry = telemetry
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        hub_telemetry = self.hass.data[DOMAIN][DATA_HUB].telemetry
+        self.async_on_remove(hub_telemetry.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def native_value(self) -> Optional[float]:
+        stats = self._telemetry.get(self._histogram)
+        value = stats.percentile(0.95) if stats else None
+        return round(value, 2) if value is not None else None
+
+
+class SvitloFetchLatencySensor(_TelemetryBase):
+    """Затримка спільного фетчу проксі (p95) + розмір, декодування, лічильники запитів."""
+    _attr_name = "Fetch latency"
+    _attr_icon = "mdi:timer-outline"
+    _histogram = "fetch_ms"
+
+    def __init__(self, coordinator, queue: str, telemetry) -> None:
+        super().__init__(coordinator, queue, telemetry)
+        self._attr_unique_id = f"svitlo_fetch_latency_{coordinator.region}_{queue}"
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        telemetry = self._telemetry
+        attrs: dict[str, Any] = dict(telemetry.counters)
+        for name in ("fetch_ms", "payload_bytes", "decode_ms", "snapshot_build_ms", "push_ms"):
+            stats = telemetry.get(name)
+            if stats:
+                attrs[name] = stats.as_dict()
+        return attrs
+
+
+class SvitloPayloadBuildSensor(_TelemetryBase):
+    """Час побудови payload усіх черг entry зі знімка (p95) + тіки й записи ентіті."""
+    _attr_name = "Payload build time"
+    _attr_icon = "mdi:cog-outline"
+    _histogram = "payload_build_ms"
+
+    def __init__(self, coordinator, queue: str, telemetry) -> None:
+        super().__init__(coordinator, queue, telemetry)
+        self._attr_unique_id = f"svitlo_build_time_{coordinator.region}_{queue}"
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        # точні тіки оновлюють телеметрію entry без опитування — слухаємо координатор без контексту черги
+        self.async_on_remove(self.coordinator.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        telemetry = self._telemetry
+        attrs: dict[str, Any] = dict(telemetry.counters)
+        for name in ("payload_build_ms", "slot_advance_ms"):
+            stats = telemetry.get(name)
+            if stats:
+                attrs[name] = stats.as_dict()
+        return attrs
+
+
+
+# ---------- Зведення по області (усі черги, одна матриця слотів) ----------
+
+class _RegionBase(SvitloBaseEntity):
+    """Сенсори області: payload REGION_KEY, оновлюється лише при зміні набору черг без світла."""
+    _attr_icon = "mdi:map-marker-radius"
+
+    def __init__(self, coordinator) -> None:
+        super().__init__(coordinator, REGION_KEY)
+
+    @property
+    def device_info(self) -> dict[str, Any]:
+        region = getattr(self.coordinator, "region", "region")
+        return {
+            "identifiers": {(DOMAIN, f"{region}_region")},
+            "manufacturer": "svitlo.live",
+            "model": "Region",
+            "name": f"Svitlo • {region}",
+        }
+
+    @property
+    def region_data(self) -> Optional[dict[str, Any]]:
+        data = self.queue_data
+        if not data or not getattr(self.coordinator, "last_update_success", False):
+            return None
+        return data
+
+
+class SvitloRegionOffSensor(_RegionBase):
+    """Скільки черг області зараз без світла (за графіком)."""
+    _attr_name = "Queues without power"
+    _attr_icon = "mdi:transmission-tower-off"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, coordinator) -> None:
+        super().__init__(coordinator)
+        self._attr_unique_id = f"svitlo_region_off_{coordinator.region}"
+
+    @property
+    def native_value(self) -> Optional[int]:
+        data = self.region_data
+        return len(data["queues_off"]) if data else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        data = self.region_data or {}
+        today: Optional[RegionDay] = data.get("today_matrix")
+        return {
+            "queues_off": data.get("queues_off", []),
+            "queues_total": len(today.queues) if today else 0,
+            "next_change_at": data.get("next_change_at"),
+        }
+
+
+class SvitloRegionShareSensor(_RegionBase):
+    """Частка черг області без світла зараз, %; по слотах сьогодні/завтра — в атрибутах."""
+    _attr_name = "Outage share"
+    _attr_icon = "mdi:chart-bar"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = "%"
+    _attr_suggested_display_precision = 1
+    # 48 значень на добу — не для recorder
+    _unrecorded_attributes = frozenset({"today", "tomorrow"})
+
     def __init__(self, coordinator) -> None:
         super().__init__(coordinator)
-        self._attr_unique_id = f"svitlo_updated_{coordinator.region}_{coordinator.queue}"
+        self._attr_unique_id = f"svitlo_region_share_{coordinator.region}"
+
+    @property
+    def native_value(self) -> Optional[float]:
+        data = self.region_data
+        return data["off_share"] if data else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        data = self.region_data or {}
+        today: Optional[RegionDay] = data.get("today_matrix")
+        tomorrow: Optional[RegionDay] = data.get("tomorrow_matrix")
+        return {
+            "today": today.shares() if today else None,
+            "tomorrow": tomorrow.shares() if tomorrow else None,
+        }
+
+
+class SvitloRegionPeakSensor(_RegionBase):
+    """TIMESTAMP: початок слота сьогодні, коли без світла найбільше черг області (перший такий)."""
+    _attr_name = "Peak outage"
+    _attr_icon = "mdi:chart-bell-curve"
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+
+    def __init__(self, coordinator) -> None:
+        super().__init__(coordinator)
+        self._attr_unique_id = f"svitlo_region_peak_{coordinator.region}"
+
+    @staticmethod
+    def _peak_at(day_iso: Optional[str], matrix: Optional[RegionDay]):
+        peak = matrix.peak() if matrix else None
+        if peak is None or not day_iso:
+            return None, None
+        return slot_boundaries(date.fromisoformat(day_iso))[peak], peak
 
     @property
     def native_value(self):
-        d = getattr(self.coordinator, "data", None)
-        if not d:
+        data = self.region_data
+        if not data:
             return None
-        iso_val = d.get("updated")
-        return dt_util.parse_datetime(iso_val) if iso_val else None
+        return self._peak_at(data.get("date"), data.get("today_matrix"))[0]
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        data = self.region_data or {}
+        attrs: dict[str, Any] = {}
+        for prefix, day_key, matrix_key in (
+            ("", "date", "today_matrix"),
+            ("tomorrow_", "tomorrow_date", "tomorrow_matrix"),
+        ):
+            matrix: Optional[RegionDay] = data.get(matrix_key)
+            moment, peak = self._peak_at(data.get(day_key), matrix)
+            if prefix:
+                attrs["tomorrow_peak"] = moment.isoformat() if moment else None
+            attrs[f"{prefix}peak_queues_off"] = matrix.off_counts[peak] if peak is not None else 0
+            attrs[f"{prefix}peak_share"] = matrix.share(peak) if peak is not None else None
+        return attrs
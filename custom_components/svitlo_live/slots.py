@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Any, Optional
+
+from homeassistant.util import dt as dt_util
+
+from .schedule import SLOT_LABELS, SLOTS_PER_DAY, DaySchedule
+
+TZ_KYIV = dt_util.get_time_zone("Europe/Kyiv")
+
+# Сьогодні/завтра для кількох черг + сусідні дні на переході доби
+_CACHE_DAYS = 8
+
+
+@lru_cache(maxsize=_CACHE_DAYS)
+def slot_boundaries(day: date) -> tuple[datetime, ...]:
+    """UTC-моменти меж слотів доби day: [i] — початок слоту з міткою SLOT_LABELS[i], [48] — наступна північ.
+
+    Мітки проксі — це настінний час Києва, тому кожна межа рахується окремо через
+    zoneinfo (fold=0), а не додаванням 30 хв: на весняному переході мітки 03:00/03:30
+    не існують і стискаються в нульові слоти, на осінньому 03:xx — перше входження.
+    Кортеж монотонний, тож поточний слот шукається bisect-ом.
+    """
+    bounds = [
+        dt_util.as_utc(datetime.combine(day, time(i // 2, 30 * (i % 2)), tzinfo=TZ_KYIV))
+        for i in range(SLOTS_PER_DAY)
+    ]
+    bounds.append(dt_util.as_utc(datetime.combine(day + timedelta(days=1), time(), tzinfo=TZ_KYIV)))
+    # неіснуючі мітки (fold=0 дає старий зсув) стягуємо до моменту переходу
+    for i in range(SLOTS_PER_DAY - 1, -1, -1):
+        if bounds[i] > bounds[i + 1]:
+            bounds[i] = bounds[i + 1]
+    return tuple(bounds)
+
+
+@lru_cache(maxsize=_CACHE_DAYS)
+def slot_boundaries_iso(day: date) -> tuple[str, ...]:
+    """Ті самі межі в isoformat (так next_on_at / next_off_at лежать у payload)."""
+    return tuple(moment.isoformat() for moment in slot_boundaries(day))
+
+
+@lru_cache(maxsize=_CACHE_DAYS)
+def slot_minutes(day: date) -> tuple[int, ...]:
+    """Фактична тривалість кожного слоту доби day у хвилинах.
+
+    Зазвичай 30. Весняний перехід (напр. 2026-03-29): слоти 6 і 7 (03:00, 03:30) — 0, доба 1380 хв.
+    Осінній (напр. 2026-10-25): слот 7 (03:30) тягнеться до 04:00 після переведення — 90, доба 1500 хв.
+    """
+    bounds = slot_boundaries(day)
+    return tuple(int((bounds[i + 1] - bounds[i]).total_seconds()) // 60 for i in range(SLOTS_PER_DAY))
+
+
+def day_stats(day: date, schedule: DaySchedule) -> Optional[dict[str, Any]]:
+    """Підсумки доби для сенсорів: хвилини без світла, кількість відключень, найдовші періоди.
+
+    Хвилини — реальні (за таблицею меж), тож на добу переходу DST година не губиться
+    й не подвоюється. None — на цю добу розкладу немає.
+    """
+    if not schedule.has_slots:
+        return None
+    minutes = slot_minutes(day)
+    off = [sum(minutes[start:end]) for start, end in schedule.off_intervals()]
+    on = [sum(minutes[start:end]) for start, end in schedule.on_intervals()]
+    return {
+        "off_minutes": sum(off),
+        "off_windows": len(off),
+        "longest_off_minutes": max(off, default=0),
+        "longest_on_minutes": max(on, default=0),
+    }
+
+
+def slot_index_at(day: date, moment: datetime) -> int:
+    """Слот доби day, що містить moment (UTC); поза добою — 0, як і раніше."""
+    bounds = slot_boundaries(day)
+    if not bounds[0] <= moment < bounds[SLOTS_PER_DAY]:
+        return 0
+    return bisect_right(bounds, moment, 0, SLOTS_PER_DAY) - 1
+
+
+def slot_label(idx: int) -> str:
+    """Мітка межі "HH:MM"; 48 (кінець доби) — "00:00"."""
+    return SLOT_LABELS[idx % SLOTS_PER_DAY]
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+
+from .schedule import DaySchedule, EMPTY_DAY, SLOT_LABELS
+
+# Коди слотів API: 1 = є світло, 2 = відключення, решта — невідомо (0)
+SLOT_ON = 1
+SLOT_OFF = 2
+
+_EMPTY: Mapping[str, DaySchedule] = MappingProxyType({})
+
+
+class ApiSnapshot:
+    """Незмінний індекс одного JSON проксі: region -> queue -> date -> DaySchedule.
+
+    Будується один раз на фетч; координатори лише читають з нього за O(1).
+    """
+
+    __slots__ = ("date_today", "date_tomorrow", "_regions")
+
+    def __init__(
+        self,
+        date_today: Optional[str],
+        date_tomorrow: Optional[str],
+        regions: Mapping[str, Mapping[str, Mapping[str, DaySchedule]]],
+    ) -> None:
+        self.date_today = date_today
+        self.date_tomorrow = date_tomorrow
+        self._regions = regions
+
+    @property
+    def regions(self) -> list[str]:
+        return list(self._regions)
+
+    def has_region(self, region: str) -> bool:
+        return region in self._regions
+
+    def queue_days(self, region: str, queue: str) -> Mapping[str, DaySchedule]:
+        """Дні черги: date_iso -> DaySchedule."""
+        return self._regions.get(region, {}).get(queue, _EMPTY)
+
+    def region_queues(self, region: str) -> Mapping[str, Mapping[str, DaySchedule]]:
+        """Усі черги області зі знімка: queue -> date_iso -> DaySchedule."""
+        return self._regions.get(region, _EMPTY)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Компактна форма для Store: пара масок [on, off] замість 48 слотів на день."""
+        return {
+            "date_today": self.date_today,
+            "date_tomorrow": self.date_tomorrow,
+            "regions": {
+                region: {
+                    queue: {day: [sched.on_mask, sched.off_mask] for day, sched in days.items()}
+                    for queue, days in queues.items()
+                }
+                for region, queues in self._regions.items()
+            },
+        }
+
+
+# "HH:MM" -> біт слоту; зайві мітки в JSON просто ігноруються
+_SLOT_BITS: dict[str, int] = {label: 1 << i for i, label in enumerate(SLOT_LABELS)}
+
+
+def _pack_day(slots_map: Any) -> DaySchedule:
+    """{"HH:MM": code} -> DaySchedule; невідомі/інші коди — "unknown"."""
+    if not isinstance(slots_map, dict):
+        return EMPTY_DAY
+    bits = _SLOT_BITS.get
+    on_mask = off_mask = 0
+    for label, code in slots_map.items():
+        bit = bits(label)
+        if bit is None:
+            continue
+        # Проксі віддає int; рядки/float приводимо лише як запасний варіант
+        if code.__class__ is not int:
+            code = _as_int(code)
+        if code == SLOT_ON:
+            on_mask |= bit
+        elif code == SLOT_OFF:
+            off_mask |= bit
+    return DaySchedule(on_mask, off_mask)
+
+
+def _as_int(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def build_snapshot(api: dict[str, Any]) -> ApiSnapshot:
+    """Розбирає повний JSON проксі в ApiSnapshot (один прохід по regions)."""
+    regions: dict[str, Mapping[str, Mapping[str, DaySchedule]]] = {}
+    for region_obj in api.get("regions") or []:
+        cpu = region_obj.get("cpu")
+        if not cpu:
+            continue
+        queues: dict[str, Mapping[str, DaySchedule]] = {}
+        for queue, days in (region_obj.get("schedule") or {}).items():
+            if not isinstance(days, dict):
+                continue
+            queues[queue] = MappingProxyType(
+                {day: _pack_day(slots_map) for day, slots_map in days.items()}
+            )
+        regions[cpu] = MappingProxyType(queues)
+
+    return ApiSnapshot(
+        date_today=api.get("date_today"),
+        date_tomorrow=api.get("date_tomorrow"),
+        regions=MappingProxyType(regions),
+    )
+
+
+def restore_snapshot(data: dict[str, Any]) -> ApiSnapshot:
+    """Зворотне до ApiSnapshot.as_dict(): відновлює знімок зі збереженого на диску."""
+    regions: dict[str, Mapping[str, Mapping[str, DaySchedule]]] = {}
+    for region, queues in data["regions"].items():
+        regions[region] = MappingProxyType({
+            queue: MappingProxyType({
+                day: DaySchedule(int(masks[0]), int(masks[1])) for day, masks in days.items()
+            })
+            for queue, days in queues.items()
+        })
+
+    return ApiSnapshot(
+        date_today=data.get("date_today"),
+        date_tomorrow=data.get("date_tomorrow"),
+        regions=MappingProxyType(regions),
+    )
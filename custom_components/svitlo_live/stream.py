@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from typing import Any, Mapping, Optional
+
+# Пробіли між токенами JSON
+_WS = re.compile(r"[ \t\n\r]*")
+# Що може йти одразу після числа чи літерала в коректному JSON
+_DELIMITERS = frozenset(",}] \t\n\r")
+
+# Стани розбору верхнього рівня {"date_today": ..., "regions": [...], ...}
+_START = 0
+_KEY = 1
+_COLON = 2
+_VALUE = 3
+_AFTER_VALUE = 4
+_ITEM = 5
+_AFTER_ITEM = 6
+_END = 7
+
+# Верхньорівневі поля, які потрібні знімку; решта розбирається й одразу відкидається
+_TOP_KEYS = ("date_today", "date_tomorrow")
+
+
+class RegionStreamParser:
+    """Інкрементальний розбір JSON проксі по шматках відповіді.
+
+    Тримає лише дати та вибрані області/черги: елементи "regions" декодуються
+    по одному (C-сканер json) і невибрані відкидаються одразу, тож у пам'яті
+    ніколи немає ні всього тіла, ні повного дерева — максимум буфер до одного
+    елемента. wanted: region -> черги (None — усі черги області).
+    """
+
+    def __init__(self, wanted: Mapping[str, Optional[frozenset[str]]]) -> None:
+        self._wanted = wanted
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._decode = json.JSONDecoder().raw_decode
+        self._buf = ""
+        self._pos = 0
+        self._state = _START
+        self._key: Optional[str] = None
+        self._top: dict[str, Any] = {}
+        self._regions: list[dict[str, Any]] = []
+        # Незавершений елемент повторно декодуємо, лише коли його хвіст у буфері
+        # подвоївся — інакше дрібні шматки дали б квадратичний час
+        self._wait = 0
+        # Найбільший буфер (символів) за весь розбір і скільки областей відкинуто — для телеметрії
+        self.peak = 0
+        self.skipped = 0
+
+    def feed(self, chunk: bytes) -> None:
+        self._buf += self._text.decode(chunk)
+        self.peak = max(self.peak, len(self._buf))
+        if len(self._buf) - self._pos < self._wait:
+            return
+        self._parse(final=False)
+        # розібране відрізаємо: у буфері лишається тільки незавершений токен
+        self._buf = self._buf[self._pos:]
+        self._pos = 0
+
+    def finish(self) -> dict[str, Any]:
+        """Кінець тіла -> {"date_today", "date_tomorrow", "regions": [вибрані]} для build_snapshot."""
+        self._buf += self._text.decode(b"", final=True)
+        self._parse(final=True)
+        if self._state != _END or _WS.match(self._buf, self._pos).end() != len(self._buf):
+            raise ValueError("Unexpected API payload: truncated or malformed JSON")
+        return {**self._top, "regions": self._regions}
+
+    # ---------------------------------------------------------------------
+
+    def _parse(self, final: bool) -> None:
+        buf = self._buf
+        while True:
+            pos = _WS.match(buf, self._pos).end()
+            if pos >= len(buf):
+                self._pos = pos
+                return
+            char = buf[pos]
+            state = self._state
+
+            if state == _START:
+                if char != "{":
+                    raise ValueError("Unexpected API payload: JSON object expected")
+                self._pos, self._state = pos + 1, _KEY
+            elif state == _KEY:
+                if char == "}":
+                    self._pos, self._state = pos + 1, _END
+                    continue
+                value = self._value(pos, final)
+                if value is None:
+                    return
+                self._key, self._state = value[0], _COLON
+            elif state == _COLON:
+                if char != ":":
+                    raise ValueError(f"Unexpected API payload: ':' expected at {pos}")
+                self._pos, self._state = pos + 1, _VALUE
+            elif state == _VALUE:
+                if self._key == "regions" and char == "[":
+                    self._pos, self._state = pos + 1, _ITEM
+                    continue
+                value = self._value(pos, final)
+                if value is None:
+                    return
+                if self._key in _TOP_KEYS:
+                    self._top[self._key] = value[0]
+                self._state = _AFTER_VALUE
+            elif state == _AFTER_VALUE:
+                if char not in ",}":
+                    raise ValueError(f"Unexpected API payload: ',' or '}}' expected at {pos}")
+                self._pos, self._state = pos + 1, (_KEY if char == "," else _END)
+            elif state == _ITEM:
+                if char == "]":
+                    self._pos, self._state = pos + 1, _AFTER_VALUE
+                    continue
+                value = self._value(pos, final)
+                if value is None:
+                    return
+                self._keep(value[0])
+                self._state = _AFTER_ITEM
+            elif state == _AFTER_ITEM:
+                if char not in ",]":
+                    raise ValueError(f"Unexpected API payload: ',' or ']' expected at {pos}")
+                self._pos, self._state = pos + 1, (_ITEM if char == "," else _AFTER_VALUE)
+            else:
+                # після кореневого об'єкта — лише пробіли (перевіряє finish)
+                self._pos = pos
+                return
+
+    def _value(self, pos: int, final: bool) -> Optional[tuple[Any]]:
+        """Одне JSON-значення з pos; None — потрібні ще дані."""
+        buf = self._buf
+        try:
+            value, end = self._decode(buf, pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            value, end = None, -1
+        # Число/літерал вважаємо завершеним лише коли за ним уже є роздільник: шматок може
+        # обірватися після "-1500." чи "1e", і raw_decode прийняв би початок числа
+        if end < 0 or (
+            not final and buf[pos] not in '{["' and (end == len(buf) or buf[end] not in _DELIMITERS)
+        ):
+            self._pos = pos
+            self._wait = 2 * (len(buf) - pos)
+            return None
+        self._pos = end
+        self._wait = 0
+        return (value,)
+
+    def _keep(self, item: Any) -> None:
+        if not isinstance(item, dict):
+            return
+        cpu = item.get("cpu")
+        if cpu not in self._wanted:
+            self.skipped += 1
+            return
+        schedule = item.get("schedule") or {}
+        queues = self._wanted[cpu]
+        if queues is not None and isinstance(schedule, dict):
+            schedule = {queue: days for queue, days in schedule.items() if queue in queues}
+        self._regions.append({"cpu": cpu, "schedule": schedule})
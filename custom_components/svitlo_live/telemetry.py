@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from collections import deque
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any, Callable, Iterator, Optional
+
+from homeassistant.core import callback
+
+# Скільки останніх вимірів тримає кожна гістограма (перцентилі — по цьому вікну)
+WINDOW = 200
+
+
+class RollingStats:
+    """Останні WINDOW значень + загальна кількість; перцентилі рахуються лише на запит."""
+
+    __slots__ = ("_values", "count", "last")
+
+    def __init__(self, window: int = WINDOW) -> None:
+        self._values: deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.last: Optional[float] = None
+
+    def add(self, value: float) -> None:
+        self._values.append(value)
+        self.count += 1
+        self.last = value
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._values:
+            return None
+        ordered = sorted(self._values)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def as_dict(self) -> dict[str, Any]:
+        if not self._values:
+            return {"count": self.count}
+        ordered = sorted(self._values)
+        n = len(ordered)
+        return {
+            "count": self.count,
+            "last": round(self.last, 3) if self.last is not None else None,
+            "p50": round(ordered[int(0.5 * n)], 3),
+            "p95": round(ordered[min(n - 1, int(0.95 * n))], 3),
+            "p99": round(ordered[min(n - 1, int(0.99 * n))], 3),
+            "max": round(ordered[-1], 3),
+            "mean": round(sum(ordered) / n, 3),
+        }
+
+
+class SvitloTelemetry:
+    """Легкі лічильники й гістограми конвеєра fetch -> знімок -> payload -> ентіті.
+
+    Один екземпляр у хабі (спільний фетч) і по одному в кожному координаторі.
+    Запис — O(1) без блокувань: усе відбувається в event loop.
+    """
+
+    def __init__(self) -> None:
+        self.counters: dict[str, int] = {}
+        self.stats: dict[str, RollingStats] = {}
+        self._listeners: list[Callable[[], None]] = []
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name: str, value: float) -> None:
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = RollingStats()
+        stats.add(value)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Час блоку в мс -> гістограма name."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (perf_counter() - start) * 1000)
+
+    def get(self, name: str) -> Optional[RollingStats]:
+        return self.stats.get(name)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "counters": dict(sorted(self.counters.items())),
+            "histograms": {name: s.as_dict() for name, s in sorted(self.stats.items())},
+        }
+
+    # ---------------------------------------------------------------------
+    # Слухачі (діагностичні сенсори оновлюються раз на цикл опитування)
+    # ---------------------------------------------------------------------
+
+    @callback
+    def async_add_listener(self, update_callback: Callable[[], None]) -> Callable[[], None]:
+        self._listeners.append(update_callback)
+
+        @callback
+        def _remove() -> None:
+            if update_callback in self._listeners:
+                self._listeners.remove(update_callback)
+
+        return _remove
+
+    @callback
+    def async_notify(self) -> None:
+        for update_callback in list(self._listeners):
+            update_callback()
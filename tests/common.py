@@ -0,0 +1,217 @@
+"""Спільне для тестів: справжній HomeAssistant у тимчасовій теці, підмінена HTTP-сесія хаба, JSON проксі."""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterable, Optional
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant import bootstrap, loader
+from homeassistant.auth import auth_manager_from_config
+from homeassistant.config_entries import ConfigEntries, ConfigEntry
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers import event as ha_event
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+
+from custom_components.svitlo_live import api_hub
+from custom_components.svitlo_live.const import DOMAIN
+
+TZ_KYIV = dt_util.get_time_zone("Europe/Kyiv")
+
+# Мітки півгодинних слотів, як їх віддає проксі
+LABELS = [f"{hour:02d}:{minute:02d}" for hour in range(24) for minute in (0, 30)]
+
+# Тестова доба — у майбутньому: таймери HA рахуються від реального годинника,
+# тож заплановане на "заморожений" час посеред тесту не спрацює
+TODAY = date(2030, 1, 15)
+
+
+@asynccontextmanager
+async def async_test_home_assistant(config_dir: Path) -> AsyncIterator[HomeAssistant]:
+    """Запущений HomeAssistant (Europe/Kyiv) з конфігом і .storage у config_dir.
+
+    Реєстри, auth і config entries — як у bootstrap, щоб entry можна було підняти повністю.
+    """
+    hass = HomeAssistant(str(config_dir))
+    hass.config.set_time_zone("Europe/Kyiv")
+    hass.config.skip_pip = True
+    loader.async_setup(hass)
+    await bootstrap.load_registries(hass)
+    hass.auth = await auth_manager_from_config(hass, [], [])
+    hass.config_entries = ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    await hass.async_start()
+    try:
+        yield hass
+    finally:
+        await hass.async_stop(force=True)
+
+
+async def async_add_entry(hass: HomeAssistant, data: dict[str, Any]) -> ConfigEntry:
+    """Додає і налаштовує entry svitlo_live разом з усіма платформами."""
+    # календарю потрібен http; сервер не слухає порт — подію старту HA вже пропущено
+    assert await async_setup_component(hass, "http", {})
+    entry = ConfigEntry(1, DOMAIN, "Svitlo", data, "user")
+    await hass.config_entries.async_add(entry)
+    await hass.async_block_till_done()
+    return entry
+
+
+def write_store(config_dir: Path, key: str, data: dict[str, Any]) -> None:
+    """Файл .storage/<key> у форматі helpers.storage.Store (версія 1) — до старту HA."""
+    storage = config_dir / ".storage"
+    storage.mkdir(exist_ok=True)
+    (storage / key).write_text(json.dumps({"version": 1, "minor_version": 1, "key": key, "data": data}))
+
+
+def entity_id(hass: HomeAssistant, platform: str, unique_id: str) -> Optional[str]:
+    return er.async_get(hass).async_get_entity_id(platform, DOMAIN, unique_id)
+
+
+def entity_state(hass: HomeAssistant, platform: str, unique_id: str) -> Optional[str]:
+    """Стан ентіті svitlo_live за unique_id (None — ентіті немає)."""
+    eid = entity_id(hass, platform, unique_id)
+    state = hass.states.get(eid) if eid else None
+    return state.state if state else None
+
+
+def freeze_time(monkeypatch: pytest.MonkeyPatch, when: datetime) -> None:
+    """dt_util.now()/utcnow() повертають when (aware, будь-яка таймзона)."""
+    utc = dt_util.as_utc(when)
+    monkeypatch.setattr(dt_util, "utcnow", lambda: utc)
+    monkeypatch.setattr(
+        dt_util, "now", lambda time_zone=None: utc.astimezone(time_zone or dt_util.DEFAULT_TIME_ZONE)
+    )
+
+
+async def async_fire_time_changed(hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch, when: datetime) -> None:
+    """Переводить годинник на when і запускає таймери HA, що мали спрацювати до цього часу."""
+    freeze_time(monkeypatch, when)
+    timestamp = dt_util.utc_to_timestamp(dt_util.as_utc(when))
+    monkeypatch.setattr(ha_event, "time_tracker_timestamp", lambda: timestamp)
+    # таймери стоять у loop відносно реального часу — так само рахуємо і when (з запасом на похибку float)
+    deadline = hass.loop.time() + (timestamp - time.time()) + 0.01
+    for handle in list(hass.loop._scheduled):
+        if isinstance(handle, asyncio.TimerHandle) and not handle.cancelled() and handle.when() <= deadline:
+            handle._run()
+            handle.cancel()
+    await hass.async_block_till_done()
+
+
+def kyiv(day: date, hour: int, minute: int = 0) -> datetime:
+    return datetime.combine(day, datetime.min.time(), TZ_KYIV).replace(hour=hour, minute=minute)
+
+
+# ---------------------------------------------------------------------
+# JSON проксі
+# ---------------------------------------------------------------------
+
+def day_slots(off: Iterable[tuple[int, int]] = (), unknown: Iterable[tuple[int, int]] = ()) -> dict[str, int]:
+    """Слоти доби: 1 (є світло), 2 — у серіях off [start; end), 0 — у серіях unknown."""
+    codes = [1] * len(LABELS)
+    for code, runs in ((2, off), (0, unknown)):
+        for start, end in runs:
+            codes[start:end] = [code] * (end - start)
+    return dict(zip(LABELS, codes))
+
+
+def proxy_json(
+    today: date, regions: dict[str, dict[str, tuple[Optional[dict[str, int]], Optional[dict[str, int]]]]]
+) -> dict[str, Any]:
+    """regions: cpu -> queue -> (слоти сьогодні, слоти завтра); None — дня немає в JSON."""
+    days = (today.isoformat(), (today + timedelta(days=1)).isoformat())
+    return {
+        "date_today": days[0],
+        "date_tomorrow": days[1],
+        "regions": [
+            {
+                "cpu": cpu,
+                "schedule": {
+                    queue: {day: slots for day, slots in zip(days, pair) if slots is not None}
+                    for queue, pair in queues.items()
+                },
+            }
+            for cpu, queues in regions.items()
+        ],
+    }
+
+
+# ---------------------------------------------------------------------
+# HTTP
+# ---------------------------------------------------------------------
+
+class MockResponse:
+    """Те, що хаб читає з відповіді aiohttp."""
+
+    def __init__(
+        self, status: int = 200, body: bytes = b"", headers: Optional[dict[str, str]] = None, chunked: bool = False
+    ) -> None:
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+        self.chunked = chunked
+
+    @property
+    def content_length(self) -> Optional[int]:
+        # chunked-відповідь приходить без Content-Length
+        return None if self.chunked else len(self.body)
+
+    @property
+    def content(self) -> MockResponse:
+        return self
+
+    async def iter_chunked(self, size: int) -> AsyncIterator[bytes]:
+        for start in range(0, len(self.body), size):
+            yield self.body[start:start + size]
+
+    async def read(self) -> bytes:
+        return self.body
+
+    async def json(self, content_type: Optional[str] = None) -> Any:
+        return json.loads(self.body)
+
+    async def __aenter__(self) -> MockResponse:
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        return None
+
+
+class MockSession:
+    """Черга відповідей (остання повторюється) і журнал запитів хаба."""
+
+    def __init__(self) -> None:
+        self.responses: list[MockResponse] = []
+        self.requests: list[dict[str, Any]] = []
+
+    def add(
+        self,
+        payload: Any = None,
+        *,
+        status: int = 200,
+        body: Optional[bytes] = None,
+        headers: Optional[dict[str, str]] = None,
+        chunked: bool = False,
+    ) -> None:
+        if body is None:
+            body = json.dumps(payload).encode() if payload is not None else b""
+        self.responses.append(MockResponse(status, body, headers, chunked))
+
+    def get(self, url: str, **kwargs: Any) -> MockResponse:
+        self.requests.append({"url": url, **kwargs})
+        if len(self.responses) > 1:
+            return self.responses.pop(0)
+        return self.responses[0]
+
+
+def mock_session(monkeypatch: pytest.MonkeyPatch) -> MockSession:
+    """Хаби, створені після виклику, ходять у MockSession замість aiohttp-сесії HA."""
+    session = MockSession()
+    monkeypatch.setattr(api_hub, "async_get_clientsession", lambda hass: session)
+    return session
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.svitlo_live.aggregate import EMPTY_REGION_DAY, RegionDay
+from custom_components.svitlo_live.const import CONF_QUEUES, CONF_REGION, CONF_REGION_STATS
+from custom_components.svitlo_live.schedule import SLOTS_PER_DAY, DaySchedule
+
+from .common import (
+    TODAY,
+    async_add_entry,
+    async_test_home_assistant,
+    day_slots,
+    entity_state,
+    freeze_time,
+    kyiv,
+    mock_session,
+    proxy_json,
+)
+
+FULL = (1 << SLOTS_PER_DAY) - 1
+
+
+def test_column_counts_match_per_slot_sums() -> None:
+    rng = random.Random(7)
+    days = {}
+    for n in range(37):
+        off = rng.getrandbits(SLOTS_PER_DAY)
+        known = rng.getrandbits(SLOTS_PER_DAY) | off
+        days[f"q{n}"] = DaySchedule(known & ~off, off)
+    region = RegionDay(days)
+
+    for idx in range(SLOTS_PER_DAY):
+        bit = 1 << idx
+        assert region.off_counts[idx] == sum(1 for day in days.values() if day.off_mask & bit)
+        assert region.known_counts[idx] == sum(1 for day in days.values() if (day.on_mask | day.off_mask) & bit)
+
+
+def test_region_day_queries() -> None:
+    region = RegionDay({
+        "1.1": DaySchedule(FULL & ~0b1100, 0b1100),
+        "1.2": DaySchedule(FULL & ~0b0110, 0b0110),
+        "2.1": DaySchedule(0, 0),  # без розкладу — не рахується
+    })
+    assert region.queues == ("1.1", "1.2")
+    assert region.queues_off(2) == ["1.1", "1.2"]
+    assert region.share(2) == 100.0 and region.share(0) == 0.0
+    assert region.peak() == 2
+    assert [region.next_change(idx) for idx in (0, 1, 2, 3)] == [1, 2, 3, 4]
+    assert not EMPTY_REGION_DAY and EMPTY_REGION_DAY.peak() is None and EMPTY_REGION_DAY.share(0) is None
+
+
+async def test_region_sensors(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    session = mock_session(monkeypatch)
+    session.add(proxy_json(TODAY, {"kyiv": {
+        "1.1": (day_slots(off=[(24, 28)]), None),
+        "1.2": (day_slots(off=[(20, 26)]), None),
+        "2.1": (day_slots(), None),
+        "2.2": (day_slots(unknown=[(0, 48)]), None),
+    }}))
+    async with async_test_home_assistant(tmp_path) as hass:
+        await async_add_entry(hass, {CONF_REGION: "kyiv", CONF_QUEUES: ["2.1"], CONF_REGION_STATS: True})
+
+        # entry стежить лише за 2.1, але зведення рахується з усіх черг області
+        assert entity_state(hass, "sensor", "svitlo_region_off_kyiv") == "2"
+        # 2 з 3 черг з відомим станом
+        assert entity_state(hass, "sensor", "svitlo_region_share_kyiv") == "66.7"
+        assert entity_state(hass, "sensor", "svitlo_region_peak_kyiv") == dt_util.as_utc(kyiv(TODAY, 12)).isoformat()
@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+import pytest
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+
+from custom_components.svitlo_live.api_hub import SvitloApiHub
+from custom_components.svitlo_live.const import (
+    CONF_API_URL,
+    CONF_QUEUES,
+    CONF_QUEUE,
+    CONF_REGION,
+    CONF_STALE_AFTER,
+    DATA_HUB,
+    DOMAIN,
+)
+from custom_components.svitlo_live.coordinator import SvitloCoordinator
+
+from .common import (
+    TODAY,
+    async_add_entry,
+    async_fire_time_changed,
+    async_test_home_assistant,
+    day_slots,
+    entity_id,
+    freeze_time,
+    kyiv,
+    mock_session,
+    proxy_json,
+)
+
+# 12:00–14:00 без світла у 1.1, 18:00–20:00 — у 2.1
+SCHEDULE = {"kyiv": {"1.1": (day_slots(off=[(24, 28)]), None), "2.1": (day_slots(off=[(36, 40)]), None)}}
+
+
+async def test_entries_share_one_fetch(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    session = mock_session(monkeypatch)
+    session.add(proxy_json(TODAY, SCHEDULE))
+    async with async_test_home_assistant(tmp_path) as hass:
+        hub = SvitloApiHub(hass)
+        first = SvitloCoordinator(hass, {CONF_REGION: "kyiv", CONF_QUEUES: ["1.1"]}, hub)
+        second = SvitloCoordinator(hass, {CONF_REGION: "kyiv", CONF_QUEUES: ["2.1"]}, hub)
+        await first.async_refresh()
+        await second.async_refresh()
+
+        assert len(session.requests) == 1
+        assert first.data["1.1"]["now_status"] == "off"
+        assert second.data["2.1"]["now_status"] == "on"
+
+
+async def test_poll_pushes_one_fetch_to_every_subscriber(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    session = mock_session(monkeypatch)
+    session.add(proxy_json(TODAY, SCHEDULE))
+    # у наступному циклі 2.1 теж без світла з 12:00
+    session.add(proxy_json(TODAY, {"kyiv": {**SCHEDULE["kyiv"], "2.1": (day_slots(off=[(24, 40)]), None)}}))
+    async with async_test_home_assistant(tmp_path) as hass:
+        hub = SvitloApiHub(hass)
+        coordinators = [
+            SvitloCoordinator(hass, {CONF_REGION: "kyiv", CONF_QUEUES: [queue]}, hub) for queue in ("1.1", "2.1")
+        ]
+        for coordinator in coordinators:
+            await coordinator.async_refresh()
+            hub.async_subscribe(coordinator)
+
+        freeze_time(monkeypatch, kyiv(TODAY, 12, 10) + timedelta(minutes=15))
+        await hub.async_poll()
+
+        assert len(session.requests) == 2
+        assert [c.data[c.queues[0]]["now_status"] for c in coordinators] == ["off", "off"]
+
+
+async def test_midnight_guard_without_cache_skips_network(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 0, 2))
+    session = mock_session(monkeypatch)
+    session.add(proxy_json(TODAY, SCHEDULE))
+    async with async_test_home_assistant(tmp_path) as hass:
+        hub = SvitloApiHub(hass)
+        with pytest.raises(RuntimeError):
+            await hub.ensure_data()
+        assert session.requests == []
+
+
+async def test_not_modified_keeps_snapshot(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    session = mock_session(monkeypatch)
+    validators = {"ETag": '"v1"', "Last-Modified": "Tue, 15 Jan 2030 10:00:00 GMT"}
+    session.add(proxy_json(TODAY, SCHEDULE), headers=validators)
+    session.add(status=304)
+    async with async_test_home_assistant(tmp_path) as hass:
+        hub = SvitloApiHub(hass)
+        snapshot = await hub.ensure_data()
+        freeze_time(monkeypatch, kyiv(TODAY, 12, 25))
+
+        assert await hub.ensure_data(force=True) is snapshot
+        assert session.requests[0]["headers"] == {}
+        assert session.requests[1]["headers"] == {
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Tue, 15 Jan 2030 10:00:00 GMT",
+        }
+
+
+async def test_unchanged_body_skips_rebuild_and_entity_updates(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    session = mock_session(monkeypatch)
+    # без валідаторів — хаб порівнює хеш тіла
+    session.add(proxy_json(TODAY, SCHEDULE))
+    async with async_test_home_assistant(tmp_path) as hass:
+        hub = SvitloApiHub(hass)
+        coordinator = SvitloCoordinator(hass, {CONF_REGION: "kyiv", CONF_QUEUES: ["1.1"]}, hub)
+        await coordinator.async_refresh()
+        hub.async_subscribe(coordinator)
+        snapshot, data = hub.snapshot, coordinator.data
+        updates: list[None] = []
+        coordinator.async_add_listener(lambda: updates.append(None))
+
+        freeze_time(monkeypatch, kyiv(TODAY, 12, 25))
+        await hub.async_poll()
+
+        assert len(session.requests) == 2
+        assert hub.snapshot is snapshot
+        assert coordinator.data is data
+        assert updates == []
+
+
+async def test_warm_start_from_store(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    mock_session(monkeypatch).add(proxy_json(TODAY, SCHEDULE))
+    async with async_test_home_assistant(tmp_path) as hass:
+        await SvitloApiHub(hass).ensure_data()
+
+    # перезапуск HA у тій самій теці; проксі лежить
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 20))
+    session = mock_session(monkeypatch)
+    session.add(status=502)
+    async with async_test_home_assistant(tmp_path) as hass:
+        hub = SvitloApiHub(hass)
+        await hub.async_load()
+        coordinator = SvitloCoordinator(hass, {CONF_REGION: "kyiv", CONF_QUEUES: ["1.1"]}, hub)
+        await coordinator.async_refresh()
+
+        assert coordinator.last_update_success
+        assert coordinator.data["1.1"]["now_status"] == "off"
+        assert hub.last_fetch_utc == dt_util.as_utc(kyiv(TODAY, 12, 10))
+        # знімок ще в межах циклу опитування — мережа не потрібна
+        assert session.requests == []
+
+
+async def test_stale_store_snapshot_is_not_shown(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    mock_session(monkeypatch).add(proxy_json(TODAY, SCHEDULE))
+    async with async_test_home_assistant(tmp_path) as hass:
+        await SvitloApiHub(hass).ensure_data()
+
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10) + timedelta(hours=13))
+    session = mock_session(monkeypatch)
+    session.add(status=502)
+    async with async_test_home_assistant(tmp_path) as hass:
+        hub = SvitloApiHub(hass)
+        await hub.async_load()
+        coordinator = SvitloCoordinator(
+            hass, {CONF_REGION: "kyiv", CONF_QUEUES: ["1.1"], CONF_STALE_AFTER: 12}, hub
+        )
+        await coordinator.async_refresh()
+
+        assert not coordinator.last_update_success
+        assert len(session.requests) == 1
+
+
+async def test_custom_endpoint_from_yaml(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    mock_session(monkeypatch).add(proxy_json(TODAY, SCHEDULE))
+    # знімок з публічного проксі вже лежить на диску
+    async with async_test_home_assistant(tmp_path) as hass:
+        await SvitloApiHub(hass).ensure_data()
+
+    session = mock_session(monkeypatch)
+    session.add(proxy_json(TODAY, SCHEDULE))
+    async with async_test_home_assistant(tmp_path) as hass:
+        assert await async_setup_component(hass, DOMAIN, {DOMAIN: {CONF_API_URL: "http://127.0.0.1:8080/"}})
+        entry = await async_add_entry(hass, {CONF_REGION: "kyiv", CONF_QUEUE: "1.1"})
+
+        # знімок іншого ендпоінта не підхоплюється — перший refresh іде в мережу
+        assert [request["url"] for request in session.requests] == ["http://127.0.0.1:8080/"]
+        assert hass.data[DOMAIN][entry.entry_id].data["1.1"]["source"] == "http://127.0.0.1:8080/"
+
+
+async def test_retry_after_and_backoff(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    session = mock_session(monkeypatch)
+    session.add(proxy_json(TODAY, SCHEDULE))
+    session.add(status=503, headers={"Retry-After": "120"})
+    session.add(status=502)
+    session.add(proxy_json(TODAY, SCHEDULE))
+    async with async_test_home_assistant(tmp_path) as hass:
+        hub = SvitloApiHub(hass)
+        coordinator = SvitloCoordinator(hass, {CONF_REGION: "kyiv", CONF_QUEUES: ["1.1"]}, hub)
+        await coordinator.async_refresh()
+        hub.async_subscribe(coordinator)
+
+        freeze_time(monkeypatch, kyiv(TODAY, 12, 25))
+        await hub.async_poll()
+        assert hub.failures == 1
+        assert hub.retry_at == dt_util.as_utc(kyiv(TODAY, 12, 27))
+        # до retry_at ні опитування, ні повтори entry в мережу не йдуть
+        with pytest.raises(RuntimeError):
+            await hub.ensure_data(force=True)
+        assert len(session.requests) == 2
+
+        # повтор за таймером хаба; друга пауза — 30..60 с
+        retry_at = hub.retry_at
+        await async_fire_time_changed(hass, monkeypatch, retry_at)
+        assert hub.failures == 2 and len(session.requests) == 3
+        assert timedelta(seconds=30) <= hub.retry_at - retry_at <= timedelta(seconds=60)
+
+        await async_fire_time_changed(hass, monkeypatch, hub.retry_at)
+        assert len(session.requests) == 4
+        assert hub.failures == 0 and hub.retry_at is None
+
+
+async def test_circuit_opens_after_repeated_failures(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    session = mock_session(monkeypatch)
+    session.add(status=500)
+    async with async_test_home_assistant(tmp_path) as hass:
+        hub = SvitloApiHub(hass)
+        for _ in range(5):
+            with pytest.raises(RuntimeError):
+                await hub.ensure_data(force=True)
+            if hub.retry_at is not None and not hub.circuit_open:
+                freeze_time(monkeypatch, hub.retry_at)
+
+        assert hub.circuit_open and len(session.requests) == 5
+        pause = hub.retry_at - dt_util.utcnow()
+        assert timedelta(minutes=24) <= pause <= timedelta(minutes=36)
+
+
+async def test_stale_schedule_is_served_during_outage(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    session = mock_session(monkeypatch)
+    session.add(proxy_json(TODAY, SCHEDULE))
+    session.add(status=502)
+    async with async_test_home_assistant(tmp_path) as hass:
+        await async_add_entry(hass, {CONF_REGION: "kyiv", CONF_QUEUE: "1.1", CONF_STALE_AFTER: 1})
+        status = entity_id(hass, "sensor", "svitlo_status_kyiv_1.1")
+
+        freeze_time(monkeypatch, kyiv(TODAY, 12, 25))
+        await hass.data[DOMAIN][DATA_HUB].async_poll()
+        await hass.async_block_till_done()
+        state = hass.states.get(status)
+        assert state.state == "Grid OFF"
+        assert state.attributes["stale"] is True
+        assert state.attributes["stale_since"] == dt_util.as_utc(kyiv(TODAY, 12, 25)).isoformat()
+
+        # старший за stale_after розклад уже не показуємо
+        freeze_time(monkeypatch, kyiv(TODAY, 13, 20))
+        await hass.data[DOMAIN][DATA_HUB].async_poll()
+        await hass.async_block_till_done()
+        assert hass.states.get(status).state == "No data"
+
+
+async def test_large_body_is_processed_in_executor(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    session = mock_session(monkeypatch)
+    # ~300 КБ, як повний JSON усіх областей
+    regions = {
+        f"region-{r}": {
+            f"{q // 2 + 1}.{q % 2 + 1}": (day_slots(off=[(r, r + q + 1)]), day_slots()) for q in range(12)
+        }
+        for r in range(30)
+    }
+    session.add(proxy_json(TODAY, regions))
+    session.add(proxy_json(TODAY, SCHEDULE))
+    async with async_test_home_assistant(tmp_path) as hass:
+        hub = SvitloApiHub(hass)
+        snapshot = await hub.ensure_data()
+        assert hub.telemetry.get("payload_bytes").last >= 64 * 1024
+        assert hub.telemetry.counters["executor_jobs"] == 1
+        assert snapshot.queue_days("region-7", "2.1")[TODAY.isoformat()].off_intervals() == [(7, 10)]
+
+        # невеликий JSON (одна область) розбирається прямо в event loop
+        freeze_time(monkeypatch, kyiv(TODAY, 12, 25))
+        snapshot = await hub.ensure_data(force=True)
+        assert hub.telemetry.counters["executor_jobs"] == 1
+        assert snapshot.has_region("kyiv")
+
+
+async def test_region_filter_follows_entries(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    session = mock_session(monkeypatch)
+    odesa = {"odeska-oblast": {"1.1": (day_slots(), None)}}
+    session.add(proxy_json(TODAY, SCHEDULE))
+    session.add(proxy_json(TODAY, {**SCHEDULE, **odesa}))
+    async with async_test_home_assistant(tmp_path) as hass:
+        hub = SvitloApiHub(hass)
+        first = SvitloCoordinator(hass, {CONF_REGION: "kyiv", CONF_QUEUES: ["1.1"]}, hub)
+        await first.async_refresh()
+        hub.async_subscribe(first)
+        # області нового entry немає у відфільтрованому знімку — перепитуємо вже з нею
+        second = SvitloCoordinator(hass, {CONF_REGION: "odeska-oblast", CONF_QUEUES: ["1.1"]}, hub)
+        await second.async_refresh()
+
+        assert [request["params"] for request in session.requests] == [
+            {"regions": "kyiv"},
+            {"regions": "kyiv,odeska-oblast"},
+        ]
+        assert second.last_update_success and hub.region_filter
+
+
+@pytest.mark.parametrize(
+    ("rejection", "expected"),
+    [
+        # старий проксі відхиляє ?regions= — одразу перепитуємо повний JSON
+        ({"status": 400}, [{"regions": "kyiv"}, None, None]),
+        # або ігнорує параметр і віддає всі області
+        ({"payload": proxy_json(TODAY, {**SCHEDULE, "lviv": {}})}, [{"regions": "kyiv"}, None]),
+    ],
+)
+async def test_region_filter_falls_back_to_full_payload(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, rejection: dict[str, Any], expected: list[Any]
+) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    session = mock_session(monkeypatch)
+    session.add(**rejection)
+    session.add(proxy_json(TODAY, SCHEDULE))
+    async with async_test_home_assistant(tmp_path) as hass:
+        hub = SvitloApiHub(hass)
+        coordinator = SvitloCoordinator(hass, {CONF_REGION: "kyiv", CONF_QUEUES: ["1.1"]}, hub)
+        await coordinator.async_refresh()
+        hub.async_subscribe(coordinator)
+        freeze_time(monkeypatch, kyiv(TODAY, 12, 25))
+        await hub.async_poll()
+
+        assert coordinator.last_update_success and not hub.region_filter
+        assert [request["params"] for request in session.requests] == expected
+
+
+async def test_failed_startup_does_not_stay_in_region_filter(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    session = mock_session(monkeypatch)
+    session.add(status=503)
+    session.add(proxy_json(TODAY, SCHEDULE))
+    async with async_test_home_assistant(tmp_path) as hass:
+        hub = SvitloApiHub(hass)
+        failed = SvitloCoordinator(hass, {CONF_REGION: "lviv", CONF_QUEUES: ["1.1"]}, hub)
+        await failed.async_refresh()
+        assert not failed.last_update_success
+        assert hub.wanted_regions() == []
+
+        coordinator = SvitloCoordinator(hass, {CONF_REGION: "kyiv", CONF_QUEUES: ["1.1"]}, hub)
+        freeze_time(monkeypatch, kyiv(TODAY, 12, 25))
+        await coordinator.async_refresh()
+        hub.async_subscribe(coordinator)
+
+        assert session.requests[-1]["params"] == {"regions": "kyiv"}
+        assert hub.wanted_regions() == ["kyiv"]
+
+
+async def test_last_unsubscribe_clears_region_from_filter(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    mock_session(monkeypatch).add(proxy_json(TODAY, SCHEDULE))
+    async with async_test_home_assistant(tmp_path) as hass:
+        hub = SvitloApiHub(hass)
+        first = SvitloCoordinator(hass, {CONF_REGION: "kyiv", CONF_QUEUES: ["1.1"]}, hub)
+        second = SvitloCoordinator(hass, {CONF_REGION: "kyiv", CONF_QUEUES: ["2.1"]}, hub)
+        unsubscribe = []
+        for coordinator in (first, second):
+            await coordinator.async_refresh()
+            unsubscribe.append(hub.async_subscribe(coordinator))
+        # повторний refresh уже підписаного entry знову стартує його черги
+        await first.async_refresh()
+
+        unsubscribe[0]()
+        assert hub.wanted_regions() == ["kyiv"]
+        unsubscribe[1]()
+        assert hub.wanted_regions() == []
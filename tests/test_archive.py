@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+import pytest
+from homeassistant.components.recorder import statistics as recorder_statistics
+from homeassistant.util import dt as dt_util
+
+from custom_components.svitlo_live.const import CONF_QUEUE, CONF_REGION, DATA_HUB, DOMAIN
+
+from .common import (
+    TODAY,
+    async_add_entry,
+    async_fire_time_changed,
+    async_test_home_assistant,
+    day_slots,
+    freeze_time,
+    kyiv,
+    mock_session,
+    proxy_json,
+)
+
+TOMORROW = TODAY + timedelta(days=1)
+STATISTIC_ID = "svitlo_live:outage_minutes_kyiv_1_1"
+
+
+def _row(day, minutes: int, total: int) -> dict[str, Any]:
+    return {"start": dt_util.as_utc(kyiv(day, 0)), "state": minutes, "sum": total}
+
+
+async def test_completed_days_go_to_statistics(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12))
+    session = mock_session(monkeypatch)
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (day_slots(off=[(24, 28)]), day_slots(off=[(0, 6)]))}}))
+    imported: list[tuple[str, list[dict[str, Any]]]] = []
+    monkeypatch.setattr(
+        recorder_statistics,
+        "async_add_external_statistics",
+        lambda hass, metadata, rows: imported.append((metadata["statistic_id"], rows)),
+    )
+    async with async_test_home_assistant(tmp_path) as hass:
+        hass.config.components.add("recorder")
+        await async_add_entry(hass, {CONF_REGION: "kyiv", CONF_QUEUE: "1.1"})
+        archive = hass.data[DOMAIN][DATA_HUB].archive
+        assert archive.as_dict()["queues"]["kyiv/1.1"] == {
+            "days": 2,
+            "first": TODAY.isoformat(),
+            "last": TOMORROW.isoformat(),
+            "imported_through": None,
+        }
+        assert imported == []
+
+        # після півночі за Києвом завершена доба йде в статистику
+        await async_fire_time_changed(hass, monkeypatch, kyiv(TOMORROW, 0, 5))
+        assert imported == [(STATISTIC_ID, [_row(TODAY, 120, 120)])]
+
+    # після перезапуску — лише нова доба, з наростаючим підсумком з диска
+    imported.clear()
+    freeze_time(monkeypatch, kyiv(TOMORROW + timedelta(days=1), 0, 10))
+    async with async_test_home_assistant(tmp_path) as hass:
+        hass.config.components.add("recorder")
+        await async_add_entry(hass, {CONF_REGION: "kyiv", CONF_QUEUE: "1.1"})
+        assert imported == [(STATISTIC_ID, [_row(TOMORROW, 180, 300)])]
+        assert hass.data[DOMAIN][DATA_HUB].archive.as_dict()["queues"]["kyiv/1.1"]["imported_through"] == (
+            TOMORROW.isoformat()
+        )
+
+
+async def test_past_days_are_not_rewritten(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12))
+    session = mock_session(monkeypatch)
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (day_slots(off=[(24, 28)]), None)}}))
+    # наступного дня проксі із запізненням віддає вчорашню добу — вже змінену
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (day_slots(off=[(24, 30)]), None)}}))
+    imported: list[list[dict[str, Any]]] = []
+    monkeypatch.setattr(
+        recorder_statistics, "async_add_external_statistics", lambda hass, metadata, rows: imported.append(rows)
+    )
+    async with async_test_home_assistant(tmp_path) as hass:
+        hass.config.components.add("recorder")
+        await async_add_entry(hass, {CONF_REGION: "kyiv", CONF_QUEUE: "1.1"})
+        hub = hass.data[DOMAIN][DATA_HUB]
+
+        freeze_time(monkeypatch, kyiv(TOMORROW, 9))
+        await hub.async_poll()
+        assert hub.snapshot.queue_days("kyiv", "1.1")[TODAY.isoformat()].off_intervals() == [(24, 30)]
+
+        await async_fire_time_changed(hass, monkeypatch, kyiv(TOMORROW + timedelta(days=1), 0, 5))
+        assert imported == [[_row(TODAY, 120, 120)]]
+
+
+async def test_no_nightly_import_without_entries(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12))
+    mock_session(monkeypatch).add(proxy_json(TODAY, {"kyiv": {"1.1": (day_slots(off=[(24, 28)]), None)}}))
+    imported: list[list[dict[str, Any]]] = []
+    monkeypatch.setattr(
+        recorder_statistics, "async_add_external_statistics", lambda hass, metadata, rows: imported.append(rows)
+    )
+    async with async_test_home_assistant(tmp_path) as hass:
+        hass.config.components.add("recorder")
+        entry = await async_add_entry(hass, {CONF_REGION: "kyiv", CONF_QUEUE: "1.1"})
+        assert await hass.config_entries.async_unload(entry.entry_id)
+
+        # таймер імпорту живе лише поки є entry
+        await async_fire_time_changed(hass, monkeypatch, kyiv(TOMORROW, 0, 5))
+        assert imported == []
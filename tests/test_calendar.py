@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.svitlo_live.const import CONF_QUEUE, CONF_REGION, DATA_HUB, DOMAIN
+
+from .common import (
+    TODAY,
+    async_add_entry,
+    async_test_home_assistant,
+    day_slots,
+    entity_id,
+    freeze_time,
+    kyiv,
+    mock_session,
+    proxy_json,
+    write_store,
+)
+
+TOMORROW = TODAY + timedelta(days=1)
+
+
+async def _events(hass: HomeAssistant, start: datetime, end: datetime) -> list[tuple[str, str]]:
+    calendar = entity_id(hass, "calendar", "svitlo_calendar_kyiv_1.1")
+    response = await hass.services.async_call(
+        "calendar",
+        "get_events",
+        {"entity_id": calendar, "start_date_time": start, "end_date_time": end},
+        blocking=True,
+        return_response=True,
+    )
+    return [(event["start"], event["end"]) for event in response[calendar]["events"]]
+
+
+def _iso(day: date, hour: int, minute: int = 0) -> str:
+    return dt_util.as_utc(kyiv(day, hour, minute)).isoformat()
+
+
+async def test_range_queries(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    session = mock_session(monkeypatch)
+    today = day_slots(off=[(4, 6), (24, 28), (44, 48)])
+    tomorrow = day_slots(off=[(0, 2), (10, 12)])
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (today, tomorrow)}}))
+    async with async_test_home_assistant(tmp_path) as hass:
+        await async_add_entry(hass, {CONF_REGION: "kyiv", CONF_QUEUE: "1.1"})
+
+        assert await _events(hass, kyiv(TODAY, 12, 30), kyiv(TODAY, 12, 40)) == [
+            (_iso(TODAY, 12), _iso(TODAY, 14)),
+        ]
+        # межі не перетинаються: подія, що закінчилась о 14:00, чи почнеться о 22:00, — поза [14:00; 22:00)
+        assert await _events(hass, kyiv(TODAY, 14), kyiv(TODAY, 22)) == []
+        assert await _events(hass, kyiv(TODAY, 13), kyiv(TOMORROW, 0, 30)) == [
+            (_iso(TODAY, 12), _iso(TODAY, 14)),
+            (_iso(TODAY, 22), _iso(TOMORROW, 0)),
+            (_iso(TOMORROW, 0), _iso(TOMORROW, 1)),
+        ]
+        assert len(await _events(hass, kyiv(TODAY, 0), kyiv(TOMORROW + timedelta(days=1), 0))) == 5
+
+
+async def test_index_follows_schedule_changes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    session = mock_session(monkeypatch)
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (day_slots(off=[(24, 28)]), None)}}))
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (day_slots(off=[(24, 28)]), day_slots(off=[(10, 12)]))}}))
+    async with async_test_home_assistant(tmp_path) as hass:
+        await async_add_entry(hass, {CONF_REGION: "kyiv", CONF_QUEUE: "1.1"})
+        day_after = TOMORROW + timedelta(days=1)
+        assert await _events(hass, kyiv(TODAY, 15), kyiv(day_after, 0)) == []
+
+        freeze_time(monkeypatch, kyiv(TODAY, 12, 25))
+        await hass.data[DOMAIN][DATA_HUB].async_poll()
+        await hass.async_block_till_done()
+        assert await _events(hass, kyiv(TODAY, 15), kyiv(day_after, 0)) == [
+            (_iso(TOMORROW, 5), _iso(TOMORROW, 6)),
+        ]
+
+
+async def test_forecast_events_after_published_days(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # три минулі четверги без світла 18:00–20:00; TODAY — вівторок
+    full, evening = (1 << 48) - 1, ((1 << 4) - 1) << 36
+    thursday = TODAY + timedelta(days=2)
+    write_store(tmp_path, "svitlo_live.archive", {"queues": {"kyiv/1.1": {
+        "days": {(thursday - timedelta(weeks=weeks)).isoformat(): [full & ~evening, evening] for weeks in (3, 2, 1)},
+        "imported": None,
+    }}})
+    freeze_time(monkeypatch, kyiv(TODAY, 12))
+    session = mock_session(monkeypatch)
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (day_slots(), None)}}))
+    async with async_test_home_assistant(tmp_path) as hass:
+        await async_add_entry(hass, {CONF_REGION: "kyiv", CONF_QUEUE: "1.1"})
+
+        assert await _events(hass, kyiv(TODAY, 0), kyiv(TODAY + timedelta(days=8), 0)) == [
+            (_iso(thursday, 18), _iso(thursday, 20)),
+        ]
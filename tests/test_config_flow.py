@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from homeassistant.data_entry_flow import FlowResultType
+
+from custom_components.svitlo_live.const import (
+    CONF_ALL_QUEUES,
+    CONF_QUEUE,
+    CONF_QUEUES,
+    CONF_REGION,
+    CONF_REGION_STATS,
+    DOMAIN,
+)
+
+from .common import TODAY, async_add_entry, async_test_home_assistant, day_slots, mock_session, proxy_json
+
+
+async def _details(hass, queues: list[str], all_queues: bool = False, region_stats: bool = False):
+    flow = await hass.config_entries.flow.async_init(DOMAIN, context={"source": "user"})
+    flow = await hass.config_entries.flow.async_configure(flow["flow_id"], {CONF_REGION: "Київ"})
+    assert flow["step_id"] == "details"
+    return await hass.config_entries.flow.async_configure(
+        flow["flow_id"], {CONF_QUEUES: queues, CONF_ALL_QUEUES: all_queues, CONF_REGION_STATS: region_stats}
+    )
+
+
+async def test_queue_of_another_entry_is_rejected(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    mock_session(monkeypatch).add(proxy_json(TODAY, {"kyiv": {"1.1": (day_slots(), None)}}))
+    async with async_test_home_assistant(tmp_path) as hass:
+        await async_add_entry(hass, {CONF_REGION: "kyiv", CONF_QUEUE: "1.1", CONF_REGION_STATS: True})
+
+        result = await _details(hass, ["1.2", "1.1"])
+        assert result["type"] == FlowResultType.FORM and result["errors"] == {"base": "queue_configured"}
+        result = await _details(hass, [], all_queues=True)
+        assert result["errors"] == {"base": "queue_configured"}
+        assert (await _details(hass, []))["errors"] == {"base": "no_queues"}
+
+        # зведення області — теж лише в одній entry
+        result = await _details(hass, ["2.1"], region_stats=True)
+        assert result["errors"] == {"base": "region_stats_configured"}
+
+        result = await _details(hass, ["2.1", "1.2"])
+        assert result["type"] == FlowResultType.CREATE_ENTRY
+        # порядок черг — як в області, а не як у виборі
+        assert result["data"] == {
+            CONF_REGION: "kyiv",
+            CONF_QUEUES: ["1.2", "2.1"],
+            CONF_ALL_QUEUES: False,
+            CONF_REGION_STATS: False,
+        }
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.svitlo_live.api_hub import SvitloApiHub
+from custom_components.svitlo_live.const import CONF_QUEUES, CONF_REGION, EVENT_SCHEDULE_CHANGED
+from custom_components.svitlo_live.coordinator import SvitloCoordinator
+
+from .common import (
+    TODAY,
+    async_fire_time_changed,
+    async_test_home_assistant,
+    day_slots,
+    freeze_time,
+    kyiv,
+    mock_session,
+    proxy_json,
+)
+
+TOMORROW = TODAY + timedelta(days=1)
+
+
+async def _payload(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    today: Optional[dict[str, int]],
+    tomorrow: Optional[dict[str, int]] = None,
+) -> dict[str, Any]:
+    session = mock_session(monkeypatch)
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (today, tomorrow)}}))
+    async with async_test_home_assistant(tmp_path) as hass:
+        coordinator = SvitloCoordinator(hass, {CONF_REGION: "kyiv", CONF_QUEUES: ["1.1"]}, SvitloApiHub(hass))
+        await coordinator.async_refresh()
+        assert coordinator.last_update_success
+        return coordinator.data["1.1"]
+
+
+def _utc(day: date, hour: int, minute: int = 0) -> str:
+    return dt_util.as_utc(kyiv(day, hour, minute)).isoformat()
+
+
+async def test_current_slot_and_next_changes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 7, 40))
+    data = await _payload(tmp_path, monkeypatch, day_slots(off=[(16, 20), (36, 40)]))
+
+    assert data["now_status"] == "on"
+    assert data["now_halfhour_index"] == 15
+    assert data["next_change_at"] == "08:00"
+    assert data["next_off_at"] == _utc(TODAY, 8)
+    assert data["next_on_at"] == _utc(TODAY, 10)
+
+
+async def test_next_power_on_from_tomorrow(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # сьогодні без світла до кінця доби, завтра світло з 01:00
+    freeze_time(monkeypatch, kyiv(TODAY, 22, 10))
+    data = await _payload(tmp_path, monkeypatch, day_slots(off=[(44, 48)]), day_slots(off=[(0, 2)]))
+
+    assert data["now_status"] == "off"
+    assert data["tomorrow_date"] == TOMORROW.isoformat()
+    assert data["next_on_at"] == _utc(TOMORROW, 1)
+
+
+async def test_no_schedule_today(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12))
+    data = await _payload(tmp_path, monkeypatch, day_slots(unknown=[(0, 48)]))
+
+    assert data["now_status"] == "nosched"
+    assert data["next_on_at"] is None and data["next_off_at"] is None
+
+
+async def test_listeners_only_see_schedule_changes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    session = mock_session(monkeypatch)
+    ours, other = day_slots(off=[(24, 28)]), day_slots(off=[(36, 40)])
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (ours, None), "2.1": (other, None)}}))
+    # змінилась лише чужа черга, потім — наша
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (ours, None), "2.1": (day_slots(), None)}}))
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (day_slots(off=[(24, 30)]), None), "2.1": (day_slots(), None)}}))
+    async with async_test_home_assistant(tmp_path) as hass:
+        hub = SvitloApiHub(hass)
+        coordinator = SvitloCoordinator(hass, {CONF_REGION: "kyiv", CONF_QUEUES: ["1.1"]}, hub)
+        await coordinator.async_refresh()
+        hub.async_subscribe(coordinator)
+        # перше завантаження (і перезапуск) — не зміна розкладу
+        assert "1.1" not in coordinator.last_changed_utc
+        updates: list[None] = []
+        polls: list[None] = []
+        coordinator.async_add_listener(lambda: updates.append(None))
+        coordinator.async_add_poll_listener(lambda: polls.append(None))
+
+        freeze_time(monkeypatch, kyiv(TODAY, 12, 25))
+        await hub.async_poll()
+        assert (len(updates), len(polls)) == (0, 1)
+        assert "1.1" not in coordinator.last_changed_utc
+        assert coordinator.last_polled_utc == dt_util.as_utc(kyiv(TODAY, 12, 25))
+
+        freeze_time(monkeypatch, kyiv(TODAY, 12, 40))
+        await hub.async_poll()
+        assert (len(updates), len(polls)) == (1, 2)
+        assert coordinator.last_changed_utc["1.1"] == dt_util.as_utc(kyiv(TODAY, 12, 40))
+        assert coordinator.data["1.1"]["next_on_at"] == _utc(TODAY, 15)
+
+
+async def test_schedule_changed_event(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    session = mock_session(monkeypatch)
+    today, tomorrow = day_slots(off=[(24, 28)]), day_slots(off=[(0, 2)])
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (today, None)}}))
+    # з'явилось "завтра", потім сьогоднішнє вікно подовжилось на годину
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (today, tomorrow)}}))
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (day_slots(off=[(24, 30)]), tomorrow)}}))
+    async with async_test_home_assistant(tmp_path) as hass:
+        events: list[dict[str, Any]] = []
+        hass.bus.async_listen(EVENT_SCHEDULE_CHANGED, lambda event: events.append(event.data))
+        hub = SvitloApiHub(hass)
+        coordinator = SvitloCoordinator(hass, {CONF_REGION: "kyiv", CONF_QUEUES: ["1.1"]}, hub)
+        await coordinator.async_refresh()
+        hub.async_subscribe(coordinator)
+        for minute in (25, 40):
+            freeze_time(monkeypatch, kyiv(TODAY, 12, minute))
+            await hub.async_poll()
+        await hass.async_block_till_done()
+
+    assert len(events) == 2
+    assert events[0]["has_tomorrow"] and events[0]["old_tomorrow_off"] == []
+    assert events[0]["tomorrow_off"] == [{"start": "00:00", "end": "01:00", "minutes": 60}]
+    assert events[1] == {
+        "region": "kyiv",
+        "queue": "1.1",
+        "date": TODAY.isoformat(),
+        "tomorrow_date": TOMORROW.isoformat(),
+        "has_tomorrow": True,
+        "today_off": [{"start": "12:00", "end": "15:00", "minutes": 180}],
+        "tomorrow_off": [{"start": "00:00", "end": "01:00", "minutes": 60}],
+        "old_today_off": [{"start": "12:00", "end": "14:00", "minutes": 120}],
+        "old_tomorrow_off": [{"start": "00:00", "end": "01:00", "minutes": 60}],
+        "hash": events[1]["hash"],
+        "old_hash": events[0]["hash"],
+    }
+    assert events[1]["hash"] != events[1]["old_hash"]
+
+
+async def test_day_rollover_is_not_a_change(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 22))
+    session = mock_session(monkeypatch)
+    today, tomorrow = day_slots(off=[(24, 28)]), day_slots(off=[(0, 2)])
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (today, tomorrow)}}))
+    session.add(proxy_json(TOMORROW, {"kyiv": {"1.1": (tomorrow, None)}}))
+    async with async_test_home_assistant(tmp_path) as hass:
+        events: list[Any] = []
+        hass.bus.async_listen(EVENT_SCHEDULE_CHANGED, events.append)
+        hub = SvitloApiHub(hass)
+        coordinator = SvitloCoordinator(hass, {CONF_REGION: "kyiv", CONF_QUEUES: ["1.1"]}, hub)
+        await coordinator.async_refresh()
+        hub.async_subscribe(coordinator)
+        freeze_time(monkeypatch, kyiv(TOMORROW, 6))
+        await hub.async_poll()
+        await hass.async_block_till_done()
+
+        assert coordinator.data["1.1"]["date"] == TOMORROW.isoformat()
+        assert events == []
+
+
+async def test_slot_boundary_advances_without_network(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 13, 50))
+    session = mock_session(monkeypatch)
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (day_slots(off=[(24, 28)]), None)}}))
+    async with async_test_home_assistant(tmp_path) as hass:
+        coordinator = SvitloCoordinator(hass, {CONF_REGION: "kyiv", CONF_QUEUES: ["1.1"]}, SvitloApiHub(hass))
+        await coordinator.async_refresh()
+        updates: list[None] = []
+        coordinator.async_add_listener(lambda: updates.append(None))
+        assert coordinator.data["1.1"]["now_status"] == "off"
+
+        await async_fire_time_changed(hass, monkeypatch, kyiv(TODAY, 14))
+
+        assert coordinator.data["1.1"]["now_status"] == "on"
+        assert coordinator.data["1.1"]["now_halfhour_index"] == 28
+        assert len(updates) == 1
+        assert len(session.requests) == 1
+
+
+async def test_midnight_rollover_uses_cached_tomorrow(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 23, 50))
+    session = mock_session(monkeypatch)
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (day_slots(off=[(46, 48)]), day_slots(off=[(0, 2)]))}}))
+    async with async_test_home_assistant(tmp_path) as hass:
+        coordinator = SvitloCoordinator(hass, {CONF_REGION: "kyiv", CONF_QUEUES: ["1.1"]}, SvitloApiHub(hass))
+        await coordinator.async_refresh()
+
+        await async_fire_time_changed(hass, monkeypatch, kyiv(TOMORROW, 0))
+
+        data = coordinator.data["1.1"]
+        assert data["date"] == TOMORROW.isoformat() and "tomorrow_date" not in data
+        assert (data["now_status"], data["now_halfhour_index"]) == ("off", 0)
+        assert data["next_on_at"] == _utc(TOMORROW, 1)
+        assert coordinator.telemetry.counters["day_rollovers"] == 1
+        assert len(session.requests) == 1
+
+
+async def test_yesterdays_schedule_is_not_today(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 0, 10))
+    session = mock_session(monkeypatch)
+    # проксі із запізненням ще віддає вчорашню добу без "завтра"
+    session.add(proxy_json(TODAY - timedelta(days=1), {"kyiv": {"1.1": (day_slots(off=[(0, 4)]), None)}}))
+    async with async_test_home_assistant(tmp_path) as hass:
+        coordinator = SvitloCoordinator(hass, {CONF_REGION: "kyiv", CONF_QUEUES: ["1.1"]}, SvitloApiHub(hass))
+        await coordinator.async_refresh()
+
+    assert coordinator.data["1.1"]["date"] == TODAY.isoformat()
+    assert coordinator.data["1.1"]["now_status"] == "nosched"
+
+
+async def test_run_through_midnight_continues_tomorrow(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 23, 10))
+    data = await _payload(
+        tmp_path, monkeypatch, day_slots(off=[(46, 48)]), day_slots(off=[(0, 2), (10, 12)])
+    )
+    # відключення з 23:00 триває до 01:00; наступне — окрема серія о 05:00
+    assert data["now_status"] == "off"
+    assert data["next_on_at"] == _utc(TOMORROW, 1)
+    assert data["next_off_at"] == _utc(TOMORROW, 5)
+
+
+async def test_listeners_are_woken_per_queue(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    session = mock_session(monkeypatch)
+    first, second = day_slots(off=[(24, 28)]), day_slots(off=[(36, 40)])
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (first, None), "2.1": (second, None)}}))
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (first, None), "2.1": (day_slots(), None)}}))
+    async with async_test_home_assistant(tmp_path) as hass:
+        hub = SvitloApiHub(hass)
+        coordinator = SvitloCoordinator(hass, {CONF_REGION: "kyiv", CONF_QUEUES: ["1.1", "2.1"]}, hub)
+        await coordinator.async_refresh()
+        hub.async_subscribe(coordinator)
+        woken: list[str] = []
+        for queue in coordinator.queues:
+            coordinator.async_add_listener(lambda queue=queue: woken.append(queue), queue)
+
+        freeze_time(monkeypatch, kyiv(TODAY, 12, 25))
+        await hub.async_poll()
+
+        assert woken == ["2.1"]
+        assert coordinator.data["2.1"]["now_status"] == "on"
+        polled = dt_util.as_utc(kyiv(TODAY, 12, 25))
+        assert coordinator.last_changed_utc["2.1"] == polled
+        assert coordinator.last_changed_utc.get("1.1") != polled
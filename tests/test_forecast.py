@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from homeassistant.core import State
+
+from custom_components.svitlo_live.const import CONF_QUEUE, CONF_REGION
+from custom_components.svitlo_live.forecast import (
+    LikelyOff,
+    OutageProfile,
+    forecast_minutes,
+    likely_off,
+)
+from custom_components.svitlo_live.schedule import SLOTS_PER_DAY, DaySchedule
+
+from .common import (
+    TODAY,
+    async_add_entry,
+    async_test_home_assistant,
+    day_slots,
+    entity_id,
+    freeze_time,
+    kyiv,
+    mock_session,
+    proxy_json,
+    write_store,
+)
+
+FULL = (1 << SLOTS_PER_DAY) - 1
+# 18:00–20:00
+EVENING = ((1 << 4) - 1) << 36
+
+
+def _day(off: int) -> DaySchedule:
+    return DaySchedule(FULL & ~off, off)
+
+
+def test_profile_by_weekday() -> None:
+    profile = OutageProfile()
+    # три четверги: у двох — відключення 18:00–20:00; один понеділок
+    for weeks_ago, off in ((3, EVENING), (2, 0), (1, EVENING)):
+        profile.add(TODAY + timedelta(days=2 - 7 * weeks_ago), _day(off))
+    profile.add(TODAY - timedelta(days=1), _day(EVENING))
+
+    thursday = profile.probabilities()[3]
+    assert thursday[36] == 0.667 and thursday[35] == 0.0
+    # один день — замало для ймовірності
+    assert profile.probabilities()[0][36] is None
+    assert profile.samples == [1, 0, 0, 3, 0, 0, 0]
+    assert profile.likely_runs()[3] == ((36, 40, 0.667),)
+
+    windows = likely_off(profile, TODAY, TODAY + timedelta(days=7))
+    assert windows == (LikelyOff((TODAY + timedelta(days=2)).isoformat(), 36, 40, 0.667),)
+    assert forecast_minutes(windows, windows[0].day) == 120
+    assert forecast_minutes(windows, TODAY.isoformat()) == 0
+
+
+def _write_thursdays(config_dir: Path, off: int, weeks: tuple[int, ...]) -> None:
+    """Архів: четверги (TODAY + 2 дні мінус weeks тижнів) з відключеннями off."""
+    thursday = TODAY + timedelta(days=2)
+    write_store(config_dir, "svitlo_live.archive", {"queues": {"kyiv/1.1": {
+        "days": {(thursday - timedelta(weeks=n)).isoformat(): [FULL & ~off, off] for n in sorted(weeks, reverse=True)},
+        "imported": None,
+    }}})
+
+
+async def _forecast_state(config_dir: Path, monkeypatch: pytest.MonkeyPatch) -> State:
+    freeze_time(monkeypatch, kyiv(TODAY, 12))
+    session = mock_session(monkeypatch)
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (day_slots(), day_slots())}}))
+    async with async_test_home_assistant(config_dir) as hass:
+        await async_add_entry(hass, {CONF_REGION: "kyiv", CONF_QUEUE: "1.1"})
+        return hass.states.get(entity_id(hass, "sensor", "svitlo_forecast_kyiv_1.1"))
+
+
+async def test_forecast_sensor_from_archive(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    _write_thursdays(tmp_path, EVENING, (1, 2, 3))
+    state = await _forecast_state(tmp_path, monkeypatch)
+
+    # завтра (середа) вже опубліковано — прогноз на четвер
+    assert state.state == "120"
+    assert state.attributes["forecast_date"] == (TODAY + timedelta(days=2)).isoformat()
+    assert state.attributes["samples"] == [0, 0, 0, 3, 0, 0, 0]
+
+
+@pytest.mark.parametrize(
+    ("weeks", "off", "expected"),
+    [
+        ((), EVENING, "unknown"),  # порожній архів — не 0 хв у статистиці
+        ((1,), EVENING, "unknown"),  # замало четвергів
+        ((1, 2), 0, "0"),  # четверги відомі й без відключень
+    ],
+)
+async def test_forecast_needs_history(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, weeks: tuple[int, ...], off: int, expected: str
+) -> None:
+    if weeks:
+        _write_thursdays(tmp_path, off, weeks)
+    assert (await _forecast_state(tmp_path, monkeypatch)).state == expected
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+from custom_components.svitlo_live.api_hub import SvitloApiHub
+from custom_components.svitlo_live.const import CONF_QUEUES, CONF_REGION
+from custom_components.svitlo_live.coordinator import SvitloCoordinator
+from custom_components.svitlo_live.polling import PollScheduler
+
+from .common import (
+    TODAY,
+    async_test_home_assistant,
+    day_slots,
+    freeze_time,
+    kyiv,
+    mock_session,
+    proxy_json,
+)
+
+BASE = timedelta(minutes=15)
+LOW = timedelta(minutes=5)
+HIGH = timedelta(minutes=60)
+
+
+def test_evening_prior_until_changes_are_learned(monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 0))
+    poller = PollScheduler(BASE)
+    assert poller.hot_hours() == list(range(15, 24))
+
+    for day in range(3):
+        poller.record_change(kyiv(TODAY + timedelta(days=day), 9, 10))
+    assert poller.learned
+    assert poller.hot_hours() == [9]
+
+
+def test_interval_by_reason(monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 0))
+    poller = PollScheduler(BASE)
+
+    # о 14:xx наступна година — апріорно "гаряча"
+    assert poller.next_interval(kyiv(TODAY, 14, 10), LOW, HIGH, True) == LOW
+    assert poller.reason == "awaiting_tomorrow"
+    assert poller.next_interval(kyiv(TODAY, 14, 10), LOW, HIGH, False) == BASE
+    assert poller.reason == "change_window"
+
+    # стабільно 4 год поза вікном — два подвоєння
+    assert poller.next_interval(kyiv(TODAY, 4, 5), LOW, HIGH, True) == BASE * 4
+    assert poller.reason == "stable"
+    assert poller.next_interval(kyiv(TODAY, 8, 5), LOW, HIGH, True) == HIGH
+
+    poller.record_change(kyiv(TODAY, 8, 0))
+    assert poller.next_interval(kyiv(TODAY, 8, 30), LOW, HIGH, False) == LOW
+    assert poller.reason == "recent_change"
+
+
+async def test_hub_polls_at_floor_after_change_and_keeps_history(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 10))
+    session = mock_session(monkeypatch)
+    tomorrow = day_slots()
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (day_slots(off=[(24, 28)]), tomorrow)}}))
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (day_slots(off=[(24, 30)]), tomorrow)}}))
+    config = {CONF_REGION: "kyiv", CONF_QUEUES: ["1.1"]}
+    async with async_test_home_assistant(tmp_path) as hass:
+        hub = SvitloApiHub(hass)
+        coordinator = SvitloCoordinator(hass, config, hub)
+        await coordinator.async_refresh()
+        hub.async_subscribe(coordinator)
+        assert hub.poller.reason == "stable"
+
+        freeze_time(monkeypatch, kyiv(TODAY, 10, 20))
+        await hub.async_poll()
+        assert hub.poller.reason == "recent_change"
+        assert hub.poller.next_poll == kyiv(TODAY, 10, 25)
+        assert hub.poller.changes == 1
+
+    # історія змін переживає перезапуск разом зі знімком
+    async with async_test_home_assistant(tmp_path) as hass:
+        hub = SvitloApiHub(hass)
+        await hub.async_load()
+        assert hub.poller.changes == 1
+        assert hub.poller.last_change == kyiv(TODAY, 10, 20)
+
+
+@pytest.mark.parametrize(
+    ("queues", "awaiting"),
+    [
+        ({"1.1": (day_slots(off=[(24, 28)]), None)}, True),
+        # в області не публікують відключень: ні сьогодні, ні завтра слотів немає
+        ({}, False),
+        ({"1.1": (day_slots(unknown=[(0, 48)]), None)}, False),
+    ],
+)
+async def test_evening_floor_only_while_tomorrow_is_expected(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, queues: dict, awaiting: bool
+) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 18))
+    mock_session(monkeypatch).add(proxy_json(TODAY, {"kyiv": queues}))
+    async with async_test_home_assistant(tmp_path) as hass:
+        hub = SvitloApiHub(hass)
+        coordinator = SvitloCoordinator(hass, {CONF_REGION: "kyiv", CONF_QUEUES: ["1.1"]}, hub)
+        await coordinator.async_refresh()
+        hub.async_subscribe(coordinator)
+
+        assert hub.awaiting_tomorrow() is awaiting
+        assert hub.poller.reason == ("awaiting_tomorrow" if awaiting else "change_window")
+        assert (hub.poller.interval == LOW) is awaiting
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import pytest
+
+from custom_components.svitlo_live.schedule import EMPTY_DAY, SLOTS_PER_DAY, DaySchedule
+
+FULL = (1 << SLOTS_PER_DAY) - 1
+
+
+def _day(off: list[tuple[int, int]], unknown: list[tuple[int, int]] = ()) -> DaySchedule:
+    def mask(runs) -> int:
+        return sum(((1 << (end - start)) - 1) << start for start, end in runs)
+
+    return DaySchedule(FULL & ~mask(off) & ~mask(unknown), mask(off))
+
+
+def test_masks_and_states() -> None:
+    day = _day(off=[(16, 20)], unknown=[(46, 48)])
+    assert day.state_at(15) == "on" and day.state_at(16) == "off" and day.state_at(47) == "unknown"
+    assert day.has_slots and not EMPTY_DAY.has_slots
+    # слот не може бути одночасно on і off: off поступається on
+    assert DaySchedule(0b1, 0b11).off_mask == 0b10
+    assert day == _day(off=[(16, 20)], unknown=[(46, 48)]) and hash(day) == hash(_day([(16, 20)], [(46, 48)]))
+    with pytest.raises(AttributeError):
+        day.on_mask = 0
+
+
+def test_next_change() -> None:
+    day = _day(off=[(16, 20), (40, 44)])
+    assert day.next_change(0) == 16
+    assert day.next_change(16) == 20
+    # по колу в межах доби: після останньої зміни — перша зміна з початку доби
+    assert day.next_change(44) == 16
+    assert _day(off=[(0, 4), (44, 48)]).next_change(45) == 4
+    assert DaySchedule(FULL, 0).next_change(10) is None
+
+
+def test_off_intervals() -> None:
+    day = _day(off=[(0, 2), (16, 20), (46, 48)])
+    assert day.off_intervals() == [(0, 2), (16, 20), (46, 48)]
+
+
+def test_next_run_start() -> None:
+    day = _day(off=[(0, 2), (16, 20), (46, 48)])
+    # посеред серії off наступна серія починається лише з 16-го
+    assert day.next_run_start("off", 1) == 16
+    assert day.next_run_start("on", 0) == 2
+    assert day.next_run_start("on", 3) == 20
+    assert day.next_run_start("off", 47) is None
+    assert day.next_run_start("off", 48) is None
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+from custom_components.svitlo_live.const import CONF_QUEUE, CONF_REGION, DATA_HUB, DOMAIN
+
+from .common import (
+    TODAY,
+    async_add_entry,
+    async_fire_time_changed,
+    async_test_home_assistant,
+    day_slots,
+    entity_id,
+    entity_state,
+    freeze_time,
+    kyiv,
+    mock_session,
+    proxy_json,
+)
+
+
+async def test_minutes_sensors_follow_schedule(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    session = mock_session(monkeypatch)
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (day_slots(off=[(24, 28)]), None)}}))
+    # відключення подовжили до 15:00
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (day_slots(off=[(24, 30)]), None)}}))
+    async with async_test_home_assistant(tmp_path) as hass:
+        await async_add_entry(hass, {CONF_REGION: "kyiv", CONF_QUEUE: "1.1"})
+        assert entity_state(hass, "sensor", "svitlo_min_to_on_kyiv_1.1") == "110"
+        assert entity_state(hass, "sensor", "svitlo_min_to_off_kyiv_1.1") == "unknown"
+
+        freeze_time(monkeypatch, kyiv(TODAY, 12, 25))
+        await hass.data[DOMAIN][DATA_HUB].async_poll()
+        await hass.async_block_till_done()
+        assert entity_state(hass, "sensor", "svitlo_min_to_on_kyiv_1.1") == "155"
+        assert entity_state(hass, "sensor", "svitlo_status_kyiv_1.1") == "Grid OFF"
+
+
+async def test_shared_clock_ticks_every_minute(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    start = kyiv(TODAY, 12, 10)
+    freeze_time(monkeypatch, start)
+    session = mock_session(monkeypatch)
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (day_slots(off=[(24, 28)]), None), "1.2": (day_slots(), None)}}))
+    async with async_test_home_assistant(tmp_path) as hass:
+        await async_add_entry(hass, {CONF_REGION: "kyiv", CONF_QUEUE: "1.1"})
+        await async_add_entry(hass, {CONF_REGION: "kyiv", CONF_QUEUE: "1.2"})
+        writes: list[str] = []
+        hass.bus.async_listen("state_changed", lambda event: writes.append(event.data["entity_id"]))
+
+        await async_fire_time_changed(hass, monkeypatch, start + timedelta(seconds=30))
+        assert writes == []
+        await async_fire_time_changed(hass, monkeypatch, start + timedelta(minutes=1))
+        assert entity_state(hass, "sensor", "svitlo_min_to_on_kyiv_1.1") == "109"
+        # пишеться лише відлік, що змінився; у 1.2 відліку немає
+        assert len(writes) == 1
+
+
+async def test_day_stat_sensors(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 9))
+    session = mock_session(monkeypatch)
+    today, tomorrow = day_slots(off=[(4, 8), (24, 28)]), day_slots(off=[(20, 26)])
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (today, tomorrow)}}))
+    async with async_test_home_assistant(tmp_path) as hass:
+        await async_add_entry(hass, {CONF_REGION: "kyiv", CONF_QUEUE: "1.1"})
+
+        assert entity_state(hass, "sensor", "svitlo_off_minutes_today_kyiv_1.1") == "240"
+        assert entity_state(hass, "sensor", "svitlo_off_minutes_tomorrow_kyiv_1.1") == "180"
+        assert entity_state(hass, "sensor", "svitlo_off_windows_kyiv_1.1") == "2"
+        assert entity_state(hass, "sensor", "svitlo_longest_on_kyiv_1.1") == "600"
+        longest_off = hass.states.get(entity_id(hass, "sensor", "svitlo_longest_off_kyiv_1.1"))
+        assert longest_off.state == "120" and longest_off.attributes["tomorrow"] == 180
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from custom_components.svitlo_live.schedule import DaySchedule
+from custom_components.svitlo_live.slots import day_stats, slot_boundaries, slot_index_at, slot_label
+
+from .common import TODAY, kyiv
+
+SPRING_FORWARD = date(2026, 3, 29)
+FALL_BACK = date(2026, 10, 25)
+
+
+def _minutes(day: date) -> list[int]:
+    bounds = slot_boundaries(day)
+    return [int((bounds[i + 1] - bounds[i]) / timedelta(minutes=1)) for i in range(48)]
+
+
+def test_regular_day() -> None:
+    bounds = slot_boundaries(TODAY)
+    assert bounds[0] == kyiv(TODAY, 0)
+    assert bounds[48] == kyiv(TODAY + timedelta(days=1), 0)
+    assert set(_minutes(TODAY)) == {30}
+    assert slot_index_at(TODAY, kyiv(TODAY, 7, 40)) == 15
+    assert slot_index_at(TODAY, kyiv(TODAY - timedelta(days=1), 23, 50)) == 0
+
+
+def test_spring_forward_day() -> None:
+    minutes = _minutes(SPRING_FORWARD)
+    # 03:00 і 03:30 не існують — нульові слоти
+    assert minutes[6] == minutes[7] == 0
+    assert sum(minutes) == 1380
+    assert slot_index_at(SPRING_FORWARD, kyiv(SPRING_FORWARD, 4, 10)) == 8
+    assert slot_index_at(SPRING_FORWARD, kyiv(SPRING_FORWARD, 2, 50)) == 5
+
+
+def test_fall_back_day() -> None:
+    minutes = _minutes(FALL_BACK)
+    # 03:30 (перше входження) тягнеться до 04:00 після переведення годинника
+    assert minutes[7] == 90
+    assert sum(minutes) == 1500
+    bounds = slot_boundaries(FALL_BACK)
+    assert slot_index_at(FALL_BACK, bounds[7] + timedelta(minutes=80)) == 7
+    assert slot_label(48) == "00:00"
+
+
+def test_day_stats_use_real_minutes() -> None:
+    # відключення 02:00–04:00 і 20:00–21:00 (маски слотів), решта — світло
+    off = (0b1111 << 4) | (0b11 << 40)
+    schedule = DaySchedule(((1 << 48) - 1) & ~off, off)
+
+    assert day_stats(TODAY, schedule) == {
+        "off_minutes": 180,
+        "off_windows": 2,
+        "longest_off_minutes": 120,
+        "longest_on_minutes": 16 * 60,
+    }
+    # 03:00–04:00 на весняному переході не існує, на осінньому — триває дві години
+    assert day_stats(SPRING_FORWARD, schedule)["longest_off_minutes"] == 60
+    assert day_stats(FALL_BACK, schedule)["off_minutes"] == 240
+    assert day_stats(TODAY, DaySchedule(0, 0)) is None
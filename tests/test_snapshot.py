@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from custom_components.svitlo_live.schedule import DaySchedule
+from custom_components.svitlo_live.snapshot import build_snapshot
+
+from .common import TODAY, day_slots, proxy_json
+
+
+def test_indexes_region_queue_day() -> None:
+    api = proxy_json(TODAY, {"kyiv": {"1.1": (day_slots(off=[(0, 2)], unknown=[(47, 48)]), day_slots())}})
+    snapshot = build_snapshot(api)
+
+    assert snapshot.date_today == TODAY.isoformat()
+    assert snapshot.has_region("kyiv") and not snapshot.has_region("odeska-oblast")
+    days = snapshot.queue_days("kyiv", "1.1")
+    assert list(days) == [api["date_today"], api["date_tomorrow"]]
+    # біт i — слот i; 23:30 (0) — ні в on, ні в off
+    assert days[api["date_today"]] == DaySchedule(((1 << 47) - 1) & ~0b11, 0b11)
+
+
+def test_unknown_queue_region_and_malformed_slots() -> None:
+    api = proxy_json(TODAY, {"kyiv": {"1.1": ({"00:00": "2", "00:30": 7, "25:00": 2}, None)}})
+    api["regions"].append({"cpu": "odeska-oblast", "schedule": {"1.1": "n/a"}})
+    snapshot = build_snapshot(api)
+
+    assert snapshot.queue_days("kyiv", "9.9") == {}
+    assert snapshot.queue_days("lvivska-oblast", "1.1") == {}
+    assert snapshot.queue_days("odeska-oblast", "1.1") == {}
+    # рядковий код приводиться, невідомий і зайві мітки — "unknown"
+    assert snapshot.queue_days("kyiv", "1.1")[TODAY.isoformat()] == DaySchedule(0, 0b1)
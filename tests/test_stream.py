@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import pytest
+
+from custom_components.svitlo_live.api_hub import SvitloApiHub
+from custom_components.svitlo_live.const import CONF_QUEUES, CONF_REGION
+from custom_components.svitlo_live.coordinator import SvitloCoordinator
+from custom_components.svitlo_live.stream import RegionStreamParser
+
+from .common import TODAY, async_test_home_assistant, day_slots, freeze_time, kyiv, mock_session, proxy_json
+
+Wanted = dict[str, Optional[frozenset[str]]]
+
+
+def _api(regions: int, queues: int) -> dict[str, Any]:
+    """JSON проксі: у кожній області свої вікна; зайві верхньорівневі поля мають пропускатись."""
+    api = proxy_json(
+        TODAY,
+        {
+            f"region-{r}": {
+                f"{q // 2 + 1}.{q % 2 + 1}": (day_slots(off=[(r, r + q + 1)]), day_slots(unknown=[(40, 48)]))
+                for q in range(queues)
+            }
+            for r in range(regions)
+        },
+    )
+    return {"version": 2, "meta": {"note": "ґ ї є — не ASCII", "list": [1, 2, {"a": None}]}, **api, "tail": True}
+
+
+def _parse(body: bytes, size: int, wanted: Wanted) -> dict[str, Any]:
+    parser = RegionStreamParser(wanted)
+    for start in range(0, len(body), size):
+        parser.feed(body[start:start + size])
+    return parser.finish()
+
+
+def _expected(api: dict[str, Any], wanted: Wanted) -> dict[str, Any]:
+    regions = []
+    for region in api["regions"]:
+        if region["cpu"] not in wanted:
+            continue
+        queues = wanted[region["cpu"]]
+        schedule = {q: days for q, days in region["schedule"].items() if queues is None or q in queues}
+        regions.append({"cpu": region["cpu"], "schedule": schedule})
+    return {"date_today": api["date_today"], "date_tomorrow": api["date_tomorrow"], "regions": regions}
+
+
+def _sizes(length: int, exhaustive: int) -> Iterable[int]:
+    yield from range(1, exhaustive + 1)
+    size = exhaustive * 2
+    while size < length:
+        yield size
+        size *= 2
+    yield length
+
+
+def test_every_chunk_size_matches_full_decode() -> None:
+    api = _api(regions=3, queues=2)
+    body = json.dumps(api, ensure_ascii=False).encode()
+    wanted: Wanted = {"region-0": None, "region-2": frozenset({"1.2"})}
+    expected = _expected(api, wanted)
+    # розрізи посеред ключів, чисел, багатобайтових символів UTF-8 — результат той самий
+    for size in _sizes(len(body), exhaustive=256):
+        assert _parse(body, size, wanted) == expected, size
+
+
+def test_numbers_split_across_chunks() -> None:
+    # розріз після "-1500." чи "1e" не повинен дати інше число чи помилку
+    api = {"n": -1500.0, "e": 1.5e-3, "big": 12345678901234567890, "flags": [True, False, None], **_api(2, 1)}
+    api["regions"][0]["x"] = 0.125
+    api["tail"] = 1e10
+    body = json.dumps(api, separators=(",", ":")).encode()
+    wanted: Wanted = {"region-0": None}
+    expected = _expected(api, wanted)
+    for size in _sizes(len(body), exhaustive=64):
+        assert _parse(body, size, wanted) == expected, size
+
+
+def test_large_payload_chunk_sizes() -> None:
+    api = _api(regions=30, queues=12)
+    body = json.dumps(api, separators=(",", ":")).encode()
+    wanted: Wanted = {"region-7": frozenset({"2.1", "3.2"}), "region-29": None}
+    expected = _expected(api, wanted)
+    for size in (7, 100, 4096, 16 * 1024, len(body)):
+        assert _parse(body, size, wanted) == expected, size
+
+
+def test_truncated_body_is_an_error() -> None:
+    body = json.dumps(_api(regions=1, queues=1)).encode()
+    parser = RegionStreamParser({})
+    parser.feed(body[:-1])
+    with pytest.raises(ValueError):
+        parser.finish()
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+async def test_hub_keeps_only_subscribed_queues(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, chunked: bool
+) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    session = mock_session(monkeypatch)
+    # ~430 КБ повного JSON (проксі без фільтра областей), з Content-Length чи без
+    session.add(_api(regions=30, queues=12), chunked=chunked)
+    async with async_test_home_assistant(tmp_path) as hass:
+        hub = SvitloApiHub(hass)
+        coordinator = SvitloCoordinator(hass, {CONF_REGION: "region-7", CONF_QUEUES: ["2.1"]}, hub)
+        await coordinator.async_refresh()
+
+        assert hub.telemetry.counters["streamed"] == 1
+        # пачки шматків і кінець розбору — в executor
+        assert hub.telemetry.counters["executor_jobs"] >= 2
+        assert hub.snapshot.regions == ["region-7"]
+        assert len(hub.snapshot.queue_days("region-7", "2.1")) == 2
+        assert hub.snapshot.queue_days("region-7", "1.1") == {}
+        assert coordinator.data["2.1"]["now_status"] == "on"
+        assert coordinator.data["2.1"]["today_schedule"].off_intervals() == [(7, 10)]
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+async def test_medium_body_is_decoded_whole_in_executor(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, chunked: bool
+) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    session = mock_session(monkeypatch)
+    # ~140 КБ: більше за поріг executor, менше за поріг потокового розбору
+    session.add(_api(regions=10, queues=12), chunked=chunked)
+    async with async_test_home_assistant(tmp_path) as hass:
+        hub = SvitloApiHub(hass)
+        coordinator = SvitloCoordinator(hass, {CONF_REGION: "region-7", CONF_QUEUES: ["2.1"]}, hub)
+        await coordinator.async_refresh()
+
+        assert "streamed" not in hub.telemetry.counters
+        assert hub.telemetry.counters["executor_jobs"] == 1
+        assert hub.telemetry.get("loop_block_ms") is not None
+        assert coordinator.data["2.1"]["today_schedule"].off_intervals() == [(7, 10)]
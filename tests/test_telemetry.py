@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.svitlo_live.const import CONF_QUEUE, CONF_QUEUES, CONF_REGION, DATA_HUB, DOMAIN
+from custom_components.svitlo_live.diagnostics import async_get_config_entry_diagnostics
+from custom_components.svitlo_live.telemetry import RollingStats
+
+from .common import (
+    TODAY,
+    async_add_entry,
+    async_fire_time_changed,
+    async_test_home_assistant,
+    day_slots,
+    entity_id,
+    entity_state,
+    freeze_time,
+    kyiv,
+    mock_session,
+    proxy_json,
+)
+
+
+def test_rolling_stats_window() -> None:
+    stats = RollingStats(window=10)
+    assert stats.percentile(0.95) is None and stats.as_dict() == {"count": 0}
+    for value in range(1, 21):
+        stats.add(float(value))
+
+    # перцентилі — лише по останніх 10 значеннях, count — по всіх
+    assert stats.percentile(0.5) == 16.0
+    assert stats.as_dict() == {
+        "count": 20,
+        "last": 20.0,
+        "p50": 16.0,
+        "p95": 20.0,
+        "p99": 20.0,
+        "max": 20.0,
+        "mean": 15.5,
+    }
+
+
+async def test_diagnostics_and_latency_sensors(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    session = mock_session(monkeypatch)
+    session.add(proxy_json(TODAY, {"kyiv": {"1.1": (day_slots(off=[(24, 28)]), None)}}))
+    async with async_test_home_assistant(tmp_path) as hass:
+        # діагностичні сенсори вимкнені за замовчуванням — вмикаємо заздалегідь
+        registry = er.async_get(hass)
+        for unique_id in ("svitlo_fetch_latency_kyiv_1.1", "svitlo_build_time_kyiv_1.1"):
+            registry.async_get_or_create("sensor", DOMAIN, unique_id)
+        entry = await async_add_entry(hass, {CONF_REGION: "kyiv", CONF_QUEUE: "1.1"})
+        freeze_time(monkeypatch, kyiv(TODAY, 12, 25))
+        await hass.data[DOMAIN][DATA_HUB].async_poll()
+        await hass.async_block_till_done()
+
+        fetch = hass.states.get(entity_id(hass, "sensor", "svitlo_fetch_latency_kyiv_1.1"))
+        assert fetch.attributes["requests"] == 2 and fetch.attributes["body_unchanged"] == 1
+        assert fetch.attributes["fetch_ms"]["count"] == 2
+        assert float(fetch.state) >= 0
+        build = hass.states.get(entity_id(hass, "sensor", "svitlo_build_time_kyiv_1.1"))
+        assert build.attributes["payload_build_ms"]["count"] == 1
+
+        diag = await async_get_config_entry_diagnostics(hass, entry)
+        assert diag["hub"]["telemetry"]["counters"]["polls"] == 1
+        assert diag["hub"]["failures"] == 0 and not diag["hub"]["circuit_open"]
+        assert diag["hub"]["snapshot_dates"][0] == TODAY.isoformat()
+        today = diag["coordinator"]["data"]["1.1"]["today_schedule"]
+        assert today["off_windows"] == [{"start": "12:00", "end": "14:00", "minutes": 120}]
+
+
+async def test_diagnostic_sensors_once_per_entry(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 10))
+    slots = (day_slots(off=[(24, 28)]), None)
+    mock_session(monkeypatch).add(proxy_json(TODAY, {"kyiv": {"1.1": slots, "1.2": slots}}))
+    kinds = ("last_poll", "fetch_latency", "build_time", "poll_interval")
+    async with async_test_home_assistant(tmp_path) as hass:
+        registry = er.async_get(hass)
+        for kind in kinds:
+            registry.async_get_or_create("sensor", DOMAIN, f"svitlo_{kind}_kyiv_1.1")
+        await async_add_entry(hass, {CONF_REGION: "kyiv", CONF_QUEUES: ["1.1", "1.2"]})
+
+        # діагностика — на пристрої першої черги; друга черга має лише свої сенсори
+        for kind in kinds:
+            assert hass.states.get(entity_id(hass, "sensor", f"svitlo_{kind}_kyiv_1.1")) is not None
+            assert entity_id(hass, "sensor", f"svitlo_{kind}_kyiv_1.2") is None
+        assert entity_id(hass, "sensor", "svitlo_status_kyiv_1.2") is not None
+
+
+async def test_payload_build_sensor_follows_precise_ticks(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    freeze_time(monkeypatch, kyiv(TODAY, 12, 50))
+    session = mock_session(monkeypatch)
+    # о 13:00 змінюється лише друга черга — сенсор сидить на пристрої першої
+    queues = {"1.1": (day_slots(), None), "1.2": (day_slots(off=[(26, 28)]), None)}
+    session.add(proxy_json(TODAY, {"kyiv": queues}))
+    async with async_test_home_assistant(tmp_path) as hass:
+        er.async_get(hass).async_get_or_create("sensor", DOMAIN, "svitlo_build_time_kyiv_1.1")
+        await async_add_entry(hass, {CONF_REGION: "kyiv", CONF_QUEUES: ["1.1", "1.2"]})
+        build_id = entity_id(hass, "sensor", "svitlo_build_time_kyiv_1.1")
+        assert hass.states.get(build_id).attributes.get("precise_fired") is None
+
+        await async_fire_time_changed(hass, monkeypatch, kyiv(TODAY, 13))
+
+        assert entity_state(hass, "sensor", "svitlo_status_kyiv_1.2") == "Grid OFF"
+        assert hass.states.get(build_id).attributes["precise_fired"] == 1
+        assert len(session.requests) == 1